@@ -21,6 +21,7 @@ Comandos locais:
 from __future__ import annotations
 
 import argparse
+import copy
 import getpass
 import random
 import sys
@@ -232,6 +233,25 @@ def enemy_list(players: dict, me: str) -> list[tuple[str, dict]]:
     ]
 
 
+
+def apply_state_patch(state: dict, patch: dict) -> dict:
+    """Aplica game_state_patch ({set: [[caminho, valor]], unset: [caminho]}) numa cópia."""
+    new = copy.deepcopy(state)
+
+    def parent(path):
+        node = new
+        for key in path[:-1]:
+            node = node[key]
+        return node
+
+    for path in patch.get("unset") or []:
+        parent(path).pop(path[-1], None)
+    for path, value in patch.get("set") or []:
+        if path:
+            parent(path)[path[-1]] = value
+    new["state_version"] = patch.get("version")
+    return new
+
 class Strategy:
     """Decide a próxima ação com base no estado fresco (closed-loop)."""
 
@@ -1273,7 +1293,12 @@ class TwilightBot:
 
     def request_state(self):
         if self.sio.connected:
-            self.sio.emit("get_game_state", {"game_id": self.room})
+            payload = {"game_id": self.room}
+            with self._lock:
+                st = self.game_state
+            if st and st.get("game_id") == self.room and "state_version" in st:
+                payload["since"] = st["state_version"]
+            self.sio.emit("get_game_state", payload)
 
     # --- handlers ---
     def _register_handlers(self):
@@ -1345,6 +1370,16 @@ class TwilightBot:
             ):
                 threading.Thread(target=self._maybe_play, daemon=True).start()
 
+        @self.sio.on("game_state_patch")
+        def on_state_patch(patch):
+            with self._lock:
+                st = self.game_state
+            if not st or patch.get("base_version") != st.get("state_version"):
+                # perdemos uma versão: pede o estado completo
+                self.sio.emit("get_game_state", {"game_id": self.room})
+                return
+            on_state(apply_state_patch(st, patch))
+
         @self.sio.on("action_success")
         def on_action_success(data):
             log = data.get("log_message") or ""
@@ -1360,7 +1395,7 @@ class TwilightBot:
             if data.get("first_round_ended"):
                 self._attacks_blocked = False
                 print("[jogo] primeira rodada acabou — ataques liberados")
-            self.request_state()
+            # o estado novo chega por push (game_state / game_state_patch)
 
         @self.sio.on("action_error")
         def on_action_error(data):
@@ -1402,6 +1437,14 @@ class TwilightBot:
         def on_chat_error(data):
             print(f"[chat erro] {data.get('message')}")
 
+        @self.sio.on("state_error")
+        def on_state_error(data):
+            # limite de pedidos de estado: repete depois do tempo indicado
+            if data.get("rate_limited"):
+                retry = threading.Timer(max(0.1, float(data.get("retry_after") or 1)), self.request_state)
+                retry.daemon = True
+                retry.start()
+
         @self.sio.on("game_over")
         def on_game_over(data):
             print(f"\n*** FIM DE JOGO: {data.get('message')} ***\n")
@@ -1644,8 +1687,6 @@ class TwilightBot:
                         "ping_game",
                         {"game_id": self.room, "player_id": self.username},
                     )
-                    # refresh estado
-                    self.request_state()
             except Exception:
                 pass
             self._stop.wait(20)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Twilight Battle — replay headless de uma partida.
+
+Uso:
+  python apps/replay.py partida.json
+  python apps/replay.py partida.json --upto 120 --state alice
+
+O JSON é o que /api/admin/game/<id>/replay devolve (o objeto inteiro ou
+só o campo "replay"). Recria a partida com a mesma seed e as mesmas
+ações, sem servidor nem clientes, e mostra o estado final (ou após as
+primeiras N ações com --upto).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Twilight Battle replay")
+    p.add_argument("log", help="Arquivo JSON com seed + ações")
+    p.add_argument("--upto", type=int, default=None, help="Para após as primeiras N ações")
+    p.add_argument(
+        "--state",
+        metavar="USERNAME",
+        default=None,
+        help="Imprime o game_state como esse jogador o veria",
+    )
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with open(args.log, encoding="utf-8") as f:
+        log = json.load(f)
+    log = log.get("replay", log)
+
+    from twilight import create_app
+    from twilight.cards.codec import dumps
+    from twilight.game.replay import replay_game
+    from twilight.game.view import build_game_state
+
+    app = create_app()
+    with app.app_context():
+        game = replay_game(log, upto=args.upto)
+
+        total = len(log.get("actions") or [])
+        done = total if args.upto is None else min(args.upto, total)
+        print(f"[replay] sala={game.game_id} seed={game.seed} ações={done}/{total}")
+        current = game.players[game.current_turn] if game.players else None
+        print(f"[replay] started={game.started} finished={game.finished} winner={game.winner} vez={current}")
+        for uname in game.players:
+            pdata = game.player_data.get(uname) or {}
+            print(
+                f"  {uname}: vida={pdata.get('life')} mão={len(pdata.get('hand') or [])}"
+                f" morto={bool(pdata.get('dead'))}"
+            )
+
+        if args.state:
+            if args.state not in game.player_data:
+                print(f"[erro] {args.state} não está na partida")
+                raise SystemExit(1)
+            print(dumps(build_game_state(game, game.game_id, args.state), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
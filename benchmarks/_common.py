@@ -0,0 +1,49 @@
+"""
+Apoio dos benchmarks: DATA_DIR temporário (nunca o data/ real), raiz do
+repositório no sys.path e variantes em subprocesso para knobs que o
+twilight.config só lê no import.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VARIANT_FLAG = '--variant'
+
+
+def isolate(**env) -> str:
+    """Banco num diretório temporário + env extra. Chamar antes de importar twilight."""
+    data_dir = tempfile.mkdtemp(prefix='twilight-bench-')
+    os.environ['DATA_DIR'] = data_dir
+    os.environ['DATABASE_PATH'] = os.path.join(data_dir, 'database.db')
+    for key, value in env.items():
+        os.environ[key] = str(value)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    return data_dir
+
+
+def is_variant() -> bool:
+    return VARIANT_FLAG in sys.argv
+
+
+def run_variants(script: str, variants) -> None:
+    """Roda `script` uma vez por (rótulo, env), cada uma num processo novo."""
+    for label, env in variants:
+        print(f'--- {label}', flush=True)
+        subprocess.run(
+            [sys.executable, script, VARIANT_FLAG],
+            env={**os.environ, **{k: str(v) for k, v in env.items()}},
+            check=True,
+        )
+
+
+def summarize(samples_ms) -> str:
+    """Resumo de latências em ms (p50/p99/máx)."""
+    if not samples_ms:
+        return 'samples=0'
+    ordered = sorted(samples_ms)
+    p50 = ordered[len(ordered) // 2]
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f'samples={len(ordered)} p50={p50:.1f}ms p99={p99:.1f}ms max={ordered[-1]:.1f}ms'
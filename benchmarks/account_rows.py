@@ -0,0 +1,69 @@
+"""
+current_game por linha vs tabela inteira (user-001).
+
+Com ACCOUNTS contas no banco, compara entrar numa sala e fechar a sala
+pelo caminho antigo (load_accounts + save_accounts da tabela toda) e
+pelas primitivas por linha (set_current_game, clear_current_game_for_room).
+Mede o storage direto, sem o cache de contas por cima.
+
+    python benchmarks/account_rows.py
+"""
+import os
+import time
+
+from _common import isolate
+
+ACCOUNTS = int(os.environ.get('BENCH_ACCOUNTS', '10000'))
+JOINS = 20
+
+
+def _seed(db):
+    db.init_db()
+    with db._connection() as conn:
+        conn.executemany(
+            'INSERT INTO accounts (username, password, created_at, current_game, admin_level, meta_json)'
+            ' VALUES (?, ?, ?, ?, ?, ?)',
+            [(f'user{i}', 'x$y', '2024', None, 0, '{"realname": "U"}') for i in range(ACCOUNTS)],
+        )
+        conn.commit()
+
+
+def _full_table(db, room):
+    start = time.perf_counter()
+    for i in range(JOINS):
+        accounts = db.load_accounts()
+        accounts[f'user{i}']['current_game'] = room
+        db.save_accounts(accounts)
+    join = (time.perf_counter() - start) / JOINS
+    start = time.perf_counter()
+    accounts = db.load_accounts()
+    for data in accounts.values():
+        if data.get('current_game') == room:
+            data['current_game'] = None
+    db.save_accounts(accounts)
+    return join, time.perf_counter() - start
+
+
+def _row_level(db, room):
+    start = time.perf_counter()
+    for i in range(JOINS):
+        db.set_current_game(f'user{i}', room)
+    join = (time.perf_counter() - start) / JOINS
+    start = time.perf_counter()
+    db.clear_current_game_for_room(room)
+    return join, time.perf_counter() - start
+
+
+def main():
+    isolate()
+    from twilight.storage import db
+
+    _seed(db)
+    for label, run, room in (('tabela inteira', _full_table, 'ROOM01'), ('por linha', _row_level, 'ROOM02')):
+        join, close = run(db, room)
+        assert all(db.get_account(f'user{i}')['current_game'] is None for i in range(JOINS))
+        print(f'{label:15s} entrar: {join * 1000:7.2f} ms/chamada   fechar sala: {close * 1000:7.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
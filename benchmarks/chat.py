@@ -0,0 +1,84 @@
+"""
+Histórico e filtro do chat (user-023).
+
+add_chat_message em MESSAGES mensagens de 3 a 40 palavras e censor_text
+numa mensagem de ~170 caracteres, com a implementação atual (deque +
+uma regex) e a de antes (copiada abaixo: lista fatiada e um re.sub por
+palavrão).
+
+    python benchmarks/chat.py
+"""
+import os
+import random
+import re
+import time
+import timeit
+
+from _common import isolate
+
+MESSAGES = int(os.environ.get('BENCH_MESSAGES', '10000'))
+WORDS = 'olá pessoa boa jogada ataque cuidado porra Caralho krlh vamos mago rei FDP defesa'.split()
+CLEAN = ('boa jogada pessoal, cuidado com o mago na defesa e guardem as runas '
+         'para o ritual do rei; o elfo ainda tem ataque e a ninfa cura no próximo turno, vamos!')
+DIRTY = CLEAN.replace('cuidado', 'porra cuidado').replace('ritual', 'caralho do ritual')
+
+
+def _legacy(PROFANITY_LIST, MAX_CHAT_MESSAGES, now_sp_str):
+    """censor_text/add_chat_message antes do user-023."""
+    def censor_text(text):
+        censored = text
+        for word in PROFANITY_LIST:
+            if word in censored.lower():
+                pattern = re.compile(re.escape(word), re.IGNORECASE)
+                censored = pattern.sub('***', censored)
+        return censored
+
+    history = {}
+
+    def add_chat_message(game_id, username, message, is_system=False):
+        if game_id not in history:
+            history[game_id] = []
+        final_message = message if is_system else censor_text(message)
+        history[game_id].append({
+            'username': username,
+            'message': final_message,
+            'timestamp': now_sp_str('%H:%M:%S'),
+            'is_system': is_system,
+        })
+        if len(history[game_id]) > MAX_CHAT_MESSAGES:
+            history[game_id] = history[game_id][-MAX_CHAT_MESSAGES:]
+        return final_message
+
+    return censor_text, add_chat_message, history
+
+
+def main():
+    isolate()
+    from twilight.config import now_sp_str
+    from twilight.game import chat
+    from twilight.state import chat_messages
+
+    rng = random.Random(1)
+    messages = [' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 40))) for _ in range(MESSAGES)]
+    old_censor, old_add, old_history = _legacy(chat.PROFANITY_LIST, chat.MAX_CHAT_MESSAGES, now_sp_str)
+
+    def fill(add, history):
+        history.pop('BENCH', None)
+        start = time.perf_counter()
+        for message in messages:
+            add('BENCH', 'u', message)
+        return time.perf_counter() - start
+
+    for label, add, censor, history in (
+        ('antes', old_add, old_censor, old_history),
+        ('atual', chat.add_chat_message, chat.censor_text, chat_messages),
+    ):
+        best = min(fill(add, history) for _ in range(5))
+        dirty = min(timeit.repeat(lambda: censor(DIRTY), number=2000, repeat=5)) / 2000
+        clean = min(timeit.repeat(lambda: censor(CLEAN), number=2000, repeat=5)) / 2000
+        print(f'{label}: add {MESSAGES} msgs {best * 1000:5.0f} ms ({best / MESSAGES * 1e6:4.1f} us/msg)  '
+              f'censor_text com palavrão {dirty * 1e6:4.0f} us, limpa {clean * 1e6:4.0f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Conexão nova por chamada vs pool de conexões (user-002).
+
+get_account em 1k contas com um set_current_game a cada 10 leituras,
+primeiro com DB_POOL_SIZE=0 (abre e fecha a cada chamada, PRAGMAs de
+novo) e depois com o pool padrão.
+
+    python benchmarks/db_pool.py
+"""
+import os
+import time
+
+from _common import isolate
+
+ACCOUNTS = 1000
+OPS = int(os.environ.get('BENCH_OPS', '5000'))
+
+
+def _run(db):
+    start = time.perf_counter()
+    for i in range(OPS):
+        username = f'user{i % ACCOUNTS}'
+        db.get_account(username)
+        if i % 10 == 0:
+            db.set_current_game(username, 'R')
+    return OPS / (time.perf_counter() - start)
+
+
+def main():
+    isolate()
+    from twilight.config import DB_POOL_SIZE
+    from twilight.storage import db
+
+    db.init_db()
+    for i in range(ACCOUNTS):
+        db.create_account(f'user{i}', {'password': 'x'})
+
+    for label, size in (('conexão por chamada', 0), (f'pool ({DB_POOL_SIZE})', DB_POOL_SIZE)):
+        db.DB_POOL_SIZE = size
+        db.close_pool()
+        print(f'{label:20s} {_run(db):9,.0f} ops/s')
+
+
+if __name__ == '__main__':
+    main()
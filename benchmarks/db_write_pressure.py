@@ -0,0 +1,95 @@
+"""
+Latência de socket com o SQLite sob escrita pesada (user-003).
+
+Um worker gevent, como em produção. Um cliente Socket.IO pede
+get_game_state a cada PROBE_MS; a latência conta a partir do instante
+agendado, então parada do loop aparece como atraso. Fase 1 sem carga,
+fase 2 com WRITERS greenlets regravando ACCOUNTS contas (save_accounts)
+sem parar. Roda com o SQLite inline (DB_EXECUTOR_THREADS=0) e no pool
+nativo: no pool, a fase 2 deve ficar perto da fase 1.
+
+    python benchmarks/db_write_pressure.py
+"""
+from gevent import monkey
+
+monkey.patch_all()
+
+import os  # noqa: E402
+import time  # noqa: E402
+
+import gevent  # noqa: E402
+
+from _common import is_variant, isolate, run_variants, summarize  # noqa: E402
+
+ACCOUNTS = int(os.environ.get('BENCH_ACCOUNTS', '5000'))
+WRITERS = 2
+PHASE_SECONDS = float(os.environ.get('BENCH_SECONDS', '3'))
+PROBE_MS = 10
+
+
+def _probe(client, game_id, until):
+    """Latências (ms) de get_game_state medidas desde o envio agendado."""
+    samples = []
+    interval = PROBE_MS / 1000.0
+    scheduled = time.perf_counter()
+    while scheduled < until:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            gevent.sleep(delay)
+        client.emit('get_game_state', {'game_id': game_id})
+        received = client.get_received()
+        assert received and received[-1]['name'] in ('game_state', 'game_state_patch'), received
+        samples.append((time.perf_counter() - scheduled) * 1000)
+        scheduled += interval
+    return samples
+
+
+def _writer(db, accounts, until):
+    i = 0
+    while time.perf_counter() < until:
+        accounts[f'user{i % len(accounts)}']['current_game'] = f'R{i}'
+        db.save_accounts(accounts)
+        i += 1
+    return i
+
+
+def main():
+    # o probe pede estado 100x/s: sem limite de taxa aqui
+    isolate(STATE_RATE_PER_SEC=0)
+    from twilight import create_app
+    from twilight.extensions import socketio
+    from twilight.storage import db
+
+    app = create_app()
+    socketio.server.async_handlers = False
+
+    accounts = {f'user{i}': {'password': 'x', 'current_game': None} for i in range(ACCOUNTS)}
+    db.save_accounts(accounts)
+
+    http = app.test_client()
+    http.post('/api/register', json={'username': 'alice', 'password': 'pw1234'})
+    game_id = http.post('/api/create-game', json={}).json['game_id']
+    client = socketio.test_client(app, flask_test_client=http)
+    client.emit('join_game', {'game_id': game_id})
+    client.get_received()
+
+    idle = _probe(client, game_id, time.perf_counter() + PHASE_SECONDS)
+
+    until = time.perf_counter() + PHASE_SECONDS
+    writers = [gevent.spawn(_writer, db, accounts, until) for _ in range(WRITERS)]
+    loaded = _probe(client, game_id, until)
+    gevent.joinall(writers, raise_error=True)
+    saves = sum(w.value for w in writers)
+
+    print(f'  sem carga:   {summarize(idle)}')
+    print(f'  com escrita: {summarize(loaded)}  ({saves} save_accounts de {ACCOUNTS} contas)')
+
+
+if __name__ == '__main__':
+    if is_variant():
+        main()
+    else:
+        run_variants(__file__, [
+            ('inline (DB_EXECUTOR_THREADS=0)', {'DB_EXECUTOR_THREADS': 0}),
+            ('pool nativo (DB_EXECUTOR_THREADS=4)', {'DB_EXECUTOR_THREADS': 4}),
+        ])
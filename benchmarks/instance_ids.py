@@ -0,0 +1,42 @@
+"""
+Custo de gerar instance_id de carta (user-016).
+
+Compara str(uuid.uuid4())[:8] (o anterior) com new_instance_id() do
+processo e com o InstanceIdSource de uma partida, e confere que
+UNIQUE ids seguidos de cada fonte são distintos.
+
+    python benchmarks/instance_ids.py
+"""
+import os
+import timeit
+import uuid
+
+from _common import isolate
+
+CALLS = int(os.environ.get('BENCH_CALLS', '200000'))
+UNIQUE = 1_000_000
+
+
+def main():
+    isolate()
+    from twilight.cards.ids import InstanceIdSource, new_instance_id
+
+    game_ids = InstanceIdSource('3fa9')
+    sources = (
+        ('str(uuid4())[:8]', lambda: str(uuid.uuid4())[:8]),
+        ('new_instance_id()', new_instance_id),
+        ('InstanceIdSource()', game_ids),
+    )
+    base = None
+    for label, fn in sources:
+        per_call = min(timeit.repeat(fn, number=CALLS, repeat=3)) / CALLS
+        base = base or per_call
+        print(f'{label:20s} {per_call * 1e9:6.0f} ns  ({base / per_call:4.1f}x)')
+
+    for label, fn in sources[1:]:
+        assert len({fn() for _ in range(UNIQUE)}) == UNIQUE, label
+    print(f'{UNIQUE:,} ids seguidos distintos em new_instance_id() e InstanceIdSource()')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Rajada de logins num worker gevent (user-007).
+
+LOGINS logins simultâneos em /api/login enquanto um greenlet mede o
+atraso de gevent.sleep(5 ms), a folga que sobra para os sockets. Roda
+com o hash inline (PASSWORD_HASH_THREADS=0), no pool nativo com fila
+grande e no pool com a fila padrão (excedente vira 503 rápido).
+
+    python benchmarks/login_storm.py
+"""
+from gevent import monkey
+
+monkey.patch_all()
+
+import os  # noqa: E402
+import time  # noqa: E402
+
+import gevent  # noqa: E402
+
+from _common import is_variant, isolate, run_variants, summarize  # noqa: E402
+
+LOGINS = int(os.environ.get('BENCH_LOGINS', '40'))
+TICK = 0.005
+
+
+def main():
+    isolate()
+    from twilight import create_app
+    from twilight.auth import passwords
+
+    app = create_app()
+    app.test_client().post('/api/register', json={'username': 'alice', 'password': 'pw1234'})
+
+    lag = []
+    codes = {}
+    done = []
+
+    def ticker():
+        while not done:
+            start = time.perf_counter()
+            gevent.sleep(TICK)
+            lag.append((time.perf_counter() - start - TICK) * 1000)
+
+    def login():
+        response = app.test_client().post('/api/login', json={'username': 'alice', 'password': 'pw1234'})
+        codes[response.status_code] = codes.get(response.status_code, 0) + 1
+
+    tick = gevent.spawn(ticker)
+    gevent.sleep(0.02)
+    start = time.perf_counter()
+    gevent.joinall([gevent.spawn(login) for _ in range(LOGINS)])
+    elapsed = time.perf_counter() - start
+    done.append(True)
+    tick.join()
+
+    ok = codes.get(200, 0)
+    print(f'  threads={passwords.PASSWORD_HASH_THREADS} fila={passwords.PASSWORD_QUEUE_LIMIT}: '
+          f'{LOGINS} logins em {elapsed:.2f}s, status={codes}, ok/s={ok / elapsed:.0f}')
+    print(f'  atraso do loop: {summarize(lag)}')
+
+
+if __name__ == '__main__':
+    if is_variant():
+        main()
+    else:
+        run_variants(__file__, [
+            ('hash inline', {'PASSWORD_HASH_THREADS': 0, 'PASSWORD_QUEUE_LIMIT': 1000}),
+            ('pool 2 threads, fila grande', {'PASSWORD_HASH_THREADS': 2, 'PASSWORD_QUEUE_LIMIT': 1000}),
+            ('pool 2 threads, fila 8 (padrão)', {'PASSWORD_HASH_THREADS': 2, 'PASSWORD_QUEUE_LIMIT': 8}),
+        ])
@@ -0,0 +1,107 @@
+"""
+Fan-out do game_state para 12 viewers (user-013).
+
+Mesa de 12 jogadores com todas as bases ocupadas (um terço das defesas
+são armadilhas disfarçadas), com e sem fog_of_war. Mede build_game_state
+para todos os viewers com o get_card_for_player atual e com a versão de
+antes (copiada abaixo: uma cópia da carta por viewer não dono).
+
+    python benchmarks/state_fanout.py
+"""
+import random
+import timeit
+import types
+
+from _common import isolate
+
+PLAYERS = 12
+ROUNDS = 100
+REPEAT = 15
+
+
+def _copy_per_viewer(self, card, viewer_username, owner_username):
+    """get_card_for_player antes do user-013 (cópia por chamada, sem cache)."""
+    if viewer_username == owner_username:
+        if card.get('is_disguised'):
+            display_card = card.copy()
+            display_card['type'] = 'trap'
+            display_card['is_trap'] = True
+            display_card.pop('disguise', None)
+            display_card.pop('is_disguised', None)
+            return display_card
+        return card
+    if card.get('is_disguised') and card.get('disguise'):
+        display = card['disguise'].copy()
+        display['instance_id'] = card['instance_id']
+        display['is_disguised'] = True
+        display['is_trap'] = False
+    else:
+        display = card.copy() if isinstance(card, dict) else card
+    if 'fog_of_war' in self.modifiers and display:
+        return {
+            'instance_id': display.get('instance_id') or card.get('instance_id'),
+            'type': 'creature' if display.get('type') in ('creature', 'trap', None) else display.get('type', 'creature'),
+            'name': '???',
+            'id': 'fog',
+            'fog': True,
+            'life': None,
+            'attack': None,
+        }
+    return display
+
+
+def _board(Game, get_random_disguise, modifiers):
+    game = Game('BENCH', 'u0', {'max_players': PLAYERS, 'modifiers': modifiers}, seed=3)
+    for i in range(PLAYERS):
+        game.add_player(f's{i}', f'u{i}')
+    game.started = True
+    rng = random.Random(3)
+    creatures = [card for card in game.deck if card.get('type') == 'creature']
+    traps = [card for card in game.deck if card.get('type') == 'trap']
+    for i in range(PLAYERS):
+        player = game.player_data[f'u{i}']
+        for slot in range(len(player['attack_bases'])):
+            player['attack_bases'][slot] = creatures.pop()
+        for slot in range(len(player['defense_bases'])):
+            if slot % 3 == 0 and traps:
+                trap = traps.pop()
+                trap['disguise'] = get_random_disguise(rng)
+                trap['is_disguised'] = True
+                player['defense_bases'][slot] = trap
+            else:
+                player['defense_bases'][slot] = creatures.pop()
+    return game
+
+
+def main():
+    isolate()
+    from twilight.cards.deck import get_random_disguise
+    from twilight.game.engine import Game
+    from twilight.game.view import build_game_state
+
+    for modifiers in ([], ['fog_of_war']):
+        game = _board(Game, get_random_disguise, modifiers)
+        viewers = [f'u{i}' for i in range(PLAYERS)]
+
+        def fan_out():
+            for viewer in viewers:
+                build_game_state(game, game.game_id, viewer)
+
+        label = 'fog_of_war' if modifiers else 'normal'
+        legacy = types.MethodType(_copy_per_viewer, game)
+        best = {}
+        # modos intercalados: ruído do host pesa igual nos dois
+        for _ in range(REPEAT):
+            for mode in ('cópia por viewer', 'atual'):
+                if mode == 'cópia por viewer':
+                    game.get_card_for_player = legacy
+                else:
+                    del game.get_card_for_player
+                elapsed = timeit.timeit(fan_out, number=ROUNDS) / ROUNDS
+                best[mode] = min(best.get(mode, elapsed), elapsed)
+        for mode, per_round in best.items():
+            print(f'{label:10s} {mode:16s} {per_round * 1000:5.2f} ms por fan-out')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+get_current_user com e sem o cache de verificação do JWT (user-005).
+
+N chamadas dentro de um request com o cookie auth_token, primeiro com o
+cache desligado (JWT_CACHE_SIZE=0, decode + HMAC a cada chamada) e
+depois com o LRU padrão.
+
+    python benchmarks/token_cache.py
+"""
+import os
+import time
+
+from _common import isolate
+
+CALLS = int(os.environ.get('BENCH_CALLS', '100000'))
+
+
+def main():
+    isolate()
+    from flask import Flask
+
+    from twilight.auth import service
+    from twilight.config import JWT_CACHE_SIZE
+
+    app = Flask(__name__)
+    token = service.create_token('alice')
+    with app.test_request_context(headers={'Cookie': f'auth_token={token}'}):
+        for label, size in (('sem cache', 0), (f'LRU ({JWT_CACHE_SIZE})', JWT_CACHE_SIZE)):
+            service.JWT_CACHE_SIZE = size
+            service.clear_token_cache()
+            start = time.perf_counter()
+            for _ in range(CALLS):
+                assert service.get_current_user() == 'alice'
+            elapsed = time.perf_counter() - start
+            print(f'{label:12s} {elapsed * 1000:6.0f} ms ({elapsed / CALLS * 1e6:5.2f} us/chamada) '
+                  f'{service.token_cache_stats()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Cache de contas: LRU limitado que nunca descarta ponteiro não gravado."""
+import os
+import tempfile
+
+os.environ.setdefault('DATA_DIR', tempfile.mkdtemp())
+os.environ.setdefault('DATABASE_PATH', os.path.join(os.environ['DATA_DIR'], 'database.db'))
+
+import pytest  # noqa: E402
+
+from twilight.storage import account_cache, db  # noqa: E402
+
+SIZE = 4
+
+
+@pytest.fixture
+def small_cache(monkeypatch):
+    # sem timer: o teste decide quando gravar
+    monkeypatch.setattr(account_cache, 'ACCOUNT_FLUSH_MS', 10 ** 9)
+    monkeypatch.setattr(account_cache, 'ACCOUNT_CACHE_SIZE', SIZE)
+    account_cache.invalidate()
+    yield
+    account_cache.invalidate()
+
+
+def test_clean_entries_are_evicted_and_dirty_ones_wait_for_flush(small_cache):
+    names = [f'lru{i}' for i in range(12)]
+    for name in names:
+        db.create_account(name, {'password': 'x'})
+
+    # 6 ponteiros pendentes: acima do limite, mas nenhum pode sair ainda
+    for name in names[:6]:
+        assert account_cache.set_current_game(name, 'ROOM')
+    assert len(account_cache._accounts) == 6
+
+    # leituras de contas limpas não fazem o cache crescer: só fica a última lida
+    for name in names[6:]:
+        assert account_cache.get_account(name)['current_game'] is None
+    assert set(account_cache._accounts) == {account_cache._key(n) for n in names[:6] + names[-1:]}
+
+    account_cache.flush()
+    assert len(account_cache._accounts) == SIZE
+
+    # quem saiu volta do SQLite com o ponteiro gravado
+    for name in names[:6]:
+        assert account_cache.get_account(name)['current_game'] == 'ROOM'
+        assert len(account_cache._accounts) <= SIZE
+    assert db.get_account(names[0])['current_game'] == 'ROOM'
+
+    # limpar uma conta já descartada recarrega e marca suja
+    account_cache.invalidate()
+    assert account_cache.clear_current_game(names[0], 'ROOM')
+    account_cache.flush()
+    assert db.get_account(names[0])['current_game'] is None
+
+
+def test_recently_used_entries_stay(small_cache):
+    names = [f'hot{i}' for i in range(SIZE + 2)]
+    for name in names:
+        db.create_account(name, {'password': 'x'})
+    for name in names[:SIZE]:
+        account_cache.get_account(name)
+    # toca a mais antiga: a próxima a sair é a segunda
+    account_cache.get_account(names[0])
+    account_cache.get_account(names[SIZE])
+    cached = set(account_cache._accounts)
+    assert account_cache._key(names[0]) in cached
+    assert account_cache._key(names[1]) not in cached
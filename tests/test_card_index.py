@@ -0,0 +1,55 @@
+"""Índice instance_id -> (zona, dono, slot) continua exato após mover cartas."""
+import os
+import tempfile
+
+os.environ.setdefault('DATA_DIR', tempfile.mkdtemp())
+os.environ.setdefault('DATABASE_PATH', os.path.join(os.environ['DATA_DIR'], 'database.db'))
+
+import pytest  # noqa: E402
+
+from twilight import create_app  # noqa: E402
+from twilight.cards.definitions import CARDS  # noqa: E402
+from twilight.cards.instance import CardInstance  # noqa: E402
+from twilight.game.engine import Game  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def app():
+    return create_app()
+
+
+def _creature(game, card_id):
+    return CardInstance(CARDS[card_id], game.new_instance_id())
+
+
+def test_feitico_troca_keeps_index(app):
+    with app.app_context():
+        game = Game('IDX1', 'alice', {'max_players': 2}, seed=7)
+        game.add_player('s1', 'alice')
+        game.add_player('s2', 'bob')
+        game.start()
+
+        bob = game.player_data['bob']
+        attack_bases, defense_bases = bob['attack_bases'], bob['defense_bases']
+        elfo, orc, zumbi = (_creature(game, cid) for cid in ('elfo', 'orc', 'zumbi'))
+        attack_bases[0] = elfo
+        defense_bases[1] = orc
+        defense_bases[4] = zumbi
+        assert game.check_card_index() == []
+
+        result = game.apply_spell_effect({'id': 'feitico_troca'}, 'alice', 'bob')
+        assert result['type'] == 'swap'
+        # as zonas continuam as mesmas (ligadas ao índice), só o conteúdo trocou
+        assert bob['attack_bases'] is attack_bases
+        assert bob['defense_bases'] is defense_bases
+        assert attack_bases[1] is orc and attack_bases[4] is zumbi
+        assert defense_bases[0] is elfo
+        assert game.check_card_index() == []
+        assert game._find_card_on_field(orc['instance_id'])[1:3] == ('attack_bases', 1)
+        assert game._find_card_on_field(elfo['instance_id'])[1:3] == ('defense_bases', 0)
+
+        # movimentos seguintes não herdam divergência
+        attack_bases[4] = None
+        defense_bases[2] = zumbi
+        game.process_player_death('bob')
+        assert game.check_card_index() == []
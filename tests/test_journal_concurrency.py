@@ -0,0 +1,58 @@
+"""Edições concorrentes do journal não se sobrescrevem (escrita por linha)."""
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('DATA_DIR', tempfile.mkdtemp())
+os.environ.setdefault('DATABASE_PATH', os.path.join(os.environ['DATA_DIR'], 'database.db'))
+
+from twilight.storage import db  # noqa: E402
+
+WORKERS = 8
+INSERTS = 24
+BASE = 4
+
+
+def _version_counter():
+    version, _mtime = db.journal_version()
+    return int(version.rsplit('.', 1)[1])
+
+
+def test_concurrent_inserts_and_updates_keep_every_write():
+    base_ids = [
+        db.insert_journal_entry({'id': f'cc-base-{i}', 'version': f'b{i}', 'title': 'base'})['id']
+        for i in range(BASE)
+    ]
+    before_ids = {entry['id'] for entry in db.load_journal()}
+    before_version = _version_counter()
+
+    def insert(i):
+        # mesmo id numérico em todas: o banco avança para o próximo livre
+        return db.insert_journal_entry({'id': '1700000000000', 'version': f'n{i}', 'title': f'novo {i}'})
+
+    def update(i):
+        # 1ª rodada muda a descrição, 2ª o título das mesmas entradas
+        field = 'title' if i >= BASE else 'description'
+        return db.update_journal_entry(base_ids[i % BASE], {field: f'{field} {i}'})
+
+    jobs = [(insert, i) for i in range(INSERTS)] + [(update, i) for i in range(2 * BASE)]
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(lambda job: job[0](job[1]), jobs))
+
+    assert all(results)
+    inserted = [entry['id'] for entry in results[:INSERTS]]
+    assert len(set(inserted)) == INSERTS
+
+    after = {entry['id']: entry for entry in db.load_journal()}
+    # nenhuma inserção perdida nem entrada antiga apagada
+    assert set(after) == before_ids | set(inserted)
+    assert sorted(after[eid]['title'] for eid in inserted) == sorted(f'novo {i}' for i in range(INSERTS))
+
+    # cada entrada base recebeu um título e uma descrição: as duas alterações ficam
+    for n, eid in enumerate(base_ids):
+        entry = after[eid]
+        assert entry['description'] == f'description {n}'
+        assert entry['title'] == f'title {n + BASE}'
+
+    # uma versão por escrita, sem pular nem repetir
+    assert _version_counter() == before_version + len(jobs)
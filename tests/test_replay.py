@@ -0,0 +1,81 @@
+"""Replay determinístico: leituras no meio da partida não podem desalinhar o log."""
+import os
+import tempfile
+
+os.environ.setdefault('DATA_DIR', tempfile.mkdtemp())
+os.environ.setdefault('DATABASE_PATH', os.path.join(os.environ['DATA_DIR'], 'database.db'))
+
+import pytest  # noqa: E402
+
+from twilight import create_app  # noqa: E402
+from twilight.game import ai  # noqa: E402
+from twilight.game.engine import Game  # noqa: E402
+from twilight.game.replay import export_log, replay_game  # noqa: E402
+from twilight.game.view import build_game_state  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def app():
+    return create_app()
+
+
+def _fingerprint(game):
+    states = {}
+    for uname in game.players:
+        state = build_game_state(game, game.game_id, uname)
+        # contador de transporte (sobe também fora do engine)
+        state.pop('state_version', None)
+        states[uname] = state
+    return {
+        'states': states,
+        'graveyard': [card.get('instance_id') for card in game.graveyard],
+        'deck': len(game.deck),
+        'turn': game.current_turn,
+        'finished': game.finished,
+    }
+
+
+def _read_only_views(game):
+    """Tudo que clientes/admin consultam sem gravar ação."""
+    game.get_graveyard_cards()
+    for uname in game.players:
+        build_game_state(game, game.game_id, uname)
+        game.get_available_rituals(uname)
+        game.get_max_actions(uname)
+        game.get_player_runes_count(uname)
+        game.get_player_talismans_count(uname)
+    game.check_card_index()
+    export_log(game)
+
+
+def test_replay_matches_after_read_only_views(app):
+    with app.app_context():
+        game = Game('RPLY', 'alice', {'max_players': 3}, seed=20240611)
+        game.add_player('s1', 'alice')
+        game.add_player('s2', 'bob')
+        game.add_player('s3', 'carol')
+        game.start()
+
+        saw_graveyard = False
+        for _turn in range(90):
+            if game.finished or game.check_winner():
+                break
+            current = game.players[game.current_turn]
+            for step in ai.plan_easy_actions(game, current):
+                ok, _result, _log = ai._run_one_action(game, current, step)
+                if ok and step.get('action') != 'end_turn':
+                    game.register_action(current, step['action'])
+                saw_graveyard = saw_graveyard or bool(game.graveyard)
+                _read_only_views(game)
+                if game.finished or game.players[game.current_turn] != current:
+                    break
+            else:
+                game.next_turn()
+
+        assert saw_graveyard, 'a partida não chegou a usar o cemitério'
+        assert game.check_card_index() == []
+
+        replayed = replay_game(export_log(game))
+        assert _fingerprint(replayed) == _fingerprint(game)
+        # contadores de id alinhados: a próxima carta teria o mesmo id
+        assert replayed.new_instance_id() == game.new_instance_id()
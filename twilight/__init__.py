@@ -19,6 +19,7 @@ def create_app():
     """Cria e configura a app Flask com rotas e sockets."""
     from flask import Flask
 
+    from twilight.cards.codec import CardJSONProvider
     from twilight.routes import register_blueprints
     from twilight.sockets import register_socket_handlers
 
@@ -43,6 +44,7 @@ def create_app():
         static_folder=os.path.join(_PROJECT_ROOT, 'static'),
         static_url_path='/static',
     )
+    app.json = CardJSONProvider(app)
     app.config['SECRET_KEY'] = SECRET_KEY
     app.config['JWT_SECRET'] = JWT_SECRET
     app.config['JWT_EXPIRATION_HOURS'] = JWT_EXPIRATION_HOURS
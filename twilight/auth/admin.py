@@ -3,24 +3,26 @@ from functools import wraps
 
 from flask import jsonify
 
-from twilight.auth.service import get_current_user, load_accounts
+from twilight.auth.service import get_account, get_current_user
 
 def is_admin(username):
     """Verifica se um usuário é admin (level >= 1)"""
     if not username:
         return False
-    accounts = load_accounts()
-    if username not in accounts:
+    account = get_account(username)
+    if account is None:
         return False
     # Admin level 1+ tem acesso ao painel
-    return accounts[username].get('admin_level', 0) >= 1
+    return account.get('admin_level', 0) >= 1
 
 def is_super_admin(username):
     """Verifica se é super admin (level >= 4)"""
     if not username:
         return False
-    accounts = load_accounts()
-    return accounts[username].get('admin_level', 0) >= 4
+    account = get_account(username)
+    if account is None:
+        return False
+    return account.get('admin_level', 0) >= 4
 
 def admin_required(f):
     """Decorator para rotas que exigem admin"""
@@ -0,0 +1,93 @@
+"""
+Hash de senhas (PBKDF2) fora do loop do gevent.
+
+Formato: pbkdf2_sha256$<iterações>$<salt>$<hash>. O formato antigo
+<salt>$<hash> (100k iterações) continua aceito e é migrado no login.
+O pool é limitado: com PASSWORD_HASH_THREADS ocupadas e
+PASSWORD_QUEUE_LIMIT esperando, novos pedidos falham com PasswordPoolBusy.
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+import secrets
+from typing import Optional
+
+from twilight.config import (
+    PASSWORD_HASH_THREADS,
+    PASSWORD_ITERATIONS,
+    PASSWORD_QUEUE_LIMIT,
+)
+from twilight.storage.executor import NativePool, native_lock
+
+_SCHEME = 'pbkdf2_sha256'
+_LEGACY_ITERATIONS = 100000
+
+_pool = NativePool(PASSWORD_HASH_THREADS)
+_inflight = 0
+_inflight_lock = native_lock()
+
+
+class PasswordPoolBusy(RuntimeError):
+    """Pool de hash saturado — o chamador deve responder 503."""
+
+
+def _pbkdf2(password: str, salt: str, iterations: int) -> str:
+    return hashlib.pbkdf2_hmac(
+        'sha256',
+        password.encode('utf-8'),
+        salt.encode('utf-8'),
+        iterations,
+    ).hex()
+
+
+def _run(fn, *args):
+    """Executa no pool respeitando o limite de fila."""
+    global _inflight
+    limit = max(1, PASSWORD_HASH_THREADS) + max(0, PASSWORD_QUEUE_LIMIT)
+    with _inflight_lock:
+        if _inflight >= limit:
+            raise PasswordPoolBusy('pool de senhas saturado')
+        _inflight += 1
+    try:
+        return _pool.run(fn, *args)
+    finally:
+        with _inflight_lock:
+            _inflight -= 1
+
+
+def _parse(hashed: str) -> Optional[tuple]:
+    """(iterações, salt, hash) ou None se o formato for desconhecido."""
+    parts = (hashed or '').split('$')
+    if len(parts) == 2:
+        return _LEGACY_ITERATIONS, parts[0], parts[1]
+    if len(parts) == 4 and parts[0] == _SCHEME:
+        try:
+            return int(parts[1]), parts[2], parts[3]
+        except ValueError:
+            return None
+    return None
+
+
+def hash_password(password: str, iterations: Optional[int] = None) -> str:
+    iterations = iterations or PASSWORD_ITERATIONS
+    salt = secrets.token_hex(16)
+    password_hash = _run(_pbkdf2, password, salt, iterations)
+    return f"{_SCHEME}${iterations}${salt}${password_hash}"
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    parsed = _parse(hashed)
+    if parsed is None:
+        return False
+    iterations, salt, password_hash = parsed
+    check_hash = _run(_pbkdf2, password, salt, iterations)
+    return hmac.compare_digest(check_hash, password_hash)
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True se o hash é legado ou usa menos iterações que PASSWORD_ITERATIONS."""
+    parsed = _parse(hashed)
+    if parsed is None:
+        return False
+    return len((hashed or '').split('$')) == 2 or parsed[0] < PASSWORD_ITERATIONS
@@ -1,42 +1,38 @@
 """Contas, senhas, JWT e usuário atual."""
-import hashlib
-import hmac
-import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from functools import wraps
 
 import jwt
 from flask import redirect, request
 
+from twilight.auth.passwords import (
+    PasswordPoolBusy,
+    hash_password,
+    needs_rehash,
+    verify_password,
+)
 from twilight.config import (
     JWT_ALGORITHM,
+    JWT_CACHE_SIZE,
     JWT_EXPIRATION_HOURS,
     JWT_SECRET,
 )
-from twilight.storage.db import load_accounts, save_accounts
-
 # reexport para imports legados: from twilight.auth.service import load_accounts
-def hash_password(password):
-    salt = secrets.token_hex(16)
-    password_hash = hashlib.pbkdf2_hmac(
-        'sha256',
-        password.encode('utf-8'),
-        salt.encode('utf-8'),
-        100000
-    ).hex()
-    return f"{salt}${password_hash}"
-def verify_password(password, hashed):
-    try:
-        salt, password_hash = hashed.split('$')
-        check_hash = hashlib.pbkdf2_hmac(
-            'sha256',
-            password.encode('utf-8'),
-            salt.encode('utf-8'),
-            100000
-        ).hex()
-        return hmac.compare_digest(check_hash, password_hash)
-    except:
-        return False
+from twilight.storage.account_cache import (
+    clear_current_game,
+    clear_current_game_for_room,
+    create_account,
+    get_account,
+    load_accounts,
+    patch_account_meta,
+    save_accounts,
+    set_current_game,
+    set_password,
+)
+
 def create_token(username):
     payload = {
         'username': username,
@@ -44,14 +40,61 @@ def create_token(username):
         'iat': datetime.utcnow()
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
-def verify_token(token):
+
+# LRU de tokens já verificados: token -> (username, exp)
+_token_cache = OrderedDict()
+_token_cache_lock = threading.Lock()
+_token_cache_stats = {'hits': 0, 'misses': 0}
+
+def _decode_token(token):
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload['username']
+        return payload['username'], payload.get('exp')
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
         return None
+    except KeyError:
+        return None
+
+def verify_token(token):
+    """Username do token (ou None). Tokens válidos ficam no LRU até o exp."""
+    if not token:
+        return None
+    if JWT_CACHE_SIZE <= 0:
+        decoded = _decode_token(token)
+        return decoded[0] if decoded else None
+    now = time.time()
+    with _token_cache_lock:
+        cached = _token_cache.get(token)
+        if cached is not None:
+            username, exp = cached
+            if exp is None or exp > now:
+                _token_cache.move_to_end(token)
+                _token_cache_stats['hits'] += 1
+                return username
+            del _token_cache[token]
+        _token_cache_stats['misses'] += 1
+    decoded = _decode_token(token)
+    if decoded is None:
+        return None
+    with _token_cache_lock:
+        _token_cache[token] = decoded
+        _token_cache.move_to_end(token)
+        while len(_token_cache) > JWT_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return decoded[0]
+
+def token_cache_stats():
+    """Contadores do cache de JWT (hits, misses, size)."""
+    with _token_cache_lock:
+        return dict(_token_cache_stats, size=len(_token_cache))
+
+def clear_token_cache():
+    with _token_cache_lock:
+        _token_cache.clear()
+        _token_cache_stats['hits'] = 0
+        _token_cache_stats['misses'] = 0
 
 def get_current_user():
     token = request.cookies.get('auth_token')
@@ -61,20 +104,11 @@ def get_current_user():
 
 def update_user_game(username, game_id):
     """Atualiza o jogo atual do usuário"""
-    accounts = load_accounts()
-    if username in accounts:
-        accounts[username]['current_game'] = game_id
-        save_accounts(accounts)
+    set_current_game(username, game_id)
 
 def clear_user_game(username, game_id=None):
     """Remove current_game da conta (opcionalmente só se for o game_id)."""
-    accounts = load_accounts()
-    if username not in accounts:
-        return
-    current = accounts[username].get('current_game')
-    if game_id is None or current == game_id:
-        accounts[username]['current_game'] = None
-        save_accounts(accounts)
+    clear_current_game(username, game_id)
 
 def clear_game_from_all_accounts(game_id, usernames=None):
     """
@@ -83,21 +117,7 @@ def clear_game_from_all_accounts(game_id, usernames=None):
     """
     if not game_id:
         return
-    accounts = load_accounts()
-    changed = False
-    if usernames is None:
-        # limpa qualquer conta apontando para essa sala
-        for uname, data in accounts.items():
-            if data.get('current_game') == game_id:
-                accounts[uname]['current_game'] = None
-                changed = True
-    else:
-        for uname in usernames:
-            if uname in accounts and accounts[uname].get('current_game') == game_id:
-                accounts[uname]['current_game'] = None
-                changed = True
-    if changed:
-        save_accounts(accounts)
+    clear_current_game_for_room(game_id, usernames)
 
 def login_required(f):
     @wraps(f)
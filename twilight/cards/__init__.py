@@ -2,11 +2,17 @@
 
 from twilight.cards.deck import create_deck, get_random_disguise
 from twilight.cards.definitions import CARDS, DISGUISE_OPTIONS, MODIFIERS
+from twilight.cards.ids import new_instance_id
+from twilight.cards.instance import CardInstance
+from twilight.cards.zone import CardZone
 
 __all__ = [
     'CARDS',
+    'CardInstance',
+    'CardZone',
     'DISGUISE_OPTIONS',
     'MODIFIERS',
     'create_deck',
     'get_random_disguise',
+    'new_instance_id',
 ]
@@ -0,0 +1,36 @@
+"""JSON que entende CardInstance e deque (Socket.IO e jsonify)."""
+from __future__ import annotations
+
+import json
+from collections import deque
+
+from flask.json.provider import DefaultJSONProvider
+
+from twilight.cards.instance import CardInstance, json_default
+
+
+def _default(obj):
+    # histórico do chat é um deque (ring buffer): sai como lista
+    if isinstance(obj, deque):
+        return list(obj)
+    return json_default(obj)
+
+
+def dumps(obj, *args, **kwargs) -> str:
+    kwargs.setdefault('default', _default)
+    return json.dumps(obj, *args, **kwargs)
+
+
+loads = json.loads
+
+
+class CardJSONProvider(DefaultJSONProvider):
+    """Provider do Flask: cartas saem como dict em jsonify."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, CardInstance):
+            return o.to_dict()
+        if isinstance(o, deque):
+            return list(o)
+        return DefaultJSONProvider.default(o)
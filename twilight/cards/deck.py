@@ -1,11 +1,12 @@
 """Construção e embaralhamento do baralho."""
 import random
-import uuid
 
 from twilight.cards.definitions import CARDS, DISGUISE_OPTIONS
+from twilight.cards.ids import new_instance_id
+from twilight.cards.instance import CardInstance
 
-def get_random_disguise():
-    disguise = random.choice(DISGUISE_OPTIONS)
+def get_random_disguise(rng=random):
+    disguise = rng.choice(DISGUISE_OPTIONS)
     return {
         'id': disguise['id'],
         'name': disguise['name'],
@@ -19,9 +20,9 @@ def get_random_disguise():
     }
 
 
-def create_deck(modifiers=None):
-    modifiers = modifiers or []
-    deck = []
+def _deck_counts(modifiers):
+    """Quantas cópias de cada carta entram no baralho com esses modificadores."""
+    counts = {}
     for card_id, card_info in CARDS.items():
         # filtros de modificador
         if 'disable_traps' in modifiers and card_info.get('type') == 'trap':
@@ -34,10 +35,117 @@ def create_deck(modifiers=None):
             continue
         if 'no_legendaries' in modifiers and card_info.get('count', 0) == 1:
             continue
+        if card_info['count'] > 0:
+            counts[card_id] = card_info['count']
+    return counts
 
-        for _ in range(card_info['count']):
-            new_card = card_info.copy()
-            new_card['instance_id'] = str(uuid.uuid4())[:8]
-            deck.append(new_card)
-    random.shuffle(deck)
-    return deck
+
+class LazyDeck:
+    """
+    Baralho embaralhado que só cria a carta quando ela é comprada.
+
+    Guarda quantas cópias de cada carta ainda faltam; pop() sorteia entre
+    todas as cartas restantes com a mesma chance de um baralho embaralhado
+    e cria a CardInstance nessa hora. Cartas devolvidas (append) vão para
+    o topo, como numa lista; shuffle() as mistura de volta. Índices e
+    fatias (peek do admin) revelam só as cartas necessárias do topo.
+
+    Convenção de lista mantida: o topo é o fim (deck[-1] é a próxima).
+    Sorteios usam `rng` e ids vêm de `new_id` (os do Game, para replay).
+    """
+
+    def __init__(self, counts, rng=random, new_id=new_instance_id):
+        self._rng = rng
+        self._new_id = new_id
+        self._counts = dict(counts)
+        self._unminted = sum(self._counts.values())
+        # cartas já reveladas, em ordem (fim = próxima compra)
+        self._top = []
+        # cartas devolvidas e embaralhadas (posição ainda não sorteada)
+        self._loose = []
+
+    def __len__(self):
+        return len(self._top) + len(self._loose) + self._unminted
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def _draw_random(self):
+        """Tira uma carta uniforme entre as não reveladas."""
+        pool = len(self._loose) + self._unminted
+        if pool <= 0:
+            raise IndexError('pop from empty deck')
+        r = self._rng.randrange(pool)
+        if r < len(self._loose):
+            loose = self._loose
+            loose[r], loose[-1] = loose[-1], loose[r]
+            return loose.pop()
+        r -= len(self._loose)
+        for card_id, count in self._counts.items():
+            if r < count:
+                break
+            r -= count
+        if count == 1:
+            del self._counts[card_id]
+        else:
+            self._counts[card_id] = count - 1
+        self._unminted -= 1
+        return CardInstance(CARDS[card_id], self._new_id())
+
+    def pop(self, index=-1):
+        if index != -1:
+            self._reveal_all()
+            return self._top.pop(index)
+        if self._top:
+            return self._top.pop()
+        return self._draw_random()
+
+    def append(self, card):
+        """Põe a carta no topo (próxima compra), como list.append."""
+        self._top.append(card)
+
+    def shuffle(self):
+        """Devolve as cartas reveladas ao sorteio (equivale a random.shuffle)."""
+        self._loose.extend(self._top)
+        self._top = []
+
+    def _reveal(self, n):
+        """Garante as n cartas do topo reveladas (n <= len)."""
+        missing = min(n, len(self)) - len(self._top)
+        if missing > 0:
+            under = [self._draw_random() for _ in range(missing)]
+            # as sorteadas agora ficam abaixo das já reveladas
+            under.reverse()
+            self._top[:0] = under
+
+    def _reveal_all(self):
+        self._reveal(len(self))
+
+    def __getitem__(self, index):
+        size = len(self)
+        if isinstance(index, slice):
+            positions = range(*index.indices(size))
+            if not positions:
+                return []
+            self._reveal(size - min(positions[0], positions[-1]))
+            offset = size - len(self._top)
+            return [self._top[i - offset] for i in positions]
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError('deck index out of range')
+        self._reveal(size - index)
+        return self._top[index - (size - len(self._top))]
+
+    def __setitem__(self, index, card):
+        # random.shuffle(deck) e afins: revela tudo e vira lista comum
+        self._reveal_all()
+        self._top[index] = card
+
+    def __iter__(self):
+        self._reveal_all()
+        return iter(list(self._top))
+
+
+def create_deck(modifiers=None, rng=random, new_id=new_instance_id):
+    return LazyDeck(_deck_counts(modifiers or []), rng, new_id)
@@ -0,0 +1,43 @@
+"""
+instance_id das cartas: contador do processo com prefixo aleatório.
+
+Substitui str(uuid.uuid4())[:8] (urandom + formatação do UUID por carta,
+e 8 hex colidem num processo que roda muito tempo). new_instance_id() é
+único no processo; o prefixo evita reaproveitar ids de antes de um
+restart em clientes que ainda têm a página aberta.
+
+Cartas de uma partida usam o InstanceIdSource do Game (ver abaixo),
+cujos ids são únicos só dentro da partida.
+"""
+from __future__ import annotations
+
+import itertools
+import os
+
+_PREFIX = os.urandom(2).hex()
+_counter = itertools.count(1)
+
+
+def new_instance_id() -> str:
+    """Id curto e único no processo (ex.: '3fa9-1c')."""
+    return f'{_PREFIX}-{next(_counter):x}'
+
+
+class InstanceIdSource:
+    """
+    Ids de uma partida: prefixo fixo + contador próprio. Com o prefixo
+    derivado da seed, o replay da partida gera exatamente os mesmos ids
+    que o log de ações referencia.
+
+    Únicos por partida, não no processo: o prefixo tem só 16 bits da
+    seed, então duas salas podem gerar os mesmos ids. Índice de cartas,
+    ações e clientes resolvem ids sempre dentro de uma sala.
+    """
+    __slots__ = ('prefix', '_counter')
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._counter = itertools.count(1)
+
+    def __call__(self) -> str:
+        return f'{self.prefix}-{next(self._counter):x}'
@@ -0,0 +1,190 @@
+"""
+Carta em jogo: estado mutável da cópia + referência à definição em CARDS.
+
+Antes cada cópia do baralho era um dict inteiro (card_info.copy()).
+CardInstance guarda só instance_id, vida, ataque, itens equipados e as
+chaves que o jogo altera; o resto é lido da definição compartilhada.
+Continua se comportando como dict para o engine (get, [], in, pop,
+copy) e vira dict no fio via to_dict().
+"""
+from __future__ import annotations
+
+from collections.abc import MutableMapping
+from typing import Any, Iterator, Optional
+
+# slot sem valor próprio: lê da definição
+_UNSET = object()
+# chave removida (ou nunca existiu) nesta cópia
+_MISSING = object()
+
+_SLOT_KEYS = ('life', 'attack', 'equipped_items')
+
+
+class CardInstance(MutableMapping):
+    __slots__ = ('spec', 'instance_id', 'life', 'attack', 'equipped_items', 'flags')
+
+    def __init__(self, spec: dict, instance_id: str):
+        self.spec = spec
+        self.instance_id = instance_id
+        self.life = _UNSET
+        self.attack = _UNSET
+        self.equipped_items = _MISSING
+        # demais chaves alteradas no jogo (None até a primeira escrita)
+        self.flags: Optional[dict] = None
+
+    # --- leitura ---
+    def __getitem__(self, key: str) -> Any:
+        if key == 'instance_id':
+            value = self.instance_id
+        elif key in _SLOT_KEYS:
+            value = getattr(self, key)
+            if value is _UNSET:
+                return self.spec[key]
+        else:
+            flags = self.flags
+            if flags is None or key not in flags:
+                return self.spec[key]
+            value = flags[key]
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # caminho quente do engine: sem exceção, cai direto na definição
+        flags = self.flags
+        if key == 'instance_id':
+            value = self.instance_id
+        elif key in _SLOT_KEYS:
+            value = getattr(self, key)
+            if value is _UNSET:
+                return self.spec.get(key, default)
+        elif flags is None or key not in flags:
+            return self.spec.get(key, default)
+        else:
+            value = flags[key]
+        return default if value is _MISSING else value
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            self[key]  # type: ignore[index]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        for key, _ in self.items():
+            yield key
+
+    def __len__(self) -> int:
+        return len(self.to_dict())
+
+    def __bool__(self) -> bool:
+        # `if card:` é usado em todo o engine; uma carta nunca é vazia
+        return True
+
+    def items(self):  # type: ignore[override]
+        """Pares na ordem do dict antigo: definição, instance_id, extras."""
+        flags = self.flags
+        spec = self.spec
+        for key, value in spec.items():
+            if key in _SLOT_KEYS:
+                value = getattr(self, key)
+                if value is _UNSET:
+                    value = spec[key]
+            elif flags is not None and key in flags:
+                value = flags[key]
+            if value is not _MISSING:
+                yield key, value
+        if self.instance_id is not _MISSING:
+            yield 'instance_id', self.instance_id
+        for key in _SLOT_KEYS:
+            if key not in spec:
+                value = getattr(self, key)
+                if value is not _UNSET and value is not _MISSING:
+                    yield key, value
+        if flags:
+            for key, value in flags.items():
+                if key not in spec and value is not _MISSING:
+                    yield key, value
+
+    def keys(self):  # type: ignore[override]
+        return [key for key, _ in self.items()]
+
+    def values(self):  # type: ignore[override]
+        return [value for _, value in self.items()]
+
+    # --- escrita ---
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == 'instance_id':
+            self.instance_id = value
+        elif key in _SLOT_KEYS:
+            setattr(self, key, value)
+        else:
+            if self.flags is None:
+                self.flags = {}
+            self.flags[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        if key == 'instance_id':
+            self.instance_id = _MISSING
+        elif key in _SLOT_KEYS:
+            setattr(self, key, _MISSING)
+        elif key in self.spec:
+            if self.flags is None:
+                self.flags = {}
+            self.flags[key] = _MISSING
+        else:
+            del self.flags[key]
+
+    # --- dict-compat ---
+    def copy(self) -> 'CardInstance':
+        """Cópia rasa (mesma semântica de dict.copy)."""
+        clone = CardInstance(self.spec, self.instance_id)
+        clone.life = self.life
+        clone.attack = self.attack
+        clone.equipped_items = self.equipped_items
+        clone.flags = dict(self.flags) if self.flags else None
+        return clone
+
+    def to_dict(self) -> dict:
+        data = self.spec.copy()
+        for key in _SLOT_KEYS:
+            value = getattr(self, key)
+            if value is _MISSING:
+                data.pop(key, None)
+            elif value is not _UNSET:
+                data[key] = value
+        if self.instance_id is not _MISSING:
+            data['instance_id'] = self.instance_id
+        if self.flags:
+            for key, value in self.flags.items():
+                if value is _MISSING:
+                    data.pop(key, None)
+                else:
+                    data[key] = value
+        return data
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CardInstance):
+            if other is self:
+                return True
+            if self.instance_id != other.instance_id:
+                return False
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]  # mutável, igual a dict
+
+    def __repr__(self) -> str:
+        return f'CardInstance({self.to_dict()!r})'
+
+
+def json_default(obj: Any) -> Any:
+    """Hook `default` do json: CardInstance sai como o dict de sempre."""
+    if isinstance(obj, CardInstance):
+        return obj.to_dict()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
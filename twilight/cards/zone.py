@@ -0,0 +1,223 @@
+"""
+Zona de cartas de um jogador (mão, bases, talismãs) com contagens.
+
+CardZone é uma list comum para o resto do código (índice, append, pop,
+JSON), mas mantém a contagem de cartas por id e por tipo a cada
+mutação. Perguntas como "tem Talismã da Sabedoria na mão?" ou "quantas
+runas?" viram consulta a um Counter em vez de varrer a lista. Slots
+vazios (None) das bases não contam. `version` sobe a cada carta que
+entra ou sai, para caches derivados da composição da zona.
+
+Uma zona ligada (bind) ao índice da partida também mantém
+instance_id -> (zona, dono, slot) a cada mutação: quem entra é
+registrado, quem sai é apagado e, quando a lista desloca (pop/insert no
+meio), as cartas seguintes são reindexadas.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Iterable, Optional
+
+
+class CardZone(list):
+    __slots__ = ('by_id', 'by_type', 'by_pair', 'version', '_index', '_zone', '_owner')
+
+    def __init__(self, cards: Iterable = ()):
+        super().__init__(cards)
+        self._index: Optional[dict] = None
+        self._zone: Optional[str] = None
+        self._owner: Optional[str] = None
+        self.by_id: Counter = Counter()
+        self.by_type: Counter = Counter()
+        # (id, tipo): para contar "id X ou tipo Y" sem contar a carta duas vezes
+        self.by_pair: Counter = Counter()
+        self.version = 0
+        for card in list.__iter__(self):
+            self._add(card)
+
+    def _add(self, card: Any) -> None:
+        if card:
+            card_id = card.get('id')
+            card_type = card.get('type')
+            self.by_id[card_id] += 1
+            self.by_type[card_type] += 1
+            self.by_pair[card_id, card_type] += 1
+            self.version += 1
+
+    def _discard(self, card: Any) -> None:
+        if card:
+            card_id = card.get('id')
+            card_type = card.get('type')
+            self.by_id[card_id] -= 1
+            self.by_type[card_type] -= 1
+            self.by_pair[card_id, card_type] -= 1
+            self.version += 1
+
+    # --- índice de posições (Game._card_index) ---
+    def bind(self, index: dict, zone: str, owner: Optional[str]) -> 'CardZone':
+        """Liga a zona ao índice da partida e registra as cartas que já tem."""
+        self._index = index
+        self._zone = zone
+        self._owner = owner
+        self._reindex(0)
+        return self
+
+    def _reindex(self, start: int) -> None:
+        if self._index is None:
+            return
+        index, zone, owner = self._index, self._zone, self._owner
+        for slot in range(start, len(self)):
+            card = list.__getitem__(self, slot)
+            if card and card.get('instance_id') is not None:
+                index[card['instance_id']] = (zone, owner, slot)
+
+    def _unindex(self, card: Any, slot: int) -> None:
+        # só apaga se a entrada ainda é desta posição (a carta pode já ter
+        # sido registrada no destino, ex.: cemitério antes de esvaziar a base)
+        if self._index is not None and card:
+            instance_id = card.get('instance_id')
+            if self._index.get(instance_id) == (self._zone, self._owner, slot):
+                del self._index[instance_id]
+
+    # --- consultas ---
+    def count_id(self, card_id: str) -> int:
+        return self.by_id[card_id]
+
+    def count_type(self, card_type: str) -> int:
+        return self.by_type[card_type]
+
+    def count_id_or_type(self, card_id: str, card_type: str) -> int:
+        """Cartas com esse id OU esse tipo (cada carta conta uma vez)."""
+        return self.by_id[card_id] + self.by_type[card_type] - self.by_pair[card_id, card_type]
+
+    def recount(self) -> None:
+        """Refaz as contagens (após alterar id/tipo de uma carta já na zona)."""
+        self.by_id.clear()
+        self.by_type.clear()
+        self.by_pair.clear()
+        self.version += 1
+        for card in list.__iter__(self):
+            self._add(card)
+
+    # --- mutações de list ---
+    def append(self, card: Any) -> None:
+        super().append(card)
+        self._add(card)
+        self._reindex(len(self) - 1)
+
+    def extend(self, cards: Iterable) -> None:
+        cards = list(cards)
+        start = len(self)
+        super().extend(cards)
+        for card in cards:
+            self._add(card)
+        self._reindex(start)
+
+    def insert(self, index: int, card: Any) -> None:
+        start = min(max(index + len(self) if index < 0 else index, 0), len(self))
+        super().insert(index, card)
+        self._add(card)
+        self._reindex(start)
+
+    def pop(self, index: int = -1) -> Any:
+        slot = index + len(self) if index < 0 else index
+        card = super().pop(index)
+        self._discard(card)
+        self._unindex(card, slot)
+        self._reindex(slot)
+        return card
+
+    def remove(self, card: Any) -> None:
+        self.pop(self.index(card))
+
+    def clear(self) -> None:
+        for slot, card in enumerate(list.__iter__(self)):
+            self._unindex(card, slot)
+        super().clear()
+        self.by_id.clear()
+        self.by_type.clear()
+        self.by_pair.clear()
+        self.version += 1
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            old = super().__getitem__(index)
+            value = list(value)
+            for slot, card in zip(range(*index.indices(len(self))), old):
+                self._unindex(card, slot)
+            super().__setitem__(index, value)
+            for card in old:
+                self._discard(card)
+            for card in value:
+                self._add(card)
+            # fatia pode mudar o tamanho e deslocar o resto
+            self._reindex(0)
+            return
+        slot = index + len(self) if index < 0 else index
+        old = super().__getitem__(index)
+        self._unindex(old, slot)
+        super().__setitem__(index, value)
+        self._discard(old)
+        self._add(value)
+        if self._index is not None and value and value.get('instance_id') is not None:
+            self._index[value['instance_id']] = (self._zone, self._owner, slot)
+
+    def __delitem__(self, index) -> None:
+        if isinstance(index, slice):
+            old = super().__getitem__(index)
+            for slot, card in zip(range(*index.indices(len(self))), old):
+                self._unindex(card, slot)
+            super().__delitem__(index)
+            for card in old:
+                self._discard(card)
+            self._reindex(0)
+            return
+        self.pop(index)
+
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self._reindex(0)
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._reindex(0)
+
+    def __iadd__(self, cards: Iterable) -> 'CardZone':
+        self.extend(cards)
+        return self
+
+    def __imul__(self, n: int) -> 'CardZone':
+        cards = list(self)
+        self.clear()
+        for _ in range(n):
+            self.extend(cards)
+        return self
+
+    def copy(self) -> 'CardZone':
+        # cópia solta: não mexe no índice da partida
+        return CardZone(self)
+
+    def __reduce_ex__(self, protocol):
+        # copy/deepcopy/pickle: recria pelo construtor (contagens refeitas, sem índice)
+        return (CardZone, (list(self),))
+
+
+def zone_count(zone: Optional[list], card_id: Optional[str] = None, card_type: Optional[str] = None) -> int:
+    """
+    Quantas cartas da zona têm `card_id` ou `card_type`. O(1) para CardZone;
+    varre a lista quando alguém trocou a zona por uma list comum.
+    """
+    if not zone:
+        return 0
+    if isinstance(zone, CardZone):
+        if card_id is not None and card_type is not None:
+            return zone.count_id_or_type(card_id, card_type)
+        if card_id is not None:
+            return zone.count_id(card_id)
+        return zone.count_type(card_type)
+    count = 0
+    for card in zone:
+        if card and ((card_id is not None and card.get('id') == card_id)
+                     or (card_type is not None and card.get('type') == card_type)):
+            count += 1
+    return count
@@ -7,6 +7,13 @@ SECRET_KEY = os.environ.get('SECRET_KEY', 'twilight-battle-secret')
 JWT_SECRET = os.environ.get('JWT_SECRET', 'twilight-battle-jwt-secret-key-change-in-production')
 JWT_EXPIRATION_HOURS = int(os.environ.get('JWT_EXPIRATION_HOURS', '24'))
 JWT_ALGORITHM = 'HS256'
+# Tokens já verificados mantidos em memória (0 desliga o cache)
+JWT_CACHE_SIZE = int(os.environ.get('JWT_CACHE_SIZE', '4096'))
+# Senhas: custo do PBKDF2 (hashes antigos são migrados no login),
+# threads do pool e quantos pedidos podem esperar antes de recusar
+PASSWORD_ITERATIONS = int(os.environ.get('PASSWORD_ITERATIONS', '100000'))
+PASSWORD_HASH_THREADS = int(os.environ.get('PASSWORD_HASH_THREADS', '2'))
+PASSWORD_QUEUE_LIMIT = int(os.environ.get('PASSWORD_QUEUE_LIMIT', '8'))
 
 # Fuso horário da aplicação (São Paulo / GMT-3)
 # Pode sobrescrever com TZ= no ambiente / Coolify
@@ -30,6 +37,35 @@ ACCOUNTS_FILE = os.path.join(DATA_DIR, 'accounts.json')
 JOURNAL_FILE = os.path.join(DATA_DIR, 'journal.json')
 ADMIN_LEVEL_FILE = os.path.join(DATA_DIR, 'admin_levels.json')
 
+# SQLite: pool de conexões e tuning (0 desliga o PRAGMA correspondente)
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '4'))
+DB_STATEMENT_CACHE = int(os.environ.get('DB_STATEMENT_CACHE', '128'))
+DB_MMAP_SIZE = int(os.environ.get('DB_MMAP_SIZE', str(64 * 1024 * 1024)))
+DB_CACHE_SIZE_KB = int(os.environ.get('DB_CACHE_SIZE_KB', '8192'))
+# Threads nativas que executam o SQLite sob gevent (0 = executa no greenlet)
+DB_EXECUTOR_THREADS = int(os.environ.get('DB_EXECUTOR_THREADS', '4'))
+# Cache de contas: intervalo do flush de current_game (0 = grava na hora)
+ACCOUNT_FLUSH_MS = int(os.environ.get('ACCOUNT_FLUSH_MS', '250'))
+# Contas em memória (LRU; só contas já gravadas saem). 0 = sem limite
+ACCOUNT_CACHE_SIZE = int(os.environ.get('ACCOUNT_CACHE_SIZE', '4096'))
+# game_state enviado pelo servidor: janela que agrupa mudanças seguidas da sala
+STATE_PUSH_MS = int(os.environ.get('STATE_PUSH_MS', '30'))
+# Ciclo de vida das salas (segundos; 0 desliga): lobby sem atividade é
+# fechado, jogador desconectado perde a vaga do lobby, varredura periódica
+LOBBY_IDLE_SECONDS = int(os.environ.get('LOBBY_IDLE_SECONDS', '1800'))
+DISCONNECT_GRACE_SECONDS = int(os.environ.get('DISCONNECT_GRACE_SECONDS', '300'))
+LIFECYCLE_SWEEP_SECONDS = int(os.environ.get('LIFECYCLE_SWEEP_SECONDS', '60'))
+# Token bucket dos eventos do socket: *_PER_SEC repõe fichas, *_BURST é o
+# máximo acumulado (rajada). PER_SEC 0 desliga o limite daquele evento
+CHAT_RATE_PER_SEC = float(os.environ.get('CHAT_RATE_PER_SEC', '1'))
+CHAT_RATE_BURST = int(os.environ.get('CHAT_RATE_BURST', '5'))
+CHAT_ROOM_RATE_PER_SEC = float(os.environ.get('CHAT_ROOM_RATE_PER_SEC', '4'))
+CHAT_ROOM_RATE_BURST = int(os.environ.get('CHAT_ROOM_RATE_BURST', '15'))
+ACTION_RATE_PER_SEC = float(os.environ.get('ACTION_RATE_PER_SEC', '8'))
+ACTION_RATE_BURST = int(os.environ.get('ACTION_RATE_BURST', '16'))
+STATE_RATE_PER_SEC = float(os.environ.get('STATE_RATE_PER_SEC', '10'))
+STATE_RATE_BURST = int(os.environ.get('STATE_RATE_BURST', '20'))
+
 def ensure_data_dirs():
     os.makedirs(DATA_DIR, exist_ok=True)
     os.makedirs(SAVES_DIR, exist_ok=True)
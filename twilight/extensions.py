@@ -1,4 +1,7 @@
 """Extensões Flask compartilhadas (inicializadas em create_app)."""
 from flask_socketio import SocketIO
 
-socketio = SocketIO(logging=False, cors_allowed_origins="*", async_mode='gevent')
+from twilight.cards import codec
+
+# json=codec: cartas (CardInstance) vão no payload como dict
+socketio = SocketIO(logging=False, cors_allowed_origins="*", async_mode='gevent', json=codec)
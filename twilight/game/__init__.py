@@ -1,13 +1,16 @@
 """Domínio da partida multiplayer."""
 
-from twilight.game.chat import add_chat_message, broadcast_system_message, censor_text
+from twilight.game.chat import add_chat_message, broadcast_system_message, censor_text, get_chat_history, system_message_batch
 from twilight.game.engine import Game
-from twilight.game.rituals import RitualManager
+from twilight.game.rituals import RITUAL_REQUIREMENTS, RitualManager
 
 __all__ = [
     'Game',
+    'RITUAL_REQUIREMENTS',
     'RitualManager',
     'add_chat_message',
     'broadcast_system_message',
     'censor_text',
+    'get_chat_history',
+    'system_message_batch',
 ]
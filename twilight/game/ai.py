@@ -11,7 +11,7 @@ import time
 from typing import Any, Optional
 
 from twilight.extensions import socketio
-from twilight.game.chat import broadcast_system_message
+from twilight.game.chat import broadcast_system_message, system_message_batch
 
 
 TUTORIAL_BOT_NAME = "mentor"
@@ -112,6 +112,8 @@ def plan_easy_actions(game, bot: str) -> list[dict[str, Any]]:
     p = game.player_data.get(bot) or {}
     if p.get("dead"):
         return [{"action": "end_turn"}]
+    # fluxo próprio dos bots (reproduzível pela seed da sala)
+    rng = game.ai_rng
 
     hand = list(p.get("hand") or [])
     atk = list(p.get("attack_bases") or [])
@@ -129,8 +131,8 @@ def plan_easy_actions(game, bot: str) -> list[dict[str, Any]]:
     traps = [c for c in hand if _is_trap(c)]
 
     played = False
-    if empty_atk and creatures and random.random() < 0.85:
-        c = random.choice(creatures)
+    if empty_atk and creatures and rng.random() < 0.85:
+        c = rng.choice(creatures)
         actions.append(
             {
                 "action": "play_card",
@@ -144,7 +146,7 @@ def plan_easy_actions(game, bot: str) -> list[dict[str, Any]]:
         played = True
         hand = [x for x in hand if x.get("instance_id") != c.get("instance_id")]
         creatures = [c for c in hand if _is_creature(c)]
-    elif empty_def and traps and random.random() < 0.5:
+    elif empty_def and traps and rng.random() < 0.5:
         t = traps[0]
         actions.append(
             {
@@ -157,8 +159,8 @@ def plan_easy_actions(game, bot: str) -> list[dict[str, Any]]:
             }
         )
         played = True
-    elif empty_def and creatures and random.random() < 0.4:
-        c = random.choice(creatures)
+    elif empty_def and creatures and rng.random() < 0.4:
+        c = rng.choice(creatures)
         actions.append(
             {
                 "action": "play_card",
@@ -185,8 +187,8 @@ def plan_easy_actions(game, bot: str) -> list[dict[str, Any]]:
     if any(a.get("action") == "play_card" and (a.get("params") or {}).get("position_type") == "attack" for a in actions):
         has_attacker = True
 
-    if can_atk and has_attacker and enemies and random.random() < 0.45:
-        target = random.choice(enemies)
+    if can_atk and has_attacker and enemies and rng.random() < 0.45:
+        target = rng.choice(enemies)
         actions.append({"action": "attack", "params": {"target_id": target}})
 
     actions.append({"action": "end_turn"})
@@ -238,6 +240,8 @@ def _run_one_action(game, bot: str, step: dict) -> tuple[bool, Optional[dict], s
         return False, {"success": False, "message": f"ação desconhecida: {action}"}, ""
 
     ok = bool(result and result.get("success"))
+    if ok:
+        game.bump_state_version()
     return ok, result, log
 
 
@@ -257,7 +261,8 @@ def run_bot_turn(game_id: str) -> None:
         return
 
     if (game.player_data.get(bot) or {}).get("dead"):
-        game.next_turn()
+        with system_message_batch(game_id):
+            game.next_turn()
         _emit_action(game_id, bot, "end_turn", {"success": True}, f"{bot} (morto) passa")
         schedule_bot_turn(game_id)
         return
@@ -273,7 +278,9 @@ def run_bot_turn(game_id: str) -> None:
         if game.players[game.current_turn] != bot:
             return
 
-        ok, result, log = _run_one_action(game, bot, step)
+        # lote por passo, não pelo turno: entre passos o bot pausa de propósito
+        with system_message_batch(game_id):
+            ok, result, log = _run_one_action(game, bot, step)
         if ok and result:
             if step.get("action") != "end_turn":
                 ended = game.register_action(bot, step["action"])
@@ -385,9 +392,5 @@ def add_tutorial_bot(game, name: str = TUTORIAL_BOT_NAME) -> bool:
         return False
 
     sid = f"bot:{name}:{game.game_id}"
-    game.players.append(name)
-    game.socket_to_username[sid] = name
-    game.player_data[name] = game._make_player_state(name, sid, deal_hand=True)
-    game.player_data[name]["is_bot"] = True
-    game.player_data[name]["name"] = "Mentor"
+    game.add_bot_player(name, sid, "Mentor")
     return True
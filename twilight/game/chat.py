@@ -1,5 +1,18 @@
-"""Chat da partida e filtro de palavrões."""
+"""
+Chat da partida e filtro de palavrões.
+
+O histórico de cada sala é um deque(maxlen=MAX_CHAT_MESSAGES): a mensagem
+mais antiga sai sozinha quando chega a nova, sem recortar a lista. O
+filtro é uma única regex (trie de PROFANITY_LIST) compilada no import e
+aplicada numa passada.
+
+Uma ação (ataque, turno do bot...) pode gerar várias mensagens de
+sistema. Dentro de system_message_batch elas vão para o histórico na
+hora, mas seguem para a sala num único chat_batch no fim da ação.
+"""
 import re
+from collections import deque
+from contextlib import contextmanager
 
 from twilight.config import now_sp_str
 from twilight.extensions import socketio
@@ -14,33 +27,66 @@ PROFANITY_LIST = [
 ]
 
 
+def _profanity_pattern(words):
+    """
+    Regex única em forma de trie: prefixos comuns fatorados ("krl(?:h)?",
+    "c(?:a(?:cete|ralho)|orno|u)"), então cada posição do texto testa no
+    máximo um ramo por letra. O lookahead com as iniciais descarta rápido
+    as posições que não começam palavrão. Quantificadores gulosos: casa
+    sempre a palavra mais longa ("krlh" vira ***, não ***h).
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word.lower():
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # palavra termina aqui mas também continua (krl / krlh)
+        return f'(?:{body})?' if '' in node else body
+
+    initials = ''.join(sorted({re.escape(word[0].lower()) for word in words}))
+    return re.compile(f'(?=[{initials}])' + build(trie), re.IGNORECASE)
+
+
+_PROFANITY_RE = _profanity_pattern(PROFANITY_LIST)
+
+
 def censor_text(text):
-    censored = text
-    for word in PROFANITY_LIST:
-        if word in censored.lower():
-            pattern = re.compile(re.escape(word), re.IGNORECASE)
-            censored = pattern.sub('***', censored)
-    return censored
+    return _PROFANITY_RE.sub('***', text)
 
 
-def add_chat_message(game_id, username, message, is_system=False):
-    if game_id not in chat_messages:
-        chat_messages[game_id] = []
+def get_chat_history(game_id):
+    """Histórico da sala (o próprio deque; o codec JSON serializa como lista)."""
+    return chat_messages.get(game_id, ())
 
-    final_message = message
-    if not is_system:
-        final_message = censor_text(message)
 
-    chat_messages[game_id].append({
+def _store_message(game_id, username, message, is_system, timestamp):
+    history = chat_messages.get(game_id)
+    if history is None:
+        history = chat_messages[game_id] = deque(maxlen=MAX_CHAT_MESSAGES)
+
+    entry = {
         'username': username,
-        'message': final_message,
-        'timestamp': now_sp_str('%H:%M:%S'),
+        'message': message,
+        'timestamp': timestamp,
         'is_system': is_system
-    })
+    }
+    history.append(entry)
+    return entry
 
-    if len(chat_messages[game_id]) > MAX_CHAT_MESSAGES:
-        chat_messages[game_id] = chat_messages[game_id][-MAX_CHAT_MESSAGES:]
 
+def add_chat_message(game_id, username, message, is_system=False):
+    final_message = message
+    if not is_system:
+        final_message = censor_text(message)
+
+    _store_message(game_id, username, final_message, is_system, now_sp_str('%H:%M:%S'))
     return final_message
 
 
@@ -58,11 +104,35 @@ def broadcast_system_message(game_id, message, fog_message=None):
     if fog_message is not None and 'fog_of_war' in (getattr(game, 'modifiers', None) or []):
         public = fog_message
 
-    add_chat_message(game_id, 'Sistema', public, is_system=True)
+    batch = game.chat_batch
+    if batch is not None:
+        # mesmo horário para toda a ação (e um strftime só)
+        timestamp = batch[0]['timestamp'] if batch else now_sp_str('%H:%M:%S')
+        batch.append(_store_message(game_id, 'Sistema', public, True, timestamp))
+        return
+
+    entry = _store_message(game_id, 'Sistema', public, True, now_sp_str('%H:%M:%S'))
+    socketio.emit('chat_message', entry, room=game_id)
+
+
+@contextmanager
+def system_message_batch(game_id):
+    """
+    Agrupa as mensagens de sistema da sala até o fim do bloco: uma só vira
+    chat_message, várias viram um chat_batch. Blocos aninhados (ou em
+    outra sala já em lote) deixam o envio para o de fora.
+    """
+    game = games.get(game_id)
+    if game is None or game.chat_batch is not None:
+        yield
+        return
 
-    socketio.emit('chat_message', {
-        'username': 'Sistema',
-        'message': public,
-        'timestamp': now_sp_str('%H:%M:%S'),
-        'is_system': True
-    }, room=game_id)
+    game.chat_batch = batch = []
+    try:
+        yield
+    finally:
+        game.chat_batch = None
+        if len(batch) == 1:
+            socketio.emit('chat_message', batch[0], room=game_id)
+        elif batch:
+            socketio.emit('chat_batch', {'messages': batch}, room=game_id)
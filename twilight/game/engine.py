@@ -1,18 +1,24 @@
 """Motor da partida multiplayer (classe Game)."""
 import random
-from random import shuffle
-import uuid
+import secrets
 
 from flask_socketio import emit
 
 from twilight.cards.deck import create_deck, get_random_disguise
 from twilight.cards.definitions import CARDS
+from twilight.cards.ids import InstanceIdSource
+from twilight.cards.zone import CardZone, zone_count
 from twilight.extensions import socketio
 from twilight.game.chat import broadcast_system_message
+from twilight.game.replay import recorded
 from twilight.game.rituals import RitualManager
+from twilight.state import member_sockets
 
 class Game:
-    def __init__(self, game_id, creator, config=None):
+    # Chamados com o game_id a cada bump_state_version (push do game_state)
+    state_listeners = []
+
+    def __init__(self, game_id, creator, config=None, seed=None):
         # Configurações da sala
         self.config = config or {}
         self.max_players = self.config.get('max_players', 6)  # Padrão 6
@@ -26,8 +32,29 @@ class Game:
         self.players = []  # Lista de usernames
         self.player_data = {}  # Dict com username como chave
         self.socket_to_username = {}  # Mapeamento socket.id -> username
-        self.deck = create_deck(self.modifiers)
-        self.graveyard = []
+        # Versão do estado visível; sobe a cada mudança (deltas do game_state)
+        self.state_version = 0
+        # Projeções de carta para não-donos: (instance_id, tipo) -> (carta, origem, visão)
+        self._card_views = {}
+        # Onde cada carta está: instance_id -> (zona, dono, slot). Mão, bases e
+        # cemitério são CardZone ligadas a este dict e o atualizam a cada
+        # mutação; as buscas ainda conferem o slot antes de confiar nele
+        self._card_index = {}
+        # Condições de ritual por jogador, válidas enquanto o campo não muda
+        self._ritual_cache = {}
+        # Sorteios da partida (baralho, disfarces, feitiços, ids) saem de um RNG
+        # próprio: a mesma seed + o mesmo action_log reproduzem a partida (replay.py)
+        self.seed = int(seed) if seed is not None else secrets.randbits(64)
+        self.rng = random.Random(self.seed)
+        # bots planejam com outro fluxo, para o replay (que não replaneja) não desalinhar
+        self.ai_rng = random.Random(self.rng.getrandbits(64))
+        self.new_instance_id = InstanceIdSource(f'{self.seed & 0xffff:04x}')
+        self.action_log = []
+        self._record_depth = 0
+        # mensagens de sistema da ação em curso (chat.system_message_batch); None = envio direto
+        self.chat_batch = None
+        self.deck = create_deck(self.modifiers, self.rng, self.new_instance_id)
+        self.graveyard = CardZone().bind(self._card_index, 'graveyard', None)
         self.started = False
         self.finished = False  # True quando há vencedor — trava ações
         self.finished_at = None  # timestamp do fim (para cleanup da sala)
@@ -65,11 +92,23 @@ class Game:
         else:
             self.starting_hand_size = 5
     
+    def bump_state_version(self):
+        """Marca que o estado mudou (clientes com versão antiga recebem delta)"""
+        self.state_version += 1
+        for listener in Game.state_listeners:
+            listener(self.game_id)
+        return self.state_version
+
     def get_player_by_socket(self, socket_id):
         """Retorna o username associado a um socket_id"""
         return self.socket_to_username.get(socket_id)
     def get_socket_id(self, username):
         """Retorna o socket_id atual de um username"""
+        # registro global (sala, usuário) -> sid, conferido com o mapa da sala;
+        # bots e sockets fora do registro caem na varredura
+        sid = member_sockets.get((self.game_id, username))
+        if sid is not None and self.socket_to_username.get(sid) == username:
+            return sid
         for socket_id, uname in self.socket_to_username.items():
             if uname == username:
                 return socket_id
@@ -77,7 +116,7 @@ class Game:
     
     def _make_player_state(self, username, socket_id=None, deal_hand=True):
         """Estado limpo de um jogador (lobby / rematch)."""
-        hand = []
+        hand = CardZone()
         if deal_hand:
             for _ in range(getattr(self, 'starting_hand_size', 5)):
                 if self.deck:
@@ -92,9 +131,9 @@ class Game:
             'username': username,
             'socket_id': socket_id,
             'life': start_life,
-            'hand': hand,
-            'attack_bases': [None] * atk_n,
-            'defense_bases': [None] * def_n,
+            'hand': hand.bind(self._card_index, 'hand', username),
+            'attack_bases': CardZone([None] * atk_n).bind(self._card_index, 'attack_bases', username),
+            'defense_bases': CardZone([None] * def_n).bind(self._card_index, 'defense_bases', username),
             'equipment': {
                 'weapon': None,
                 'helmet': None,
@@ -103,7 +142,7 @@ class Game:
                 'boots': None,
                 'mount': None
             },
-            'talismans': [],
+            'talismans': CardZone(),
             'runes': 0,
             'active_effects': [],
             'profecia_alvo': None,
@@ -116,6 +155,7 @@ class Game:
             'attacked_this_turn': False,
         }
 
+    @recorded
     def add_player(self, socket_id, username):
         """Adiciona um jogador ao jogo usando username como identificador"""
         # Lobby (ou pós-rematch): started False permite entrar
@@ -129,14 +169,44 @@ class Game:
         self.players.append(username)
         self.socket_to_username[socket_id] = username
         self.player_data[username] = self._make_player_state(username, socket_id, deal_hand=True)
+        self.bump_state_version()
         
         return True
 
+    @recorded
+    def add_bot_player(self, username, socket_id, display_name=None):
+        """Adiciona um bot (sem conta real) como jogador"""
+        self.players.append(username)
+        self.socket_to_username[socket_id] = username
+        self.player_data[username] = self._make_player_state(username, socket_id, deal_hand=True)
+        self.player_data[username]['is_bot'] = True
+        self.player_data[username]['name'] = display_name or username
+
+    @recorded
+    def seat_first(self, username):
+        """Põe o jogador na primeira posição (joga primeiro)"""
+        if username in self.players:
+            self.players.remove(username)
+            self.players.insert(0, username)
+            self.current_turn = 0
+
+    @recorded
+    def start(self):
+        """Lobby -> partida em andamento"""
+        self.started = True
+        self.bump_state_version()
+        self.finished = False
+        self.finished_at = None
+        self.winner = None
+        self._game_over_emitted = False
+
+    @recorded
     def reset_to_lobby(self, last_winner=None):
         """
         Após o fim da partida: volta a sala para o lobby (mesma id, mods, creator).
         Mantém jogadores e sockets; recria baralho e estados.
         """
+        self.bump_state_version()
         last_winner = last_winner or self.winner
         # preserva espectadores e flags de bot
         spectators = {
@@ -162,8 +232,12 @@ class Game:
         self.winner = None
         self.last_winner = last_winner
         self._game_over_emitted = False
-        self.deck = create_deck(self.modifiers)
-        self.graveyard = []
+        self.deck = create_deck(self.modifiers, self.rng, self.new_instance_id)
+        # o dict do índice é o mesmo que as zonas ligadas usam: esvazia, não troca
+        self._card_index.clear()
+        self.graveyard = CardZone().bind(self._card_index, 'graveyard', None)
+        self.invalidate_card_views()
+        self._ritual_cache = {}
         self.current_turn = 0
         self.time_of_day = "day"
         self.time_cycle = 0
@@ -224,6 +298,7 @@ class Game:
             'game_id': self.game_id,
             'creator': self.creator,
         }
+    @recorded
     def add_spectator(self, socket_id, username):
         """Adiciona um espectador ao jogo"""
         if username in self.players or username in self.player_data:
@@ -237,9 +312,11 @@ class Game:
             'username': username,
             'socket_id': socket_id,
             'life': 0,
-            'hand': [],
-            'attack_bases': [None] * getattr(self, 'attack_slot_count', 3),
-            'defense_bases': [None] * getattr(self, 'defense_slot_count', 6),
+            'hand': CardZone().bind(self._card_index, 'hand', username),
+            'attack_bases': CardZone([None] * getattr(self, 'attack_slot_count', 3)).bind(
+                self._card_index, 'attack_bases', username),
+            'defense_bases': CardZone([None] * getattr(self, 'defense_slot_count', 6)).bind(
+                self._card_index, 'defense_bases', username),
             'equipment': {
                 'weapon': None,
                 'helmet': None,
@@ -248,7 +325,7 @@ class Game:
                 'boots': None,
                 'mount': None
             },
-            'talismans': [],
+            'talismans': CardZone(),
             'runes': 0,
             'active_effects': [],
             'profecia_alvo': None,
@@ -260,8 +337,10 @@ class Game:
             'first_hit_reduced': False,
             'attacked_this_turn': False,
         }
+        self.bump_state_version()
         
         return True, "Espectador adicionado com sucesso"
+    @recorded
     def remove_player(self, username):
         """Remove um jogador do jogo. Retorna (success, was_creator, winner)"""
         if username not in self.players or username not in self.player_data:
@@ -291,6 +370,7 @@ class Game:
             
         # Se não há mais jogadores, marcar para limpeza
         if len(self.players) == 0:
+            self.bump_state_version()
             return True, was_creator, None
         
         # Verificar se há um vencedor
@@ -301,6 +381,7 @@ class Game:
                 import time as _time
                 self.finished_at = _time.time()
             self.winner = alive_players[0]
+            self.bump_state_version()
             return True, was_creator, alive_players[0]
         
         # Se era o turno do jogador que saiu, passar para o próximo
@@ -309,10 +390,12 @@ class Game:
             if current_index >= 0 and self.current_turn == current_index:
                 self.next_turn()
         
+        self.bump_state_version()
         return True, was_creator, None
 
+    @recorded
     def reconnect_player(self, socket_id, username):
-        """Reconecta um jogador ou espectador existente ao jogo"""        
+        """Reconecta um jogador ou espectador existente ao jogo"""
         if username in self.player_data:
             # Jogador já existe, atualizar socket
             old_socket = None
@@ -326,6 +409,7 @@ class Game:
             
             self.socket_to_username[socket_id] = username
             self.player_data[username]['socket_id'] = socket_id
+            self.bump_state_version()
             
             return {
                 'success': True,
@@ -363,19 +447,11 @@ class Game:
         """Retorna o número máximo de ações de um determinado tipo que o jogador pode realizar"""
         player = self.player_data.get(username, {})
         
-        # Verificar se tem Talismã da Sabedoria
-        has_sabedoria = False
-        for talisman in player.get('talismans', []):
-            if talisman and talisman.get('id') == 'talisma_sabedoria':
-                has_sabedoria = True
-                break
-        
-        # Verificar se tem Talismã da Sabedoria na mão também (ativado automaticamente)
-        if not has_sabedoria:
-            for card in player.get('hand', []):
-                if card and card.get('id') == 'talisma_sabedoria':
-                    has_sabedoria = True
-                    break
+        # Verificar se tem Talismã da Sabedoria (equipado ou na mão, ativado automaticamente)
+        has_sabedoria = bool(
+            zone_count(player.get('talismans'), 'talisma_sabedoria')
+            or zone_count(player.get('hand'), 'talisma_sabedoria')
+        )
         
         # Retornar limite de ações
         return {
@@ -407,22 +483,19 @@ class Game:
         player = self.player_data.get(username)
         if not player:
             return 0
-        
-        count = 0
-        for card in player.get('hand', []):
-            if card and card.get('type') == 'talisman':
-                count += 1
-        return count
+        return zone_count(player.get('hand'), card_type='talisman')
     def get_player_runes_count(self, username):
         player = self.player_data.get(username)
         if not player or 'no_runes' in self.modifiers:
             return 0
-        
-        count = 0
-        for card in player.get('hand', []):
-            if card and (card.get('type') == 'rune' or card.get('id') == 'runa'):
-                count += 1
-        return count
+        return zone_count(player.get('hand'), 'runa', 'rune')
+
+    def field_count(self, username, card_id):
+        """Quantas cartas com esse id o jogador tem nas bases (ataque + defesa)."""
+        player = self.player_data.get(username)
+        if not player:
+            return 0
+        return zone_count(player.get('attack_bases'), card_id) + zone_count(player.get('defense_bases'), card_id)
 
     def has_fog(self):
         """Névoa de Guerra ativa nesta sala."""
@@ -434,6 +507,10 @@ class Game:
         - Se o visualizador é o dono, mostra a carta real
         - Se não, mostra o disfarce (se for armadilha)
         - fog_of_war: oponentes só veem silhueta (sem nome/stats)
+
+        O retorno é só para leitura (vai direto para o game_state): cartas
+        comuns saem sem cópia e disfarce/silhueta são memorizados por
+        instância, compartilhados entre oponentes e espectadores.
         """
         # Se for o dono da carta, mostrar o real
         if viewer_username == owner_username:
@@ -448,33 +525,71 @@ class Game:
                 display_card.pop('is_disguised', None)
                 return display_card
             return card
-        
+
         # Para espectadores e oponentes
-        display = None
+        display = card
         if card.get('is_disguised') and card.get('disguise'):
             # Retornar o disfarce (parece uma criatura normal)
-            disguise = card['disguise'].copy()
-            disguise['instance_id'] = card['instance_id']
-            disguise['is_disguised'] = True
-            disguise['is_trap'] = False  # Esconder que é armadilha
-            display = disguise
-        else:
-            display = card.copy() if isinstance(card, dict) else card
+            display = self._cached_card_view(card, 'disguise', card['disguise'], self._disguise_view)
 
         # Névoa de Guerra: esconde identidade e atributos do inimigo
         if 'fog_of_war' in self.modifiers and display:
-            return {
-                'instance_id': display.get('instance_id') or card.get('instance_id'),
-                'type': 'creature' if display.get('type') in ('creature', 'trap', None) else display.get('type', 'creature'),
-                'name': '???',
-                'id': 'fog',
-                'fog': True,
-                'life': None,
-                'attack': None,
-            }
+            return self._cached_card_view(card, 'fog', display.get('type'), self._fog_view, display)
 
         return display
 
+    # Máximo de projeções memorizadas antes de recomeçar o cache
+    CARD_VIEW_CACHE_SIZE = 2048
+
+    def _cached_card_view(self, card, kind, source, build, *args):
+        """
+        Projeção memorizada por (instance_id, kind). `source` é aquilo de que
+        a projeção depende (o dict de disfarce, o tipo visível); se mudou —
+        carta virou, foi amaldiçoada, trocou de disfarce — é refeita.
+        """
+        cache = self._card_views
+        key = (card.get('instance_id'), kind)
+        entry = cache.get(key)
+        if entry is not None and entry[0] is card and entry[1] == source:
+            return entry[2]
+        view = build(card, *args)
+        if len(cache) >= self.CARD_VIEW_CACHE_SIZE:
+            cache.clear()
+        cache[key] = (card, source, view)
+        return view
+
+    def invalidate_card_views(self, card=None):
+        """Descarta as projeções memorizadas (de uma carta ou todas)."""
+        cache = self._card_views
+        if not cache:
+            return
+        if card is None:
+            cache.clear()
+            return
+        instance_id = card.get('instance_id')
+        for key in [k for k in cache if k[0] == instance_id]:
+            del cache[key]
+
+    @staticmethod
+    def _disguise_view(card):
+        disguise = card['disguise'].copy()
+        disguise['instance_id'] = card['instance_id']
+        disguise['is_disguised'] = True
+        disguise['is_trap'] = False  # Esconder que é armadilha
+        return disguise
+
+    @staticmethod
+    def _fog_view(card, display):
+        return {
+            'instance_id': display.get('instance_id') or card.get('instance_id'),
+            'type': 'creature' if display.get('type') in ('creature', 'trap', None) else display.get('type', 'creature'),
+            'name': '???',
+            'id': 'fog',
+            'fog': True,
+            'life': None,
+            'attack': None,
+        }
+
     def use_action(self, username, action):
         """Registra que uma ação foi usada"""
         if username not in self.turn_actions_used:
@@ -493,6 +608,7 @@ class Game:
         action_limit = max_actions.get(action, 1)
         used = self.turn_actions_used[username][action]
     
+    @recorded
     def register_action(self, username, action_type):
         """Registra que um jogador realizou uma ação na primeira rodada"""
         if self.first_round and action_type not in ['attack', 'end_turn', 'prophet_curse']:
@@ -505,10 +621,12 @@ class Game:
         
         return False
 
+    @recorded
     def next_turn(self):
         """Avança para o próximo turno, pulando jogadores mortos"""
         if not self.players:
             return
+        self.bump_state_version()
 
         # Sangria: se o jogador atual não atacou neste turno, -20 vida
         if 'bleed_out' in self.modifiers and self.players:
@@ -579,6 +697,7 @@ class Game:
             return False, "Ataques bloqueados na primeira rodada. Todos precisam jogar primeiro."
         return True, ""
     
+    @recorded
     def draw_card(self, username):
         """Compra uma carta"""
         if not self.can_act(username, 'draw'):
@@ -592,6 +711,7 @@ class Game:
         self.use_action(username, 'draw')
         
         return {'success': True, 'card': card}
+    @recorded
     def play_card(self, username, card_instance_id, position_type, position_index):
         """Joga uma carta da mão para o campo com validação de tipo"""
         if not self.can_act(username, 'play'):
@@ -602,11 +722,9 @@ class Game:
         # Encontrar carta na mão
         card_to_play = None
         card_index = -1
-        for i, card in enumerate(player['hand']):
-            if card['instance_id'] == card_instance_id:
-                card_to_play = card
-                card_index = i
-                break
+        found = self._locate_card(card_instance_id, 'hand', username)
+        if found:
+            card_index, card_to_play = found
         
         if not card_to_play:
             return {'success': False, 'message': 'Carta não encontrada na mão'}
@@ -625,7 +743,7 @@ class Game:
             
             # Se for armadilha, gerar um disfarce aleatório
             if card_to_play.get('type') == 'trap':
-                disguise = get_random_disguise()
+                disguise = get_random_disguise(self.rng)
                 disguise['original_trap_id'] = card_to_play['id']
                 disguise['original_trap_name'] = card_to_play['name']
                 disguise['instance_id'] = card_to_play['instance_id']  # Manter mesmo instance_id
@@ -683,6 +801,7 @@ class Game:
         
         return {'success': True, 'card': card_to_play}
     
+    @recorded
     def attack(self, username, target_username):
         """Ataca outro jogador com verificação de primeira rodada e armadilhas"""
         can_attack, message = self.can_attack(username)
@@ -730,9 +849,7 @@ class Game:
                 attack_power += self.get_weapon_attack_value(attacker, weapon)
         
         # Talismã Guerreiro na MÃO
-        for talisman in attacker['hand']:
-            if talisman.get('id') == 'talisma_guerreiro':
-                attack_power += 1024
+        attack_power += 1024 * zone_count(attacker['hand'], 'talisma_guerreiro')
         
         # Silêncio / Selo: pular armadilhas
         skip_traps = False
@@ -871,7 +988,7 @@ class Game:
             if oracle_index != -1:
                 used_oracle = attacker['hand'].pop(oracle_index)
                 self.deck.append(used_oracle)
-                shuffle(self.deck)
+                self.deck.shuffle()
                 socketio.emit('oracle_activated', {
                     'attacker': attacker['name'],
                     'defender': defender['name'],
@@ -1135,7 +1252,7 @@ class Game:
                         used_talisman = target['hand'].pop(immortality_index)
                         used_talisman['uses_left'] = 2
                         self.deck.append(used_talisman)
-                        shuffle(self.deck)
+                        self.deck.shuffle()
                         damage_log.append(f"🔄 Talismã da Imortalidade se esgotou e voltou para o deck!")
                 else:
                     player_killed = True
@@ -1181,9 +1298,7 @@ class Game:
                 attack_power += weapon_attack
         
         # Talismã Guerreiro
-        for talisman in attacker['hand']:
-            if talisman.get('id') == 'talisma_guerreiro':
-                attack_power += 1024
+        attack_power += 1024 * zone_count(attacker['hand'], 'talisma_guerreiro')
         
         # Aplicar dano ao alvo (respeitando defesas)
         result = self.apply_damage_to_player(target_name, attack_power, is_reflected=False)
@@ -1218,7 +1333,7 @@ class Game:
         
         # Processar cartas da mão
         hand_cards = player['hand'].copy()
-        player['hand'] = []
+        player['hand'].clear()
         
         for card in hand_cards:
             if card.get('type') == 'creature':
@@ -1237,8 +1352,9 @@ class Game:
                 self.graveyard.append(card)
                 player['defense_bases'][i] = None
 
-        random.shuffle(self.deck)
+        self.deck.shuffle()
  
+    @recorded
     def check_winner(self):
         """Verifica se há um vencedor. Marca finished na primeira vez."""
         if self.finished and self.winner:
@@ -1267,8 +1383,10 @@ class Game:
             return None
         return None
 
+    @recorded
     def end_game(self, winner_username=None):
         """Finaliza a partida explicitamente (admin / leave)."""
+        self.bump_state_version()
         if winner_username and winner_username in self.player_data:
             self.winner = winner_username
         elif not self.winner:
@@ -1423,6 +1541,7 @@ class Game:
         self.apply_werewolf_forms()
         self.refresh_dynamic_weapon_bonuses()
 
+    @recorded
     def swap_positions(self, username, pos1_type, pos1_index, pos2_type, pos2_index):
         """Troca duas cartas de posição"""
         player = self.player_data[username]
@@ -1518,6 +1637,7 @@ class Game:
                         card['attack'] = int(card.get('attack', 0) or 0) - old + new
                         eq['_applied_attack'] = new
 
+    @recorded
     def equip_item_to_creature(self, username, item_card_id, creature_card_id):
         """Equipa um item em uma criatura"""
 
@@ -1529,11 +1649,9 @@ class Game:
         item_card = None
         item_index = -1
         
-        for i, card in enumerate(player['hand']):
-            if card['instance_id'] == item_card_id:
-                item_card = card
-                item_index = i
-                break
+        found = self._locate_card(item_card_id, 'hand', username)
+        if found:
+            item_index, item_card = found
         
         if not item_card:
             return {'success': False, 'message': 'Item não encontrado na mão'}
@@ -1545,14 +1663,10 @@ class Game:
         target_creature = None
         creature_location = None
         
-        for base in ['attack_bases', 'defense_bases']:
-            for i, card in enumerate(player[base]):
-                if card and card.get('instance_id') == creature_card_id:
-                    target_creature = card
-                    creature_location = (base, i)
-                    break
-            if target_creature:
-                break
+        found = self._locate_on_field(creature_card_id, username)
+        if found:
+            creature_location = (found[0], found[1])
+            target_creature = found[2]
         
         if not target_creature:
             return {'success': False, 'message': 'Criatura não encontrada em campo'}
@@ -1641,10 +1755,11 @@ class Game:
     
     def get_graveyard_cards(self):
         """Retorna lista de cartas no cemitério"""
+        # só leitura: não gera id (o contador da partida é parte do replay)
         graveyard_info = []
         for card in self.graveyard:
             card_info = {
-                'instance_id': card.get('instance_id', str(uuid.uuid4())[:8]),
+                'instance_id': card.get('instance_id'),
                 'name': card.get('name', 'Carta sem nome'),
                 'type': card.get('type', 'unknown'),
                 'description': card.get('description', ''),
@@ -1656,6 +1771,7 @@ class Game:
             graveyard_info.append(card_info)
         return graveyard_info
 
+    @recorded
     def revive_from_graveyard(self, username, target_card_id):
         """Revive uma carta do cemitério usando 4 runas"""
 
@@ -1666,22 +1782,17 @@ class Game:
         if 'no_runes' in self.modifiers:
             return {'success': False, 'message': '❌ Este jogo tem o modificador "Sem Runas" ativo. Não é possível reviver cartas do cemitério!'}
         
-        runes_in_hand = []
-        for card in player['hand']:
-            if card.get('type') == 'rune' or card.get('id') == 'runa':
-                runes_in_hand.append(card)
+        runes_in_hand = zone_count(player['hand'], 'runa', 'rune')
         
-        if len(runes_in_hand) < 4:
-            return {'success': False, 'message': f'Você precisa de 4 runas na mão (tem {len(runes_in_hand)})'}
+        if runes_in_hand < 4:
+            return {'success': False, 'message': f'Você precisa de 4 runas na mão (tem {runes_in_hand})'}
         
         target_card = None
         card_index = -1
         
-        for i, card in enumerate(self.graveyard):
-            if card['instance_id'] == target_card_id:
-                target_card = card
-                card_index = i
-                break
+        found = self._locate_card(target_card_id, 'graveyard')
+        if found:
+            card_index, target_card = found
         
         if not target_card:
             for i, card in enumerate(self.graveyard):
@@ -1704,7 +1815,7 @@ class Game:
             else:
                 new_hand.append(card)
         
-        player['hand'] = new_hand
+        player['hand'][:] = new_hand
         
         if target_card.get('type') == 'creature':
             original_card = CARDS.get(target_card['id'], {})
@@ -1722,6 +1833,7 @@ class Game:
             'message': f"{target_card['name']} foi revivido do cemitério!"
         }
     
+    @recorded
     def call_centaurs(self, username):
         """Habilidade especial do Super Centauro: Coleta todos os centauros em campo de todos os jogadores para a mão do usuário"""
         if not self.can_act(username, 'call_centaurs'):
@@ -1821,6 +1933,9 @@ class Game:
         if not player or player.get('dead', False):
             return False
         
+        if not self.field_count(username, 'super_centauro'):
+            return False
+
         # Verificar se o jogador tem Super Centauro em campo que ainda não usou a habilidade
         for base_type in ['attack_bases', 'defense_bases']:
             for card in player[base_type]:
@@ -1829,6 +1944,7 @@ class Game:
                         return True
         return False
 
+    @recorded
     def toggle_time_of_day(self, username):
         """Habilidade da Fênix: muda o ciclo de dia para noite ou vice-versa"""
         # Verificar se o modificador disable_daycicle está ativo
@@ -1888,6 +2004,9 @@ class Game:
         if not player or player.get('dead', False):
             return False
         
+        if not self.field_count(username, 'fenix'):
+            return False
+
         # Verificar se o jogador tem Fênix em campo que ainda não usou a habilidade neste turno
         for base_type in ['attack_bases', 'defense_bases']:
             for card in player[base_type]:
@@ -1906,23 +2025,13 @@ class Game:
         if not player or player.get('dead', False):
             return False
         
-        # Verificar se tem Mago Negro em campo
-        has_mago_negro = False
-        for card in player['attack_bases'] + player['defense_bases']:
-            if card and card.get('id') == 'mago_negro':
-                has_mago_negro = True
-                break
-        
-        # Se tem Mago Negro, sempre pode realizar rituais
-        if has_mago_negro:
+        # Se tem Mago Negro em campo, sempre pode realizar rituais
+        if self.field_count(username, 'mago_negro'):
             return True
         
         # Verificar se tem carta de ritual na mão
-        for card in player['hand']:
-            if card and card.get('type') == 'ritual':
-                return True
-        
-        return False
+        return bool(zone_count(player['hand'], card_type='ritual'))
+    @recorded
     def perform_ritual(self, username, ritual_id, target_username=None):
         """Realiza um ritual"""
         if not self.can_act(username, 'ritual'):
@@ -1930,11 +2039,7 @@ class Game:
         
         player = self.player_data[username]
         
-        has_mago_negro = False
-        for card in player['attack_bases'] + player['defense_bases']:
-            if card and card['id'] == 'mago_negro':
-                has_mago_negro = True
-                break
+        has_mago_negro = bool(self.field_count(username, 'mago_negro'))
         
         if not has_mago_negro:
             ritual_card = None
@@ -1986,6 +2091,7 @@ class Game:
         return result
 
     # Métodos para magias
+    @recorded
     def cast_spell(self, username, spell_card_id, target_username=None, target_card_id=None):
         """Usa um feitiço com suporte para Rei Mago/Mago Negro"""
         
@@ -2025,14 +2131,14 @@ class Game:
             # Procurar o feitiço pelo ID na definição de cartas
             if spell_card_id in CARDS and CARDS[spell_card_id].get('type') == 'spell':
                 spell_info = CARDS[spell_card_id].copy()
-                spell_info['instance_id'] = str(uuid.uuid4())[:8]
+                spell_info['instance_id'] = self.new_instance_id()
                 spell_card = spell_info
             else:
                 # Se não encontrar pelo ID, procurar pelo nome
                 for card_id, card_info in CARDS.items():
                     if card_info.get('type') == 'spell' and card_info['name'].lower() == spell_card_id.lower():
                         spell_info = card_info.copy()
-                        spell_info['instance_id'] = str(uuid.uuid4())[:8]
+                        spell_info['instance_id'] = self.new_instance_id()
                         spell_card = spell_info
                         break
                 
@@ -2041,11 +2147,15 @@ class Game:
         else:
             # Procurar feitiço na mão
             spell_index = -1
-            for i, card in enumerate(player['hand']):
-                if card['instance_id'] == spell_card_id or card['id'] == spell_card_id:
-                    spell_card = card
-                    spell_index = i
-                    break
+            found = self._locate_card(spell_card_id, 'hand', username)
+            if found:
+                spell_index, spell_card = found
+            else:
+                for i, card in enumerate(player['hand']):
+                    if card['id'] == spell_card_id:
+                        spell_card = card
+                        spell_index = i
+                        break
             
             if not spell_card:
                 return {'success': False, 'message': 'Feitiço não encontrado na mão'}
@@ -2062,7 +2172,7 @@ class Game:
         
         # Feitiço volta para o deck (embaixo)
         self.deck.append(spell_card)
-        shuffle(self.deck)
+        self.deck.shuffle()
         
         self.use_action(username, 'spell')
 
@@ -2080,13 +2190,101 @@ class Game:
         }
 
     def _find_card_on_field(self, instance_id):
+        loc = self._card_index.get(instance_id)
+        if loc is not None and loc[0] in ('attack_bases', 'defense_bases') and loc[1] in self.player_data:
+            zone, uname, idx = loc
+            bases = self.player_data[uname][zone]
+            if idx < len(bases):
+                card = bases[idx]
+                if card and card.get('instance_id') == instance_id:
+                    return uname, zone, idx, card
         for uname in self.players:
             for base in ('attack_bases', 'defense_bases'):
                 for idx, card in enumerate(self.player_data[uname][base]):
                     if card and card.get('instance_id') == instance_id:
+                        self._card_index[instance_id] = (base, uname, idx)
                         return uname, base, idx, card
         return None
 
+    # --- índice instance_id -> (zona, dono, slot) ---
+    # zonas: 'hand', 'attack_bases', 'defense_bases' (dono = username)
+    # e 'graveyard' (dono None). Mantido pelas CardZone ligadas (bind);
+    # a varredura nas buscas só cobre zonas trocadas por fora (admin, bug)
+
+    def _zone_cards(self, zone, owner):
+        if zone == 'graveyard':
+            return self.graveyard
+        player = self.player_data.get(owner)
+        return player.get(zone) if player else None
+
+    def _locate_card(self, instance_id, zone, owner=None):
+        """
+        (slot, carta) de instance_id na zona, ou None. O(1) quando a dica do
+        índice confere; senão varre só aquela zona e atualiza o índice.
+        """
+        cards = self._zone_cards(zone, owner)
+        if not cards:
+            return None
+        loc = self._card_index.get(instance_id)
+        if loc is not None and loc[0] == zone and loc[1] == owner and loc[2] < len(cards):
+            card = cards[loc[2]]
+            if card and card.get('instance_id') == instance_id:
+                return loc[2], card
+        for slot, card in enumerate(cards):
+            if card and card.get('instance_id') == instance_id:
+                self._card_index[instance_id] = (zone, owner, slot)
+                return slot, card
+        return None
+
+    def _locate_on_field(self, instance_id, owner):
+        """(base, slot, carta) no campo de `owner`, ou None."""
+        loc = self._card_index.get(instance_id)
+        bases = ('attack_bases', 'defense_bases')
+        if loc is not None and loc[0] in bases and loc[1] == owner:
+            # a dica diz a base: confere ela primeiro
+            bases = (loc[0], 'defense_bases' if loc[0] == 'attack_bases' else 'attack_bases')
+        for base in bases:
+            found = self._locate_card(instance_id, base, owner)
+            if found:
+                return base, found[0], found[1]
+        return None
+
+    def _scan_card_locations(self):
+        """Índice montado do zero varrendo todas as zonas (primeira ocorrência vence)."""
+        index = {}
+        zones = [('graveyard', None)]
+        for uname in self.player_data:
+            zones.extend((zone, uname) for zone in ('attack_bases', 'defense_bases', 'hand'))
+        for zone, owner in reversed(zones):
+            for slot, card in reversed(list(enumerate(self._zone_cards(zone, owner) or []))):
+                if card and card.get('instance_id') is not None:
+                    index[card['instance_id']] = (zone, owner, slot)
+        return index
+
+    def rebuild_card_index(self):
+        # no lugar: as zonas ligadas guardam referência a este dict
+        index = self._scan_card_locations()
+        self._card_index.clear()
+        self._card_index.update(index)
+
+    def check_card_index(self):
+        """
+        Verificador de consistência (para testes): compara o índice com um
+        montado do zero pela varredura, sem alterar nenhum dos dois.
+        Retorna a lista de divergências (vazia = ok).
+        """
+        expected = self._scan_card_locations()
+        current = dict(self._card_index)
+        problems = []
+        for instance_id in expected.keys() | current.keys():
+            if expected.get(instance_id) != current.get(instance_id):
+                problems.append({
+                    'instance_id': instance_id,
+                    'expected': expected.get(instance_id),
+                    'indexed': current.get(instance_id),
+                })
+        return problems
+
     def _staff_spell_bonus(self, player):
         """Cajado do Mago Negro: +spell_power em cura/buff se equipado no jogador ou em mago."""
         bonus = 0
@@ -2148,10 +2346,10 @@ class Game:
             # Troca cartas de defesa por ataque
             if target_username:
                 target = self.player_data[target_username]
-                attack_bases = target['attack_bases'].copy()
-                defense_bases = target['defense_bases'].copy()
-                target['attack_bases'] = defense_bases
-                target['defense_bases'] = attack_bases
+                attack_bases = target['attack_bases']
+                defense_bases = target['defense_bases']
+                # troca o conteúdo nas mesmas zonas (ligadas ao índice)
+                attack_bases[:], defense_bases[:] = list(defense_bases), list(attack_bases)
                 return {'type': 'swap', 'target': target['name']}
             return {'type': 'error', 'message': 'Alvo não especificado'}
         
@@ -2161,8 +2359,8 @@ class Game:
                 player = self.player_data[player_uname]
                 for card in player['hand']:
                     self.deck.append(card)
-                player['hand'] = []
-            random.shuffle(self.deck)
+                player['hand'].clear()
+            self.deck.shuffle()
             return {'type': 'reset_hands'}
         
         elif spell_id == 'feitico_silencio':
@@ -2193,8 +2391,8 @@ class Game:
                 target_player = self.player_data[target_username]
                 
                 if len(source_player['hand']) > 0 and len(target_player['hand']) > 0:
-                    source_card = random.choice(source_player['hand'])
-                    target_card = random.choice(target_player['hand'])
+                    source_card = self.rng.choice(source_player['hand'])
+                    target_card = self.rng.choice(target_player['hand'])
                     
                     source_player['hand'].remove(source_card)
                     target_player['hand'].remove(target_card)
@@ -2304,7 +2502,7 @@ class Game:
             if self.last_spell_id not in CARDS:
                 return {'type': 'error', 'message': 'Feitiço ecoado inválido'}
             echo = CARDS[self.last_spell_id].copy()
-            echo['instance_id'] = str(uuid.uuid4())[:8]
+            echo['instance_id'] = self.new_instance_id()
             # reentrada: aplica o efeito copiado (sem registrar eco de novo no last se for eco)
             saved = self.last_spell_id
             result = self.apply_spell_effect(echo, caster_username, target_username, target_card_id, caster_type)
@@ -2354,6 +2552,7 @@ class Game:
             'spells': available_spells,
             'spells_in_hand': [card for card in player['hand'] if card.get('type') == 'spell']
         }
+    @recorded
     def toggle_mage_block(self, username, target_username, target_card_id):
         """Rei Mago bloqueia/desbloqueia um mago"""
         if not self.can_act(username, 'block'):
@@ -2376,12 +2575,10 @@ class Game:
         target_card = None
         card_location = None
         
-        for base in ['attack_bases', 'defense_bases']:
-            for i, card in enumerate(target_player[base]):
-                if card and card['instance_id'] == target_card_id:
-                    target_card = card
-                    card_location = (base, i)
-                    break
+        found = self._locate_on_field(target_card_id, target_username)
+        if found:
+            card_location = (found[0], found[1])
+            target_card = found[2]
         
         if not target_card or target_card['id'] not in ['mago', 'rei_mago', 'mago_negro']:
             return {'success': False, 'message': 'Alvo não é um mago'}
@@ -2410,6 +2607,9 @@ class Game:
             return 0
         
         # Verificar se tem Profeta em campo
+        if not self.field_count(username, 'profeta'):
+            return 0
+
         for base_type in ['attack_bases', 'defense_bases']:
             for card in player[base_type]:
                 if card and card.get('id') == 'profeta':
@@ -2422,6 +2622,9 @@ class Game:
             return False
         
         # Verificar se o jogador tem Profeta em campo
+        if not self.field_count(username, 'profeta'):
+            return False
+
         for base_type in ['attack_bases', 'defense_bases']:
             for card in player[base_type]:
                 if card and card.get('id') == 'profeta':
@@ -2436,6 +2639,9 @@ class Game:
         if not player:
             return 0
         
+        if not self.field_count(username, 'profeta'):
+            return 0
+
         for base_type in ['attack_bases', 'defense_bases']:
             for card in player[base_type]:
                 if card and card.get('id') == 'profeta':
@@ -2445,6 +2651,7 @@ class Game:
                     return 2 - uses
         return 0
 
+    @recorded
     def prophet_curse(self, username, target_player_id, target_card_id):
         if 'no_prophet' in self.modifiers:
             return {'success': False, 'message': 'Modificador Sem Profecia: Profetizar está desativado'}
@@ -2487,14 +2694,10 @@ class Game:
         target_card = None
         target_location = None
         
-        for base_type in ['attack_bases', 'defense_bases']:
-            for i, card in enumerate(target_player[base_type]):
-                if card and card['instance_id'] == target_card_id:
-                    target_card = card
-                    target_location = (base_type, i)
-                    break
-            if target_card:
-                break
+        found = self._locate_on_field(target_card_id, target_player_id)
+        if found:
+            target_location = (found[0], found[1])
+            target_card = found[2]
         
         if not target_card:
             return {'success': False, 'message': 'Carta alvo não encontrada em campo'}
@@ -0,0 +1,72 @@
+"""
+Log de ações e replay determinístico de partidas.
+
+Cada Game tem um random.Random próprio (Game.seed) usado no baralho,
+disfarces, sorteios de feitiço e ids de carta. Os métodos do engine
+marcados com @recorded anotam a chamada em game.action_log (só a de
+fora: chamadas internas entre métodos não duplicam). Com a seed, a
+config e o log, replay_game reconstrói a partida sem sockets nem
+clientes, chamando os mesmos métodos na mesma ordem.
+
+Intervenções de admin (editar mão, peek do baralho...) mexem no estado
+por fora e não entram no log.
+"""
+from __future__ import annotations
+
+import functools
+from typing import Optional
+
+REPLAY_LOG_VERSION = 1
+
+
+def recorded(method):
+    """Anota a chamada em self.action_log antes de executá-la."""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._record_depth == 0 and self.action_log is not None:
+            self.action_log.append([name, list(args), dict(kwargs)])
+        self._record_depth += 1
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._record_depth -= 1
+
+    return wrapper
+
+
+def export_log(game) -> dict:
+    """Tudo que replay_game precisa (JSON puro)."""
+    return {
+        'version': REPLAY_LOG_VERSION,
+        'game_id': game.game_id,
+        'creator': game.creator,
+        'seed': game.seed,
+        'config': dict(game.config or {}),
+        'actions': [list(entry) for entry in game.action_log or []],
+    }
+
+
+def replay_game(log: dict, upto: Optional[int] = None):
+    """
+    Recria a partida do log. `upto` para após as primeiras N ações (para
+    inspecionar o estado num ponto do bug report). Precisa do app criado
+    (o engine emite eventos de sistema como sempre; sem clientes, ninguém
+    recebe).
+    """
+    from twilight.game.engine import Game
+
+    if log.get('version', REPLAY_LOG_VERSION) != REPLAY_LOG_VERSION:
+        raise ValueError(f"versão de log não suportada: {log.get('version')}")
+    game = Game(log['game_id'], log['creator'], dict(log.get('config') or {}), seed=log['seed'])
+    actions = log.get('actions') or []
+    if upto is not None:
+        actions = actions[:upto]
+    for name, args, kwargs in actions:
+        method = getattr(game, name, None)
+        if method is None or not hasattr(method, '__wrapped__'):
+            raise ValueError(f'ação desconhecida no log: {name}')
+        method(*args, **kwargs)
+    return game
+
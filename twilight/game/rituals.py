@@ -1,50 +1,91 @@
 """Verificação e execução de rituais."""
+from twilight.cards.zone import CardZone, zone_count
+
+# Rituais oferecidos na interface (ordem de exibição)
+RITUALS = [
+    {'id': 'ritual_157', 'name': 'Ritual 157', 'description': 'Rouba todos os talismãs de um jogador'},
+    {'id': 'ritual_amor', 'name': 'Ritual Amor', 'description': 'Anula a maldição do Profeta'},
+]
+
+# Requisitos de campo de cada ritual, conferidos em ordem; o primeiro que
+# falha dá a mensagem. Zona 'field' = ataque + defesa. `{count}` é quanto
+# o jogador tem daquela carta.
+RITUAL_REQUIREMENTS = {
+    'ritual_157': [
+        ('field', 'apofis', 1, 'Requer Apofis em campo'),
+        ('field', 'mago_negro', 1, 'Requer Mago Negro em campo'),
+        ('field', 'zumbi', 6, 'Requer 6 zumbis em campo (tem {count})'),
+        ('defense_bases', 'elfo', 2, 'Requer 2 elfos em modo de defesa (tem {count})'),
+    ],
+    'ritual_amor': [
+        ('field', 'ninfa', 1, 'Requer Ninfa Belly Lorem em campo'),
+        ('field', 'vampiro_tayler', 1, 'Requer Vampiro Necrothic Tayler em campo'),
+    ],
+}
+
+RITUAL_OK_MESSAGES = {
+    'ritual_157': 'Ritual 157 pode ser realizado',
+    'ritual_amor': 'Ritual Amor pode ser realizado',
+}
+
+
+def _zone_total(player, zone, card_id):
+    if zone == 'field':
+        return zone_count(player['attack_bases'], card_id) + zone_count(player['defense_bases'], card_id)
+    return zone_count(player[zone], card_id)
+
+
+def _field_key(player):
+    """Identifica o campo atual; None se as bases não são CardZone (sem cache)."""
+    attack = player['attack_bases']
+    defense = player['defense_bases']
+    if not isinstance(attack, CardZone) or not isinstance(defense, CardZone):
+        return None
+    return attack, attack.version, defense, defense.version
+
+
+def ritual_conditions(game, player_id):
+    """
+    {ritual_id: (pode, mensagem)} para todos os rituais da tabela, numa
+    passada só. Guardado em game._ritual_cache até o campo do jogador mudar.
+    """
+    player = game.player_data[player_id]
+    key = _field_key(player)
+    cache = getattr(game, '_ritual_cache', None)
+    if key is not None and cache is not None:
+        cached = cache.get(player_id)
+        if cached is not None and cached[0][0] is key[0] and cached[0][1] == key[1] \
+                and cached[0][2] is key[2] and cached[0][3] == key[3]:
+            return cached[1]
+
+    counts = {}
+    conditions = {}
+    for ritual_id, requirements in RITUAL_REQUIREMENTS.items():
+        result = (True, RITUAL_OK_MESSAGES[ritual_id])
+        for zone, card_id, needed, message in requirements:
+            if (zone, card_id) not in counts:
+                counts[zone, card_id] = _zone_total(player, zone, card_id)
+            count = counts[zone, card_id]
+            if count < needed:
+                result = (False, message.format(count=count))
+                break
+        conditions[ritual_id] = result
+
+    if key is not None and cache is not None:
+        cache[player_id] = (key, conditions)
+    return conditions
+
 
 class RitualManager:
+    @staticmethod
+    def check_ritual(game, caster_id, ritual_id):
+        """(pode, mensagem) do ritual segundo RITUAL_REQUIREMENTS"""
+        return ritual_conditions(game, caster_id)[ritual_id]
+
     @staticmethod
     def check_ritual_157(game, caster_id):
         """Verifica condições do Ritual 157 - Requer Apofis, Mago Negro, 6 zumbis e 2 elfos em modo de defesa"""
-        player = game.player_data[caster_id]
-        
-        # Verificar se tem Apofis em campo (ataque ou defesa)
-        has_apofis = False
-        for card in player['attack_bases'] + player['defense_bases']:
-            if card and card['id'] == 'apofis':
-                has_apofis = True
-                break
-        
-        if not has_apofis:
-            return False, "Requer Apofis em campo"
-        
-        # Verificar se tem Mago Negro em campo
-        has_mago_negro = False
-        for card in player['attack_bases'] + player['defense_bases']:
-            if card and card['id'] == 'mago_negro':
-                has_mago_negro = True
-                break
-        
-        if not has_mago_negro:
-            return False, "Requer Mago Negro em campo"
-        
-        # Contar zumbis em campo (qualquer posição)
-        zumbis_count = 0
-        for card in player['attack_bases'] + player['defense_bases']:
-            if card and card['id'] == 'zumbi':
-                zumbis_count += 1
-        
-        if zumbis_count < 6:
-            return False, f"Requer 6 zumbis em campo (tem {zumbis_count})"
-        
-        # Contar elfos em MODO DE DEFESA
-        elfos_defesa = 0
-        for card in player['defense_bases']:
-            if card and card['id'] == 'elfo':
-                elfos_defesa += 1
-        
-        if elfos_defesa < 2:
-            return False, f"Requer 2 elfos em modo de defesa (tem {elfos_defesa})"
-        
-        return True, "Ritual 157 pode ser realizado"
+        return RitualManager.check_ritual(game, caster_id, 'ritual_157')
     @staticmethod
     def execute_ritual_157(game, caster_id, target_player_id):
         """Executa o Ritual 157 - Rouba todos os talismãs do alvo"""
@@ -57,7 +98,7 @@ class RitualManager:
             stolen_talismans.append(talisman)
         
         # Remover talismãs do alvo
-        target['talismans'] = []
+        target['talismans'] = CardZone()
         
         # Adicionar talismãs ao conjurador
         caster['talismans'].extend(stolen_talismans)
@@ -71,29 +112,7 @@ class RitualManager:
     @staticmethod
     def check_ritual_amor(game, caster_id):
         """Verifica condições do Ritual Amor - Requer Ninfa Belly Lorem e Vampiro Necrothic Tayler"""
-        player = game.player_data[caster_id]
-        
-        # Verificar se tem Ninfa Lorem em campo
-        has_ninfa = False
-        for card in player['attack_bases'] + player['defense_bases']:
-            if card and card['id'] == 'ninfa':
-                has_ninfa = True
-                break
-        
-        if not has_ninfa:
-            return False, "Requer Ninfa Belly Lorem em campo"
-        
-        # Verificar se tem Vampiro Necrothic Tayler em campo
-        has_vampiro = False
-        for card in player['attack_bases'] + player['defense_bases']:
-            if card and card['id'] == 'vampiro_tayler':
-                has_vampiro = True
-                break
-        
-        if not has_vampiro:
-            return False, "Requer Vampiro Necrothic Tayler em campo"
-        
-        return True, "Ritual Amor pode ser realizado"
+        return RitualManager.check_ritual(game, caster_id, 'ritual_amor')
     @staticmethod
     def execute_ritual_amor(game, caster_id, target_player_id):
         """Executa o Ritual Amor - Anula a maldição do Profeta"""
@@ -119,46 +138,17 @@ class RitualManager:
         player = game.player_data[player_id]
         available_rituals = []
         
-        # Verificar se tem carta do ritual na mão (para magos comuns)
-        rituals_in_hand = [card for card in player['hand'] if card.get('type') == 'ritual']
+        # Mago Negro em campo pode realizar qualquer ritual (senão precisa da carta na mão)
+        has_mago_negro = bool(_zone_total(player, 'field', 'mago_negro'))
+        conditions = ritual_conditions(game, player_id)
         
-        # Verificar se tem Mago Negro em campo (pode realizar qualquer ritual)
-        has_mago_negro = False
-        for card in player['attack_bases'] + player['defense_bases']:
-            if card and card['id'] == 'mago_negro':
-                has_mago_negro = True
-                break
-        
-        # Lista de rituais disponíveis
-        ritual_list = [
-            {'id': 'ritual_157', 'name': 'Ritual 157', 'description': 'Rouba todos os talismãs de um jogador'},
-            {'id': 'ritual_amor', 'name': 'Ritual Amor', 'description': 'Anula a maldição do Profeta'}
-        ]
+        for ritual in RITUALS:
+            if has_mago_negro or zone_count(player['hand'], ritual['id']):
+                can_cast, message = conditions[ritual['id']]
+                available_rituals.append(dict(
+                    ritual,
+                    conditions_met=can_cast,
+                    message='✅ Condições atendidas' if can_cast else f'❌ {message}',
+                ))
         
-        for ritual in ritual_list:
-            # Verificar se pode realizar (tem a carta ou é Mago Negro)
-            has_card = any(card['id'] == ritual['id'] for card in rituals_in_hand)
-            
-            if has_card or has_mago_negro:
-                # Verificar condições específicas
-                if ritual['id'] == 'ritual_157':
-                    can_cast, message = RitualManager.check_ritual_157(game, player_id)
-                    if can_cast:
-                        ritual['conditions_met'] = True
-                        ritual['message'] = '✅ Condições atendidas'
-                    else:
-                        ritual['conditions_met'] = False
-                        ritual['message'] = f'❌ {message}'
-                
-                elif ritual['id'] == 'ritual_amor':
-                    can_cast, message = RitualManager.check_ritual_amor(game, player_id)
-                    if can_cast:
-                        ritual['conditions_met'] = True
-                        ritual['message'] = '✅ Condições atendidas'
-                    else:
-                        ritual['conditions_met'] = False
-                        ritual['message'] = f'❌ {message}'
-                
-                available_rituals.append(ritual)
-        
-
+        return available_rituals
@@ -1,17 +1,26 @@
-"""Ciclo de vida da sala: encerrar partidas e limpar salas fantasma."""
+"""
+Ciclo de vida da sala: encerrar partidas e limpar salas fantasma.
+
+Os prazos (close após o fim, lobby ocioso, tolerância de desconexão e a
+varredura periódica) são timers de twilight.game.timers, todos num só
+laço de fundo. start_lifecycle() arma a varredura e liga o registro de
+atividade às mudanças de estado das salas.
+"""
 from __future__ import annotations
 
 import threading
 import time
 from typing import Optional
 
-from twilight.auth.service import clear_game_from_all_accounts
+from twilight.auth.service import clear_game_from_all_accounts, clear_user_game
+from twilight.config import DISCONNECT_GRACE_SECONDS, LIFECYCLE_SWEEP_SECONDS, LOBBY_IDLE_SECONDS
 from twilight.extensions import socketio
+from twilight.game.timers import timers
 from twilight.state import chat_messages, games
 
-# salas com close já agendado (evita timer duplicado)
-_pending_close: set[str] = set()
 _lock = threading.Lock()
+# game_id -> última mudança de estado (relógio dos timers), para o lobby ocioso
+_last_activity: dict[str, float] = {}
 
 # segundos após o fim antes de apagar a sala da memória
 FINISHED_CLOSE_DELAY = 12
@@ -32,8 +41,9 @@ def close_game(game_id: str, message: Optional[str] = None, notify: bool = True)
     Remove a sala da memória e limpa current_game de todos.
     Idempotente.
     """
+    timers.cancel_room(game_id)
+    _last_activity.pop(game_id, None)
     with _lock:
-        _pending_close.discard(game_id)
         game = games.get(game_id)
         if not game:
             # ainda limpa contas residual
@@ -68,21 +78,10 @@ def close_game(game_id: str, message: Optional[str] = None, notify: bool = True)
         return True
 
 
-def _delayed_close(game_id: str, delay: float, message: Optional[str]) -> None:
-    time.sleep(max(0.5, delay))
-    with _lock:
-        still = game_id in _pending_close
-    if not still and game_id not in games:
-        return
-    # só fecha se ainda finished (ou sumiu do pending e já foi fechada)
+def _close_if_finished(game_id: str, message: Optional[str]) -> None:
+    # rematch reabriu a sala (ou já foi fechada): nada a fazer
     game = games.get(game_id)
-    if game is None:
-        with _lock:
-            _pending_close.discard(game_id)
-        return
-    if not getattr(game, 'finished', False):
-        with _lock:
-            _pending_close.discard(game_id)
+    if game is None or not getattr(game, 'finished', False):
         return
     close_game(game_id, message=message, notify=True)
 
@@ -97,21 +96,100 @@ def schedule_close_finished_game(
     if game:
         mark_finished_timestamp(game)
 
-    with _lock:
-        if game_id in _pending_close:
-            return
-        _pending_close.add(game_id)
-
     msg = message or (
         f'Partida encerrada. A sala {game_id} foi fechada automaticamente.'
     )
-    t = threading.Thread(
-        target=_delayed_close,
-        args=(game_id, delay, msg),
-        daemon=True,
-        name=f'close-game-{game_id}',
-    )
-    t.start()
+    timers.schedule(('close', game_id), max(0.5, delay), _close_if_finished, game_id, msg, replace=False)
+
+
+def cancel_finished_close(game_id: str) -> None:
+    """Rematch / nova partida: a sala não deve mais ser fechada."""
+    timers.cancel(('close', game_id))
+
+
+def touch_room(game_id: str) -> None:
+    """Listener de Game.state_listeners: registra atividade e arma o timer de lobby ocioso."""
+    if not game_id:
+        return
+    _last_activity[game_id] = timers.clock()
+    if LOBBY_IDLE_SECONDS > 0 and not timers.is_pending(('idle', game_id)):
+        timers.schedule(('idle', game_id), LOBBY_IDLE_SECONDS, _lobby_idle_check, game_id, replace=False)
+
+
+def _lobby_idle_check(game_id: str) -> None:
+    game = games.get(game_id)
+    if game is None or game.started:
+        # partida em andamento: volta a ser vigiada quando voltar ao lobby
+        return
+    idle = timers.clock() - _last_activity.get(game_id, 0)
+    if idle < LOBBY_IDLE_SECONDS:
+        timers.schedule(('idle', game_id), LOBBY_IDLE_SECONDS - idle, _lobby_idle_check, game_id)
+        return
+    close_game(game_id, message=f'Sala {game_id} fechada por inatividade.', notify=True)
+
+
+def player_disconnected(game_id: str, username: str) -> None:
+    """Começa a tolerância de desconexão do jogador."""
+    if DISCONNECT_GRACE_SECONDS > 0:
+        timers.schedule(('grace', game_id, username), DISCONNECT_GRACE_SECONDS, _grace_expired, game_id, username)
+
+
+def player_reconnected(game_id: str, username: str) -> None:
+    timers.cancel(('grace', game_id, username))
+
+
+def _has_human_online(game) -> bool:
+    for uname in game.players:
+        pdata = game.player_data.get(uname) or {}
+        if not pdata.get('is_bot') and game.get_socket_id(uname):
+            return True
+    return False
+
+
+def _grace_expired(game_id: str, username: str) -> None:
+    game = games.get(game_id)
+    if game is None or username not in game.players or game.get_socket_id(username):
+        return
+    if not game.started:
+        # lobby: libera a vaga de quem não voltou
+        _success, was_creator, _winner = game.remove_player(username)
+        clear_user_game(username, game_id)
+        if was_creator or not game.players:
+            close_game(game_id, message=f'A sala {game_id} foi fechada (criador desconectado).', notify=True)
+            return
+        from twilight.game.chat import broadcast_system_message
+        broadcast_system_message(game_id, f'{username} saiu da sala (desconectado)')
+        socketio.emit('player_left', {
+            'username': username,
+            'message': f'{username} saiu do jogo'
+        }, room=game_id)
+        return
+    # partida em andamento: o jogador segue na mesa; sala sem nenhum humano é abandonada
+    if not _has_human_online(game):
+        close_game(game_id, message=f'Sala {game_id} abandonada.', notify=True)
+
+
+def _sweep() -> None:
+    try:
+        cleanup_stale_games()
+    finally:
+        timers.schedule(('sweep', None), LIFECYCLE_SWEEP_SECONDS, _sweep)
+
+
+def start_lifecycle() -> None:
+    """Liga a varredura periódica e o laço de timers (uma vez por processo)."""
+    from twilight.game.engine import Game
+
+    if touch_room not in Game.state_listeners:
+        Game.state_listeners.append(touch_room)
+    if LIFECYCLE_SWEEP_SECONDS > 0:
+        timers.schedule(('sweep', None), LIFECYCLE_SWEEP_SECONDS, _sweep, replace=False)
+    timers.start()
+
+
+def lifecycle_stats() -> dict:
+    """Timers pendentes por tipo e salas ativas (monitoramento)."""
+    return {'timers': timers.pending(), 'rooms': len(games)}
 
 
 def cleanup_stale_games() -> dict:
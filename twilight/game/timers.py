@@ -0,0 +1,115 @@
+"""
+Timers do ciclo de vida das salas num único laço de fundo.
+
+Antes cada sala encerrada ganhava uma thread que dormia até o close.
+TimerQueue guarda os prazos num heap e um só greenlet (start_background_task
+do socketio) acorda a cada TICK e executa o que venceu. Cada timer tem uma
+chave (tipo, game_id, ...): agendar de novo a mesma chave substitui (ou é
+ignorado com replace=False) e cancel(chave) desarma. Entradas canceladas
+ficam no heap até vencerem e são descartadas (remoção preguiçosa).
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Optional
+
+from twilight.extensions import socketio
+
+# resolução do laço (segundos); os prazos de sala são de segundos/minutos
+TICK = 0.5
+
+
+class TimerQueue:
+    def __init__(self, tick: float = TICK, clock: Callable[[], float] = time.monotonic):
+        self.tick = tick
+        self.clock = clock
+        self._heap: list = []
+        # chave -> (prazo, seq, fn, args); seq diferencia reagendamentos
+        self._timers: dict = {}
+        self._kinds: Counter = Counter()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def schedule(self, key: tuple, delay: float, fn: Callable, *args: Any, replace: bool = True) -> bool:
+        """Arma `fn(*args)` daqui a `delay` s. False se a chave já existia e replace=False."""
+        with self._lock:
+            if key in self._timers:
+                if not replace:
+                    return False
+            else:
+                self._kinds[key[0]] += 1
+            seq = next(self._seq)
+            deadline = self.clock() + max(0.0, delay)
+            self._timers[key] = (deadline, seq, fn, args)
+            heapq.heappush(self._heap, (deadline, seq, key))
+        return True
+
+    def cancel(self, key: tuple) -> bool:
+        with self._lock:
+            return self._forget(key)
+
+    def cancel_room(self, game_id: str) -> int:
+        """Desarma todos os timers da sala (chaves (tipo, game_id, ...))."""
+        with self._lock:
+            keys = [key for key in self._timers if len(key) > 1 and key[1] == game_id]
+            for key in keys:
+                self._forget(key)
+        return len(keys)
+
+    def _forget(self, key: tuple) -> bool:
+        if self._timers.pop(key, None) is None:
+            return False
+        self._kinds[key[0]] -= 1
+        if not self._kinds[key[0]]:
+            del self._kinds[key[0]]
+        return True
+
+    def is_pending(self, key: tuple) -> bool:
+        return key in self._timers
+
+    def pending(self) -> dict:
+        """Timers armados por tipo (monitoramento)."""
+        with self._lock:
+            return dict(self._kinds)
+
+    def run_due(self, now: Optional[float] = None) -> int:
+        """Executa os timers vencidos; retorna quantos rodaram."""
+        now = self.clock() if now is None else now
+        due = []
+        with self._lock:
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                deadline, seq, key = heapq.heappop(heap)
+                timer = self._timers.get(key)
+                # cancelado ou reagendado depois deste push
+                if timer is None or timer[1] != seq:
+                    continue
+                self._forget(key)
+                due.append((key, timer[2], timer[3]))
+        for key, fn, args in due:
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"[timers] falha em {key}: {e}")
+        return len(due)
+
+    def _loop(self) -> None:
+        while True:
+            socketio.sleep(self.tick)
+            self.run_due()
+
+    def start(self) -> None:
+        """Sobe o laço de fundo (uma vez por processo)."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        socketio.start_background_task(self._loop)
+
+
+timers = TimerQueue()
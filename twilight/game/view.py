@@ -0,0 +1,170 @@
+"""
+Estado da partida como cada espectador o vê, e deltas entre versões.
+
+build_game_state monta o mesmo dict que o evento game_state sempre
+enviou. snapshot/diff_state permitem mandar só o que mudou desde a
+última versão que o cliente recebeu.
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from twilight.cards.instance import CardInstance
+
+
+def build_game_state(game, game_id: str, username: str) -> dict:
+    """Estado filtrado para `username` (jogador ou espectador)."""
+    # Determinar o jogador da vez
+    current_turn_username = None
+    if game.players and game.current_turn < len(game.players):
+        current_turn_username = game.players[game.current_turn]
+
+    # Verificar se é espectador
+    is_spectator = game.player_data[username].get('spectator', False)
+
+    # Filtrar informações para o jogador
+    state = {
+        'game_id': game_id,
+        'state_version': game.state_version,
+        'started': game.started,
+        'finished': bool(getattr(game, 'finished', False)),
+        'winner': getattr(game, 'winner', None),
+        'winner_name': (
+            game.player_data.get(game.winner, {}).get('name')
+            if getattr(game, 'winner', None) and game.winner in game.player_data
+            else getattr(game, 'winner', None)
+        ),
+        'time_of_day': game.time_of_day,
+        'time_cycle': game.time_cycle,
+        'current_turn': current_turn_username,
+        'players': {},
+        'deck_count': len(game.deck),
+        'graveyard_count': len(game.graveyard),
+        'is_spectator': is_spectator,
+        'spectators': [],
+        'modifiers': list(game.modifiers or []),
+        'attack_slot_count': getattr(game, 'attack_slot_count', 3),
+        'defense_slot_count': getattr(game, 'defense_slot_count', 6),
+        'tutorial': bool(getattr(game, 'tutorial', False)),
+        'starting_life': getattr(game, 'starting_life', 1200),
+        'day_cycle_length': getattr(game, 'day_cycle_length', 24),
+        'first_round': bool(getattr(game, 'first_round', False)),
+        'attacks_blocked': bool(getattr(game, 'attacks_blocked', False)),
+    }
+
+    # Coletar lista de espectadores
+    for uname, data in game.player_data.items():
+        if data.get('spectator', False) and uname != username:
+            state['spectators'].append({
+                'username': uname,
+                'name': data['name']
+            })
+
+    # Informações de todos os jogadores
+    for uname in game.players:
+        if uname in game.player_data:
+            player_data = game.player_data[uname]
+
+            # Para cada carta em campo, verificar se precisa ofuscar
+            attack_bases = []
+            for card in player_data['attack_bases']:
+                if card:
+                    attack_bases.append(game.get_card_for_player(card, username, uname))
+                else:
+                    attack_bases.append(None)
+
+            defense_bases = []
+            for card in player_data['defense_bases']:
+                if card:
+                    defense_bases.append(game.get_card_for_player(card, username, uname))
+                else:
+                    defense_bases.append(None)
+
+            player_info = {
+                'name': player_data['name'],
+                'username': uname,
+                'life': player_data['life'] if not player_data.get('dead', False) else 0,
+                'attack_bases': attack_bases,
+                'defense_bases': defense_bases,
+                'talisman_count': game.get_player_talismans_count(uname),
+                'runes': game.get_player_runes_count(uname),
+                'dead': player_data.get('dead', False),
+                'observer': player_data.get('observer', False),
+                'is_bot': bool(player_data.get('is_bot', False)),
+            }
+
+            # Informações privadas apenas para o próprio jogador (não para espectadores)
+            if uname == username and not is_spectator and not player_info.get('dead', False):
+                player_info['hand'] = player_data['hand']
+                player_info['equipment'] = player_data['equipment']
+                player_info['talismans'] = player_data['talismans']
+
+            state['players'][uname] = player_info
+
+    return state
+
+
+def snapshot(value: Any) -> Any:
+    """
+    Cópia profunda só de dict/list (o estado é JSON puro). Necessária
+    porque o estado referencia as listas e cartas vivas do Game.
+    """
+    if isinstance(value, CardInstance):
+        value = value.to_dict()
+    if isinstance(value, dict):
+        return {k: snapshot(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [snapshot(v) for v in value]
+    return value
+
+
+def _sync(old: Any, new: Any, path: list, out_set: list, out_unset: list) -> Any:
+    """
+    Compara old (snapshot anterior) com new (estado vivo), anota as
+    diferenças e devolve o novo snapshot reaproveitando o que não mudou.
+    """
+    if isinstance(new, CardInstance):
+        new = new.to_dict()
+    if isinstance(old, dict) and isinstance(new, dict):
+        copied = {}
+        for key, value in new.items():
+            if key in old:
+                path.append(key)
+                copied[key] = _sync(old[key], value, path, out_set, out_unset)
+                path.pop()
+            else:
+                copied[key] = snapshot(value)
+                out_set.append([path + [key], value])
+        if len(copied) != len(old):
+            for key in old:
+                if key not in copied:
+                    out_unset.append(path + [key])
+        return copied
+    if isinstance(old, list) and isinstance(new, (list, tuple)) and len(old) == len(new):
+        # slots de base têm tamanho fixo: compara posição a posição
+        copied = []
+        for i, value in enumerate(new):
+            path.append(i)
+            copied.append(_sync(old[i], value, path, out_set, out_unset))
+            path.pop()
+        return copied
+    if type(old) is type(new) and old == new:
+        return old
+    out_set.append([list(path), new])
+    return snapshot(new)
+
+
+def diff_state(old: dict, new: dict) -> tuple[dict, dict]:
+    """
+    Delta de `old` para `new` e o snapshot de `new` (base do próximo delta).
+    O delta é {'set': [[caminho, valor], ...], 'unset': [caminho, ...]};
+    caminhos são listas de chaves/índices e subárvores iguais não aparecem.
+    """
+    out_set: list = []
+    out_unset: list = []
+    copied = _sync(old, new, [], out_set, out_unset)
+    return {'set': out_set, 'unset': out_unset}, copied
+
+
+def is_empty_diff(delta: Optional[dict]) -> bool:
+    return not delta or (not delta['set'] and not delta['unset'])
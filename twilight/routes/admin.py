@@ -2,15 +2,26 @@
 import json
 import os
 import random
-import uuid
 from datetime import datetime
 
 from flask import Blueprint, jsonify, redirect, render_template, request
 
 from twilight.auth.admin import admin_required, is_admin, is_super_admin
-from twilight.auth.service import get_current_user, load_accounts, login_required, save_accounts
+from twilight.auth.service import (
+    clear_user_game,
+    get_current_user,
+    load_accounts,
+    login_required,
+    save_accounts,
+)
 from twilight.cards.definitions import CARDS
 from twilight.extensions import socketio
+from twilight.game.replay import export_log
+from twilight.game.session import close_game, lifecycle_stats
+from twilight.routes.http_cache import StaticJSON
+from twilight.sockets.push import state_message
+from twilight.sockets.ratelimit import rate_limit_stats
+from twilight.sockets.registry import release_member
 from twilight.state import games
 from twilight.storage.story_saves import get_user_save_file
 from twilight.game.chat import broadcast_system_message
@@ -21,12 +32,7 @@ bp = Blueprint('admin', __name__)
 def _emit_admin_private(game, target_username, payload):
     """Avisa só o jogador-alvo (sem chat e sem broadcast da sala)."""
     try:
-        sid = game.get_socket_id(target_username) if hasattr(game, 'get_socket_id') else None
-        if not sid:
-            for s, u in (getattr(game, 'socket_to_username', {}) or {}).items():
-                if u == target_username:
-                    sid = s
-                    break
+        sid = game.get_socket_id(target_username)
         if sid:
             socketio.emit('admin_action', payload, room=sid)
     except Exception:
@@ -164,6 +170,18 @@ def api_admin_games(username):
     
     return jsonify({'success': True, 'games': games_list})
 
+@bp.route('/api/admin/lifecycle')
+@admin_required
+def api_admin_lifecycle(username):
+    """Timers de sala pendentes (close, idle, grace, sweep)"""
+    return jsonify({'success': True, **lifecycle_stats()})
+
+@bp.route('/api/admin/ratelimits')
+@admin_required
+def api_admin_ratelimits(username):
+    """Contadores dos token buckets (chat, ações, pedidos de estado)"""
+    return jsonify({'success': True, 'limiters': rate_limit_stats()})
+
 @bp.route('/api/admin/game/<game_id>/force-end', methods=['POST'])
 @admin_required
 def api_admin_force_end(admin_username, game_id):
@@ -179,22 +197,8 @@ def api_admin_force_end(admin_username, game_id):
         'admin': admin_username
     }, room=game_id)
     
-    # Limpar referências dos jogadores
-    accounts = load_accounts()
-    for username in game.players:
-        if username in accounts and accounts[username].get('current_game') == game_id:
-            accounts[username]['current_game'] = None
-    
-    # Remover espectadores também
-    for username, data in game.player_data.items():
-        if data.get('spectator', False) and username in accounts:
-            if accounts[username].get('current_game') == game_id:
-                accounts[username]['current_game'] = None
-    
-    save_accounts(accounts)
-    
-    # Remover o jogo
-    del games[game_id]
+    # Remover o jogo: timers da sala, current_game das contas e chat
+    close_game(game_id, notify=False)
     
     return jsonify({'success': True, 'message': f'Jogo {game_id} encerrado'})
 
@@ -211,45 +215,9 @@ def api_admin_sync_game(admin_username, game_id):
     for username in game.players:
         socket_id = game.get_socket_id(username)
         if socket_id and username in game.player_data:
-            # Construir estado para cada jogador
-            current_turn_username = None
-            if game.players and game.current_turn < len(game.players):
-                current_turn_username = game.players[game.current_turn]
-            
-            state = {
-                'game_id': game_id,
-                'started': game.started,
-                'time_of_day': game.time_of_day,
-                'time_cycle': game.time_cycle,
-                'current_turn': current_turn_username,
-                'players': {},
-                'deck_count': len(game.deck),
-                'graveyard_count': len(game.graveyard),
-                'current_player_dead': game.player_data[username].get('dead', False)
-            }
-            
-            for uname in game.players:
-                if uname in game.player_data:
-                    player_info = {
-                        'name': game.player_data[uname]['name'],
-                        'username': uname,
-                        'life': game.player_data[uname]['life'] if not game.player_data[uname].get('dead', False) else 0,
-                        'attack_bases': game.player_data[uname]['attack_bases'],
-                        'defense_bases': game.player_data[uname]['defense_bases'],
-                        'talisman_count': len(game.player_data[uname]['talismans']),
-                        'runes': game.player_data[uname]['runes'],
-                        'dead': game.player_data[uname].get('dead', False),
-                        'observer': game.player_data[uname].get('observer', False)
-                    }
-                    
-                    if uname == username and not player_info.get('dead', False):
-                        player_info['hand'] = game.player_data[uname]['hand']
-                        player_info['equipment'] = game.player_data[uname]['equipment']
-                        player_info['talismans'] = game.player_data[uname]['talismans']
-                    
-                    state['players'][uname] = player_info
-            
-            socketio.emit('game_state', state, room=socket_id)
+            # estado completo com state_version (vira a base dos próximos deltas)
+            event, payload = state_message(game, game_id, socket_id, username)
+            socketio.emit(event, payload, room=socket_id)
             synced += 1
     
     socketio.emit('admin_sync_complete', {
@@ -274,10 +242,9 @@ def api_admin_kick_player(admin_username, game_id, target_username):
     success, was_creator, winner = game.remove_player(target_username)
     
     # Limpar jogo atual da conta
-    accounts = load_accounts()
-    if target_username in accounts and accounts[target_username].get('current_game') == game_id:
-        accounts[target_username]['current_game'] = None
-        save_accounts(accounts)
+    clear_user_game(target_username, game_id)
+    # Socket do expulso deixa de contar como membro da sala
+    release_member(game_id, target_username)
     
     # Notificar sala
     socketio.emit('player_kicked', {
@@ -291,7 +258,7 @@ def api_admin_kick_player(admin_username, game_id, target_username):
         socketio.emit('room_closed', {
             'message': f'O criador foi removido pelo admin. A sala foi fechada.'
         }, room=game_id)
-        del games[game_id]
+        close_game(game_id, notify=False)
         return jsonify({'success': True, 'message': f'Jogador {target_username} removido e sala fechada'})
     
     return jsonify({'success': True, 'message': f'Jogador {target_username} removido do jogo'})
@@ -384,9 +351,10 @@ def api_admin_give_card(admin_username, game_id, target_username):
     
     for _ in range(min(quantity, 50)):  # Máximo 50 cartas por vez
         new_card = card_info.copy()
-        new_card['instance_id'] = str(uuid.uuid4())[:8]
+        new_card['instance_id'] = game.new_instance_id()
         player['hand'].append(new_card)
         cards_given.append(new_card['name'])
+    game.bump_state_version()
     
     # Silencioso: sem chat / sem aviso na sala (só o alvo, se quiser UI)
     _emit_admin_private(game, target_username, {
@@ -445,6 +413,7 @@ def api_admin_remove_card(admin_username, game_id, target_username):
             cards_removed.append(card)
     
     if cards_removed:
+        game.bump_state_version()
         # Silencioso no chat / sala
         _emit_admin_private(game, target_username, {
             'type': 'cards_removed',
@@ -492,6 +461,7 @@ def api_admin_modify_life(admin_username, game_id, target_username):
     if player['life'] <= 0 and not player.get('dead', False):
         game.process_player_death(target_username)
         message += f' 💀 {target_username} MORREU!'
+    game.bump_state_version()
     
     # Vida: sem chat público (só o alvo)
     _emit_admin_private(game, target_username, {
@@ -529,25 +499,26 @@ def api_admin_modify_hand(admin_username, game_id, target_username):
     player = game.player_data[target_username]
     
     if action == 'clear':
-        player['hand'] = []
+        player['hand'].clear()
         message = f'Admin limpou toda a mão de {target_username}'
     elif action == 'add':
         for card_id in cards:
             if card_id in CARDS:
                 new_card = CARDS[card_id].copy()
-                new_card['instance_id'] = str(uuid.uuid4())[:8]
+                new_card['instance_id'] = game.new_instance_id()
                 player['hand'].append(new_card)
         message = f'Admin adicionou {len(cards)} carta(s) para {target_username}'
     elif action == 'set':
-        player['hand'] = []
+        player['hand'].clear()
         for card_id in cards:
             if card_id in CARDS:
                 new_card = CARDS[card_id].copy()
-                new_card['instance_id'] = str(uuid.uuid4())[:8]
+                new_card['instance_id'] = game.new_instance_id()
                 player['hand'].append(new_card)
         message = f'Admin definiu a mão de {target_username} com {len(cards)} carta(s)'
     else:
         return jsonify({'success': False, 'message': 'Ação inválida'}), 400
+    game.bump_state_version()
     
     _emit_admin_private(game, target_username, {
         'type': 'hand_modified',
@@ -604,7 +575,7 @@ def api_admin_modify_field(admin_username, game_id, target_username):
             return jsonify({'success': False, 'message': 'Carta inválida'}), 400
         
         new_card = CARDS[card_id].copy()
-        new_card['instance_id'] = str(uuid.uuid4())[:8]
+        new_card['instance_id'] = game.new_instance_id()
         
         if position_type == 'attack' and 0 <= position_index < len(player['attack_bases']):
             # Se já tem carta, vai pro cemitério
@@ -621,6 +592,7 @@ def api_admin_modify_field(admin_username, game_id, target_username):
             return jsonify({'success': False, 'message': 'Posição inválida'}), 400
     else:
         return jsonify({'success': False, 'message': 'Ação inválida'}), 400
+    game.bump_state_version()
     
     # Campo: sem anúncio no chat (evita denunciar buffs secretos)
     _emit_admin_private(game, target_username, {
@@ -652,6 +624,7 @@ def api_admin_set_turn(admin_username, game_id):
         if p == target_username:
             game.current_turn = i
             break
+    game.bump_state_version()
     
     broadcast_system_message(game_id, f'👑 Admin alterou o turno para {target_username}')
     
@@ -682,6 +655,7 @@ def api_admin_set_time(admin_username, game_id):
     
     if time_of_day == 'day':
         game.apply_day_effects()
+    game.bump_state_version()
     
     broadcast_system_message(game_id, f'🌓 Admin alterou o ciclo: {old_time.upper()} → {time_of_day.upper()}')
     
@@ -701,11 +675,21 @@ def api_admin_shuffle_deck(admin_username, game_id):
         return jsonify({'success': False, 'message': 'Jogo não encontrado'}), 404
     
     game = games[game_id]
-    random.shuffle(game.deck)
+    game.deck.shuffle()
+    game.bump_state_version()
     # Embaralhar é silencioso (não denuncia no chat)
     
     return jsonify({'success': True, 'deck_count': len(game.deck)})
 
+@bp.route('/api/admin/game/<game_id>/replay', methods=['GET'])
+@admin_required
+def api_admin_replay_log(admin_username, game_id):
+    """Seed + log de ações da sala (reproduzir com apps/replay.py)"""
+    if game_id not in games:
+        return jsonify({'success': False, 'message': 'Jogo não encontrado'}), 404
+    
+    return jsonify({'success': True, 'replay': export_log(games[game_id])})
+
 @bp.route('/api/admin/game/<game_id>/deck/peek', methods=['GET'])
 @admin_required
 def api_admin_peek_deck(admin_username, game_id):
@@ -773,6 +757,7 @@ def api_admin_revive_card(admin_username, game_id):
     # Se for criatura, restaurar vida original
     if card.get('type') == 'creature' and card.get('id') in CARDS:
         card['life'] = CARDS[card['id']].get('life', card.get('life', 512))
+    game.bump_state_version()
     
     # Silencioso no chat (beneficia o jogador sem avisar a sala)
     _emit_admin_private(game, target_username, {
@@ -803,6 +788,7 @@ def api_admin_kill_player(admin_username, game_id, target_username):
         return jsonify({'success': False, 'message': 'Jogador já está morto'}), 400
     
     game.process_player_death(target_username)
+    game.bump_state_version()
     
     broadcast_system_message(game_id, f'💀 Admin matou {target_username}!')
     
@@ -828,15 +814,13 @@ def api_admin_revive_player(admin_username, game_id, target_username):
     player['dead'] = False
     player['observer'] = False
     player['life'] = 5000
+    game.bump_state_version()
     
     broadcast_system_message(game_id, f'✨ Admin reviveu {target_username}!')
     
     return jsonify({'success': True, 'message': f'{target_username} foi revivido'})
 
-@bp.route('/api/admin/cards/list')
-@admin_required
-def api_admin_cards_list(admin_username):
-    """Lista todas as cartas disponíveis"""
+def _build_cards_list():
     cards_list = []
     for card_id, card_info in CARDS.items():
         cards_list.append({
@@ -852,10 +836,21 @@ def api_admin_cards_list(admin_username):
     # Ordenar por tipo e nome
     cards_list.sort(key=lambda x: (x['type'], x['name']))
     
-    return jsonify({
+    return {
         'success': True,
         'count': len(cards_list),
         'cards': cards_list
-    })
+    }
+
+
+# CARDS é fixo em runtime: lista serializada uma vez no import
+_CARDS_LIST_JSON = StaticJSON(_build_cards_list(), cache_control='private, no-cache')
+
+
+@bp.route('/api/admin/cards/list')
+@admin_required
+def api_admin_cards_list(admin_username):
+    """Lista todas as cartas disponíveis"""
+    return _CARDS_LIST_JSON.response()
 
 
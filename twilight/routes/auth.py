@@ -2,12 +2,15 @@
 from flask import Blueprint, jsonify, make_response, request
 
 from twilight.auth.service import (
+    PasswordPoolBusy,
     clear_user_game,
+    create_account,
     create_token,
+    get_account,
     get_current_user,
     hash_password,
-    load_accounts,
-    save_accounts,
+    needs_rehash,
+    set_password,
     verify_password,
 )
 from twilight.config import JWT_EXPIRATION_HOURS, now_sp_iso
@@ -16,6 +19,11 @@ from twilight.state import games
 bp = Blueprint('auth', __name__)
 
 
+def _busy_response():
+    """Pool de hash de senhas cheio: recusa rápido em vez de travar o worker."""
+    return jsonify({'success': False, 'message': 'Servidor ocupado, tente novamente em instantes'}), 503, {'Retry-After': '1'}
+
+
 @bp.route('/api/register', methods=['POST'])
 def register():
     data = request.json
@@ -26,18 +34,21 @@ def register():
     if len(username) < 3 or len(username) > 20: return jsonify({'success': False, 'message': 'Usuário deve ter entre 3 e 20 caracteres'})
     if len(password) < 4: return jsonify({'success': False, 'message': 'Senha deve ter pelo menos 4 caracteres'})
     
-    accounts = load_accounts()
-    
-    if username in accounts: return jsonify({'success': False, 'message': 'Usuário já existe'})
+    if get_account(username) is not None: return jsonify({'success': False, 'message': 'Usuário já existe'})
     
+    try:
+        hashed = hash_password(password)
+    except PasswordPoolBusy:
+        return _busy_response()
+
     # Criar nova conta
-    accounts[username] = {
-        'password': hash_password(password),
+    created = create_account(username, {
+        'password': hashed,
         'created_at': now_sp_iso(),
         'current_game': None  # Nenhum jogo ativo
-    }
+    })
     
-    save_accounts(accounts)
+    if not created: return jsonify({'success': False, 'message': 'Usuário já existe'})
     
     # Criar token
     token = create_token(username)
@@ -59,15 +70,24 @@ def register():
 @bp.route('/api/login', methods=['POST'])
 def login():
     data = request.json
-    username = data.get('username', '').strip().lower()
+    username = data.get('username', '').strip()
     password = data.get('password', '').strip()
     
     if not username or not password: return jsonify({'success': False, 'message': 'Usuário e senha obrigatórios'})
     
-    accounts = load_accounts()
+    # busca sem diferenciar maiúsculas; daqui em diante vale o nome gravado
+    # (token, salas, current_game e admin comparam o nome exato)
+    account = get_account(username)
     
-    if username not in accounts: return jsonify({'success': False, 'message': 'Usuário ou senha inválidos'})
-    if not verify_password(password, accounts[username]['password']): return jsonify({'success': False, 'message': 'Usuário ou senha inválidos'})
+    if account is None: return jsonify({'success': False, 'message': 'Usuário ou senha inválidos'})
+    username = account.get('username') or username
+    try:
+        if not verify_password(password, account['password']): return jsonify({'success': False, 'message': 'Usuário ou senha inválidos'})
+        # Migra hash legado / com menos iterações que PASSWORD_ITERATIONS
+        if needs_rehash(account['password']):
+            set_password(username, hash_password(password))
+    except PasswordPoolBusy:
+        return _busy_response()
     
     # Criar token
     token = create_token(username)
@@ -75,7 +95,7 @@ def login():
     response = jsonify({
         'success': True,
         'username': username,
-        'current_game': accounts[username].get('current_game')
+        'current_game': account.get('current_game')
     })
     
     response.set_cookie(
@@ -106,8 +126,8 @@ def check_auth():
     if not username:
         return jsonify({'authenticated': False})
     
-    accounts = load_accounts()
-    current_game = accounts.get(username, {}).get('current_game')
+    account = get_account(username) or {}
+    current_game = account.get('current_game')
     
     # Verificar se o jogo ainda existe (lobby pós-rematch conta como ativo)
     if current_game and current_game in games:
@@ -122,9 +142,8 @@ def check_auth():
         })
     else:
         # Se o jogo não existe mais, limpar da conta
-        if current_game and username in accounts:
-            accounts[username]['current_game'] = None
-            save_accounts(accounts)
+        if current_game:
+            clear_user_game(username, current_game)
         
         return jsonify({
             'authenticated': True,
@@ -154,8 +173,7 @@ def api_auth_status():
     if not username:
         return jsonify({'logged_in': False})
     
-    accounts = load_accounts()
-    user_data = accounts.get(username, {})
+    user_data = get_account(username) or {}
     admin_level = int(user_data.get('admin_level', user_data.get('level', 0)) or 0)
     
     return jsonify({
@@ -11,10 +11,15 @@ from twilight.extensions import socketio
 from twilight.game.ai import TUTORIAL_BOT_NAME, TUTORIAL_TIPS, add_tutorial_bot, schedule_bot_turn
 from twilight.game.chat import broadcast_system_message
 from twilight.game.engine import Game
+from twilight.game.session import cancel_finished_close, touch_room
+from twilight.routes.http_cache import StaticJSON
 from twilight.state import games
 
 bp = Blueprint('games', __name__)
 
+# MODIFIERS não muda em runtime: serializa uma vez (ETag fixo por deploy)
+_MODIFIERS_JSON = StaticJSON({'modifiers': MODIFIERS})
+
 
 @bp.route('/api/games')
 def get_games():
@@ -40,7 +45,7 @@ def get_games():
 
 @bp.route('/api/modifiers')
 def get_modifiers():
-    return jsonify({'modifiers': MODIFIERS})
+    return _MODIFIERS_JSON.response()
 
 
 @bp.route('/api/create-game', methods=['POST'])
@@ -60,6 +65,8 @@ def create_game():
     
     game_id = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
     games[game_id] = Game(game_id, username, config)
+    # arma o timer de lobby ocioso mesmo que ninguém chegue a entrar
+    touch_room(game_id)
     
     return jsonify({'game_id': game_id, 'config': config})
 
@@ -95,6 +102,7 @@ def start_tutorial():
     game.tutorial = True
     add_tutorial_bot(game, TUTORIAL_BOT_NAME)
     games[game_id] = game
+    touch_room(game_id)
 
     return jsonify({
         'success': True,
@@ -131,16 +139,13 @@ def start_game(game_id):
     # Se ainda estiver "finished" por algum motivo, reabre lobby
     if getattr(game, 'finished', False):
         game.reset_to_lobby(last_winner=getattr(game, 'winner', None))
+        cancel_finished_close(game_id)
 
     if game.started:
         return jsonify({'success': False, 'message': 'O jogo já está em andamento'}), 400
     
     if len(game.players) >= 2:  # Mínimo 2 jogadores
-        game.started = True
-        game.finished = False
-        game.finished_at = None
-        game.winner = None
-        game._game_over_emitted = False
+        game.start()
         if getattr(game, 'tutorial', False):
             broadcast_system_message(
                 game_id,
@@ -0,0 +1,82 @@
+"""
+Respostas JSON com validação HTTP (ETag / Last-Modified / 304).
+
+Payloads estáticos (cartas, modificadores) são serializados uma vez no
+import; rotas dinâmicas derivam o ETag de um contador de versão. Em
+ambos os casos o 304 sai antes de consultar o SQLite ou rodar jsonify.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from email.utils import formatdate
+from typing import Optional
+
+from flask import Response, request
+
+
+def _etag_for(*parts) -> str:
+    raw = '\x1f'.join(str(p) for p in parts).encode('utf-8')
+    return hashlib.sha1(raw).hexdigest()[:20]
+
+
+def dumps(obj) -> bytes:
+    """Mesmo formato do jsonify em produção (chaves ordenadas, compacto)."""
+    return (json.dumps(obj, sort_keys=True, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+class StaticJSON:
+    """Payload serializado uma vez; ETag = hash do corpo."""
+
+    def __init__(self, obj, cache_control: str = 'public, no-cache'):
+        self.body = dumps(obj)
+        self.etag = hashlib.sha1(self.body).hexdigest()[:20]
+        self.last_modified = time.time()
+        self.cache_control = cache_control
+
+    def response(self) -> Response:
+        return not_modified(self.etag, self.last_modified, self.cache_control) or json_response(
+            self.body, self.etag, self.last_modified, self.cache_control
+        )
+
+
+def versioned_etag(version: str, *vary) -> str:
+    """ETag para conteúdo identificado por versão + o que muda a resposta."""
+    return _etag_for(version, *vary)
+
+
+def not_modified(
+    etag: str,
+    last_modified: Optional[float] = None,
+    cache_control: str = 'private, no-cache',
+) -> Optional[Response]:
+    """304 se o cliente já tem essa versão (If-None-Match tem prioridade)."""
+    if request.if_none_match:
+        if not request.if_none_match.contains_weak(etag):
+            return None
+    elif last_modified is None or request.if_modified_since is None:
+        return None
+    elif int(last_modified) > request.if_modified_since.timestamp():
+        return None
+    response = Response(status=304)
+    _set_validators(response, etag, last_modified, cache_control)
+    return response
+
+
+def json_response(
+    body: bytes,
+    etag: str,
+    last_modified: Optional[float] = None,
+    cache_control: str = 'private, no-cache',
+) -> Response:
+    response = Response(body, mimetype='application/json')
+    _set_validators(response, etag, last_modified, cache_control)
+    return response
+
+
+def _set_validators(response: Response, etag: str, last_modified, cache_control: str) -> None:
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.headers['Last-Modified'] = formatdate(int(last_modified), usegmt=True)
+    response.headers['Cache-Control'] = cache_control
@@ -4,22 +4,36 @@ import uuid
 
 from flask import Blueprint, jsonify, request
 
-from twilight.auth.service import get_current_user, load_accounts, login_required
+from twilight.auth.service import get_account, get_current_user, login_required
 from twilight.config import now_sp_iso
-from twilight.storage.journal import load_journal, save_journal
+from twilight.routes.http_cache import dumps, json_response, not_modified, versioned_etag
+from twilight.storage.journal import (
+    JOURNAL_ADMIN_ONLY_TYPES,
+    delete_journal_entry,
+    get_journal_entry,
+    insert_journal_entry,
+    journal_entry_admin_only,
+    journal_stats,
+    journal_version,
+    normalize_journal_entry,
+    query_journal,
+    update_journal_entry,
+)
 
 bp = Blueprint('journal', __name__)
 
 # Tipos públicos de release
 PUBLIC_TYPES = frozenset({'major', 'minor', 'patch'})
 # ROADMAP e afins: só staff
-ADMIN_ONLY_TYPES = frozenset({'roadmap', 'plan', 'internal'})
+ADMIN_ONLY_TYPES = JOURNAL_ADMIN_ONLY_TYPES
+# Página padrão de /api/journal/entries
+JOURNAL_PAGE_SIZE = 20
 
 
 def _admin_level(username):
     if not username:
         return 0
-    acc = load_accounts().get(username, {}) or {}
+    acc = get_account(username) or {}
     try:
         return int(acc.get('admin_level', acc.get('level', 0)) or 0)
     except (TypeError, ValueError):
@@ -28,47 +42,57 @@ def _admin_level(username):
 
 def _is_admin_only_entry(entry):
     """ROADMAP / visibility admin — oculto de usuários comuns."""
-    if not entry:
-        return False
-    t = (entry.get('type') or '').strip().lower()
-    if t in ADMIN_ONLY_TYPES:
-        return True
-    vis = (entry.get('visibility') or entry.get('visible') or 'public')
-    if isinstance(vis, str) and vis.strip().lower() in ('admin', 'private', 'hidden', 'staff'):
-        return True
-    if entry.get('hidden') is True:
-        return True
-    return False
+    return journal_entry_admin_only(entry)
 
 
 def _normalize_entry_visibility(entry):
     """Garante visibility coerente com type=roadmap."""
-    if not entry:
-        return entry
-    t = (entry.get('type') or '').strip().lower()
-    if t in ADMIN_ONLY_TYPES:
-        entry['visibility'] = 'admin'
-        entry['type'] = 'roadmap' if t in ('plan', 'internal', 'roadmap') else t
-    else:
-        entry.setdefault('visibility', 'public')
-    return entry
+    return normalize_journal_entry(entry)
 
 
 @bp.route('/api/journal/entries')
 def api_journal_entries():
+    """
+    Página do journal: ?limit=&cursor=&tag=&filter=all|public|roadmap.
+    Resposta traz next_cursor (None na última página) e, na primeira
+    página, os totais das releases públicas.
+    """
     username = get_current_user()
     can_see_roadmap = _admin_level(username) >= 1
 
-    entries = load_journal()
-    if not can_see_roadmap:
-        entries = [e for e in entries if not _is_admin_only_entry(e)]
+    # 304 sem tocar no SQLite: ETag = versão do journal + visão + query
+    version, mtime = journal_version()
+    etag = versioned_etag(version, int(can_see_roadmap), request.query_string)
+    cached = not_modified(etag, mtime)
+    if cached is not None:
+        return cached
 
-    entries_sorted = sorted(entries, key=lambda x: x.get('date', ''), reverse=True)
-    return jsonify({
+    try:
+        limit = int(request.args.get('limit', JOURNAL_PAGE_SIZE))
+    except (TypeError, ValueError):
+        limit = JOURNAL_PAGE_SIZE
+    entry_filter = (request.args.get('filter') or 'all').strip().lower()
+    include_admin = can_see_roadmap and entry_filter != 'public'
+    cursor = request.args.get('cursor') or None
+    try:
+        entries, next_cursor = query_journal(
+            include_admin=include_admin,
+            limit=limit,
+            cursor=cursor,
+            tag=request.args.get('tag') or None,
+            only_admin=include_admin and entry_filter == 'roadmap',
+        )
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Cursor inválido'}), 400
+
+    return json_response(dumps({
         'success': True,
-        'entries': entries_sorted,
+        'entries': entries,
+        'next_cursor': next_cursor,
+        # totais só na primeira página (as seguintes só anexam entradas)
+        'stats': None if cursor else journal_stats(),
         'can_see_roadmap': can_see_roadmap,
-    })
+    }), etag, mtime)
 
 
 @bp.route('/api/journal/entry/<entry_id>')
@@ -76,13 +100,16 @@ def api_journal_entry(entry_id):
     username = get_current_user()
     can_see_roadmap = _admin_level(username) >= 1
 
-    entries = load_journal()
-    for entry in entries:
-        if entry.get('id') == entry_id:
-            if _is_admin_only_entry(entry) and not can_see_roadmap:
-                return jsonify({'success': False, 'message': 'Entrada não encontrada'}), 404
-            return jsonify({'success': True, 'entry': entry})
-    return jsonify({'success': False, 'message': 'Entrada não encontrada'}), 404
+    version, mtime = journal_version()
+    etag = versioned_etag(version, int(can_see_roadmap), entry_id)
+    cached = not_modified(etag, mtime)
+    if cached is not None:
+        return cached
+
+    entry = get_journal_entry(entry_id)
+    if entry is None or (_is_admin_only_entry(entry) and not can_see_roadmap):
+        return jsonify({'success': False, 'message': 'Entrada não encontrada'}), 404
+    return json_response(dumps({'success': True, 'entry': entry}), etag, mtime)
 
 
 @bp.route('/api/journal/create', methods=['POST'])
@@ -119,10 +146,9 @@ def api_journal_create(username):
         'tags': data.get('tags', [])
     }
     _normalize_entry_visibility(new_entry)
-    
-    entries = load_journal()
-    entries.append(new_entry)
-    save_journal(entries)
+
+    # id = timestamp em ms; dois creates no mesmo ms pegam o próximo livre
+    new_entry = insert_journal_entry(new_entry)
     
     return jsonify({'success': True, 'entry': new_entry})
 
@@ -136,68 +162,38 @@ def api_journal_update(username, entry_id):
         return jsonify({'success': False, 'message': 'Apenas administradores podem editar entradas'}), 403
     
     data = request.json or {}
-    entries = load_journal()
-    
-    entry_index = None
-    for i, entry in enumerate(entries):
-        if entry.get('id') == entry_id:
-            entry_index = i
-            break
-    
-    if entry_index is None:
-        return jsonify({'success': False, 'message': 'Entrada não encontrada'}), 404
 
-    entry_type = data.get('type', entries[entry_index].get('type', 'minor'))
+    # Só os campos enviados mudam; o resto vem da versão atual no banco
+    changes = {
+        k: data[k]
+        for k in ('version', 'title', 'description', 'features', 'improvements', 'bugfixes', 'tags', 'visibility')
+        if k in data
+    }
+    entry_type = data.get('type')
     if isinstance(entry_type, str):
         entry_type = entry_type.strip().lower()
         if entry_type in ('plan', 'internal'):
             entry_type = 'roadmap'
+    if 'type' in data:
+        changes['type'] = entry_type
+
+    entry = update_journal_entry(entry_id, changes)
+    if entry is None:
+        return jsonify({'success': False, 'message': 'Entrada não encontrada'}), 404
     
-    # Atualizar campos
-    entries[entry_index].update({
-        'version': data.get('version', entries[entry_index]['version']),
-        'title': data.get('title', entries[entry_index]['title']),
-        'description': data.get('description', entries[entry_index].get('description', '')),
-        'type': entry_type,
-        'features': data.get('features', entries[entry_index].get('features', [])),
-        'improvements': data.get('improvements', entries[entry_index].get('improvements', [])),
-        'bugfixes': data.get('bugfixes', entries[entry_index].get('bugfixes', [])),
-        'tags': data.get('tags', entries[entry_index].get('tags', []))
-    })
-    if 'visibility' in data:
-        entries[entry_index]['visibility'] = data.get('visibility')
-    _normalize_entry_visibility(entries[entry_index])
-    
-    save_journal(entries)
-    
-    return jsonify({'success': True, 'entry': entries[entry_index]})
+    return jsonify({'success': True, 'entry': entry})
 
 
 @bp.route('/api/journal/delete/<entry_id>', methods=['DELETE'])
 @login_required
 def api_journal_delete(username, entry_id):
-    accounts = load_accounts()
-    acc = accounts.get(username, {})
-    admin_level = acc.get('admin_level', acc.get('level', 0))
+    admin_level = _admin_level(username)
     
     if admin_level < 4:
         return jsonify({'success': False, 'message': 'Apenas administradores podem excluir entradas'}), 403
     
-    entries = load_journal()
-    
-    entry_index = None
-    for i, entry in enumerate(entries):
-        if entry.get('id') == entry_id:
-            entry_index = i
-            break
-    
-    if entry_index is None:
+    removed = delete_journal_entry(entry_id)
+    if removed is None:
         return jsonify({'success': False, 'message': 'Entrada não encontrada'}), 404
     
-    removed = entries.pop(entry_index)
-    save_journal(entries)
-    
     return jsonify({'success': True, 'removed': removed})
-
-
-
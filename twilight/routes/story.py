@@ -4,7 +4,7 @@ import os
 
 from flask import Blueprint, jsonify, request
 
-from twilight.auth.service import load_accounts, login_required, save_accounts
+from twilight.auth.service import login_required, patch_account_meta
 from twilight.config import now_sp_iso
 from twilight.storage.story_saves import get_user_save_file
 
@@ -29,11 +29,10 @@ def api_save_game(username):
             json.dump(save_data, f, indent=2)
         
         # Adicionar metadados da conta
-        accounts = load_accounts()
-        if username in accounts:
-            accounts[username]['last_save_time'] = now_sp_iso()
-            accounts[username]['last_save_character'] = save_data.get('character', {}).get('name')
-            save_accounts(accounts)
+        patch_account_meta(username, {
+            'last_save_time': now_sp_iso(),
+            'last_save_character': save_data.get('character', {}).get('name'),
+        })
         
         return jsonify({
             'success': True, 
@@ -75,10 +74,7 @@ def api_load_game(username):
             }), 410
         
         # Atualizar metadados da conta
-        accounts = load_accounts()
-        if username in accounts:
-            accounts[username]['last_load_time'] = now_sp_iso()
-            save_accounts(accounts)
+        patch_account_meta(username, {'last_load_time': now_sp_iso()})
         
         return jsonify({
             'success': True, 
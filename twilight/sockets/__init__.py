@@ -3,4 +3,14 @@
 
 def register_socket_handlers():
     # side-effect import: @socketio.on decorators
+    from twilight.game.engine import Game
+    from twilight.game.session import start_lifecycle
     from twilight.sockets import handlers  # noqa: F401
+    from twilight.sockets.push import schedule_state_push
+
+    # toda mudança de estado agenda o envio para a sala
+    if schedule_state_push not in Game.state_listeners:
+        Game.state_listeners.append(schedule_state_push)
+
+    # timers de sala (close pós-partida, lobby ocioso, desconexão, varredura)
+    start_lifecycle()
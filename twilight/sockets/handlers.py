@@ -14,10 +14,40 @@ from twilight.auth.service import (
     update_user_game,
 )
 from twilight.extensions import socketio
-from twilight.game.chat import add_chat_message, broadcast_system_message, censor_text
+from twilight.game.chat import (
+    add_chat_message,
+    broadcast_system_message,
+    censor_text,
+    get_chat_history,
+    system_message_batch,
+)
 from twilight.game.engine import Game
-from twilight.game.session import close_game, schedule_close_finished_game
-from twilight.state import chat_messages, games, players
+from twilight.game.session import (
+    cancel_finished_close,
+    close_game,
+    player_disconnected,
+    player_reconnected,
+    schedule_close_finished_game,
+)
+from twilight.sockets.push import state_message
+from twilight.sockets.ratelimit import allow_action, allow_chat, allow_state_request, state_retry_after
+from twilight.sockets.registry import (
+    bind_sid,
+    set_sid_game,
+    sid_username,
+    unbind_sid,
+)
+from twilight.state import games, players
+
+
+def _session_user():
+    """Usuário do socket (verificado no connect; relê o cookie só se anônimo)."""
+    username = sid_username(request.sid)
+    if username is None:
+        username = get_current_user()
+        if username:
+            bind_sid(request.sid, username)
+    return username
 
 
 def _emit_game_over_and_rematch(game_id, game, winner, winner_name):
@@ -34,6 +64,7 @@ def _emit_game_over_and_rematch(game_id, game, winner, winner_name):
     }, room=game_id)
 
     lobby = game.reset_to_lobby(last_winner=winner)
+    cancel_finished_close(game_id)
     players_list = [
         {'username': p, 'name': game.player_data[p]['name']}
         for p in game.players
@@ -54,29 +85,35 @@ def _emit_game_over_and_rematch(game_id, game, winner, winner_name):
     }, room=game_id)
 
 @socketio.on('connect')
-def handle_connect(): pass
+def handle_connect():
+    # JWT verificado uma vez; handlers leem o usuário do registro
+    bind_sid(request.sid, get_current_user())
 
 @socketio.on('disconnect')
 def handle_disconnect():
-    # Encontrar jogo e jogador
-    for game_id, game in games.items():
-        username = game.get_player_by_socket(request.sid)
-        if username:
-            # Remover mapeamento socket
-            if request.sid in game.socket_to_username:
-                del game.socket_to_username[request.sid]
-            
-            # Não remover o jogador automaticamente, apenas marcar como offline
-            # O jogador pode reconectar depois
-            emit('player_disconnected', {
-                'username': username
-            }, room=game_id)
-            break
+    # Sala do socket vem do registro (sem varrer todas as salas)
+    session = unbind_sid(request.sid) or {}
+    game_id = session.get('game_id')
+    game = games.get(game_id) if game_id else None
+    if game is None:
+        return
+    username = game.get_player_by_socket(request.sid)
+    if username:
+        # Remover mapeamento socket
+        del game.socket_to_username[request.sid]
+
+        # Não remover o jogador automaticamente, apenas marcar como offline
+        # O jogador pode reconectar depois
+        emit('player_disconnected', {
+            'username': username
+        }, room=game_id)
+        if username in game.players:
+            player_disconnected(game_id, username)
 
 @socketio.on('join_game')
 def handle_join_game(data):
     game_id = data['game_id']
-    username = get_current_user()
+    username = _session_user()
     if not username:
         emit('error', {'message': 'Usuário não autenticado'})
         return
@@ -95,6 +132,8 @@ def handle_join_game(data):
         result = game.reconnect_player(request.sid, username)
         if result['success']:
             join_room(game_id)
+            set_sid_game(request.sid, game_id)
+            player_reconnected(game_id, username)
             update_user_game(username, game_id)
             if not game.started:
                 broadcast_system_message(game_id, f'{username} entrou na sala')
@@ -130,16 +169,12 @@ def handle_join_game(data):
 
     if game.add_player(request.sid, username):
         join_room(game_id)
+        set_sid_game(request.sid, game_id)
         update_user_game(username, game_id)
         broadcast_system_message(game_id, f'{username} entrou na sala')
         # Tutorial: humano joga primeiro
         if getattr(game, 'tutorial', False) and username in game.players:
-            try:
-                game.players.remove(username)
-                game.players.insert(0, username)
-                game.current_turn = 0
-            except ValueError:
-                pass
+            game.seat_first(username)
         players_list = [
             {
                 'username': p,
@@ -160,11 +195,7 @@ def handle_join_game(data):
             and not game.started
             and len(game.players) >= 2
         ):
-            game.started = True
-            game.finished = False
-            game.finished_at = None
-            game.winner = None
-            game._game_over_emitted = False
+            game.start()
             broadcast_system_message(
                 game_id,
                 '🎓 Tutorial iniciado! Você treina contra o Mentor (fácil). Veja as dicas no painel.',
@@ -184,7 +215,7 @@ def handle_leave_game(data):
     game_id = data['game_id']
     
     # Obter username do token
-    username = get_current_user()
+    username = _session_user()
     if not username:
         emit('error', {'message': 'Usuário não autenticado'})
         return
@@ -239,9 +270,16 @@ def handle_leave_game(data):
     
     # Remover da sala
     leave_room(game_id)
+    set_sid_game(request.sid, None)
 
 @socketio.on('get_game_state')
 def handle_get_game_state(data):
+    """
+    Estado da partida para este socket. Se o cliente manda `since` igual à
+    versão do último estado que recebeu, responde game_state_patch só com o
+    que mudou; sem `since` (entrada, reconexão) ou com versão divergente,
+    manda o game_state completo.
+    """
     game_id = data['game_id']
     
     if game_id not in games:
@@ -254,94 +292,19 @@ def handle_get_game_state(data):
     if not username:
         emit('error', {'message': 'Jogador não encontrado'})
         return
+
+    # acima do limite: avisa quando tentar de novo (quem perdeu a base
+    # depende desta resposta; o push não manda estado completo)
+    if not allow_state_request(username, game_id):
+        emit('state_error', {
+            'message': 'Pedidos de estado rápidos demais. Aguarde um instante.',
+            'rate_limited': True,
+            'retry_after': round(state_retry_after(username, game_id), 3),
+        })
+        return
     
-    # Determinar o jogador da vez
-    current_turn_username = None
-    if game.players and game.current_turn < len(game.players):
-        current_turn_username = game.players[game.current_turn]
-    
-    # Verificar se é espectador
-    is_spectator = game.player_data[username].get('spectator', False)
-    
-    # Filtrar informações para o jogador
-    state = {
-        'game_id': game_id,
-        'started': game.started,
-        'finished': bool(getattr(game, 'finished', False)),
-        'winner': getattr(game, 'winner', None),
-        'winner_name': (
-            game.player_data.get(game.winner, {}).get('name')
-            if getattr(game, 'winner', None) and game.winner in game.player_data
-            else getattr(game, 'winner', None)
-        ),
-        'time_of_day': game.time_of_day,
-        'time_cycle': game.time_cycle,
-        'current_turn': current_turn_username,
-        'players': {},
-        'deck_count': len(game.deck),
-        'graveyard_count': len(game.graveyard),
-        'is_spectator': is_spectator,
-        'spectators': [],
-        'modifiers': list(game.modifiers or []),
-        'attack_slot_count': getattr(game, 'attack_slot_count', 3),
-        'defense_slot_count': getattr(game, 'defense_slot_count', 6),
-        'tutorial': bool(getattr(game, 'tutorial', False)),
-        'starting_life': getattr(game, 'starting_life', 1200),
-        'day_cycle_length': getattr(game, 'day_cycle_length', 24),
-        'first_round': bool(getattr(game, 'first_round', False)),
-        'attacks_blocked': bool(getattr(game, 'attacks_blocked', False)),
-    }
-    
-    # Coletar lista de espectadores
-    for uname, data in game.player_data.items():
-        if data.get('spectator', False) and uname != username:
-            state['spectators'].append({
-                'username': uname,
-                'name': data['name']
-            })
-    
-    # Informações de todos os jogadores
-    for uname in game.players:
-        if uname in game.player_data:
-            player_data = game.player_data[uname]
-            
-            # Para cada carta em campo, verificar se precisa ofuscar
-            attack_bases = []
-            for card in player_data['attack_bases']:
-                if card:
-                    attack_bases.append(game.get_card_for_player(card, username, uname))
-                else:
-                    attack_bases.append(None)
-            
-            defense_bases = []
-            for card in player_data['defense_bases']:
-                if card:
-                    defense_bases.append(game.get_card_for_player(card, username, uname))
-                else:
-                    defense_bases.append(None)
-            
-            player_info = {
-                'name': player_data['name'],
-                'username': uname,
-                'life': player_data['life'] if not player_data.get('dead', False) else 0,
-                'attack_bases': attack_bases,
-                'defense_bases': defense_bases,
-                'talisman_count': game.get_player_talismans_count(uname),
-                'runes': game.get_player_runes_count(uname),
-                'dead': player_data.get('dead', False),
-                'observer': player_data.get('observer', False),
-                'is_bot': bool(player_data.get('is_bot', False)),
-            }
-            
-            # Informações privadas apenas para o próprio jogador (não para espectadores)
-            if uname == username and not is_spectator and not player_info.get('dead', False):
-                player_info['hand'] = player_data['hand']
-                player_info['equipment'] = player_data['equipment']
-                player_info['talismans'] = player_data['talismans']
-            
-            state['players'][uname] = player_info
-    
-    emit('game_state', state)
+    event, payload = state_message(game, game_id, request.sid, username, data.get('since'))
+    emit(event, payload)
 
 @socketio.on('get_graveyard')
 def handle_get_graveyard(data):
@@ -415,7 +378,7 @@ def handle_spectate_game(data):
     game_id = data['game_id']
     
     # Obter username do token
-    username = get_current_user()
+    username = _session_user()
     if not username:
         emit('error', {'message': 'Usuário não autenticado'})
         return
@@ -437,6 +400,7 @@ def handle_spectate_game(data):
         # Atualizar socket
         game.reconnect_player(request.sid, username)
         join_room(game_id)
+        set_sid_game(request.sid, game_id)
         emit('spectate_success', {
             'username': username,
             'game_started': game.started,
@@ -449,6 +413,7 @@ def handle_spectate_game(data):
     
     if success:
         join_room(game_id)
+        set_sid_game(request.sid, game_id)
         broadcast_system_message(game_id, f'👁️ {username} entrou como espectador')
         
         # Atualizar jogo atual na conta (opcional para espectadores)
@@ -479,7 +444,7 @@ def handle_reconnect_game(data):
     game_id = data['game_id']
     
     # Obter username do token
-    username = get_current_user()
+    username = _session_user()
     if not username:
         emit('error', {'message': 'Usuário não autenticado'})
         return
@@ -496,6 +461,8 @@ def handle_reconnect_game(data):
     if result['success']:
         # Adicionar à sala
         join_room(game_id)
+        set_sid_game(request.sid, game_id)
+        player_reconnected(game_id, username)
         update_user_game(username, game_id)
 
         players_list = [
@@ -525,6 +492,7 @@ def handle_reconnect_game(data):
         if not game.started and username not in game.player_data:
             if game.add_player(request.sid, username):
                 join_room(game_id)
+                set_sid_game(request.sid, game_id)
                 update_user_game(username, game_id)
                 players_list = [
                     {'username': p, 'name': game.player_data[p]['name']}
@@ -572,13 +540,10 @@ def handle_send_chat_message(data):
         return
 
     # Obter username
-    username = get_current_user()
-    if not username:
+    username = _session_user()
+    if not username and game_id in games:
         # Tentar obter do socket mapping
-        for gid, game in games.items():
-            if gid == game_id:
-                username = game.get_player_by_socket(request.sid)
-                break
+        username = games[game_id].get_player_by_socket(request.sid)
     
     if not username:
         emit('chat_error', {'message': 'Usuário não identificado'})
@@ -592,6 +557,10 @@ def handle_send_chat_message(data):
     if len(message) > 500:
         emit('chat_error', {'message': 'Mensagem muito longa (máx. 500 caracteres)'})
         return
+
+    if not allow_chat(username, game_id):
+        emit('chat_error', {'message': 'Muitas mensagens seguidas. Aguarde um instante.', 'rate_limited': True})
+        return
     
     # Adicionar mensagem ao histórico
     censored_message = add_chat_message(game_id, username, message, is_system=False)
@@ -613,17 +582,21 @@ def handle_get_chat_history(data):
         emit('chat_history', {'messages': []})
         return
     
-    messages = chat_messages.get(game_id, [])
-    emit('chat_history', {'messages': messages})
+    emit('chat_history', {'messages': get_chat_history(game_id)})
 
 @socketio.on('player_action')
 def handle_player_action(data):
+    # mensagens de sistema da ação saem num chat_batch só, no fim
+    with system_message_batch(data.get('game_id')):
+        _handle_player_action(data)
+
+def _handle_player_action(data):
     game_id = data['game_id']
     action = data['action']
     params = data.get('params', {})
     
     # Verificar autenticação
-    username = get_current_user()
+    username = _session_user()
     if not username:
         emit('error', {'message': 'Usuário não autenticado'})
         return
@@ -639,6 +612,16 @@ def handle_player_action(data):
     if socket_username != username:
         emit('error', {'message': 'Sessão inválida'})
         return
+
+    if not allow_action(username, game_id):
+        emit('action_error', {
+            'message': 'Ações rápidas demais. Aguarde um instante.',
+            'player_name': username,
+            'action': action,
+            'timestamp': now_sp_str('%H:%M:%S'),
+            'rate_limited': True,
+        })
+        return
     
     if not game.started:
         emit('error', {'message': 'O jogo ainda não começou'})
@@ -835,6 +818,7 @@ def handle_player_action(data):
             result = {'success': True, 'next_turn': next_player_name}
         
         if result and result.get('success'):
+            game.bump_state_version()
             # Registrar ação para primeira rodada (exceto end_turn)
             first_round_ended = False
             if action != 'end_turn':
@@ -0,0 +1,108 @@
+"""
+Envio do game_state pelo servidor.
+
+Cada bump_state_version agenda um envio para a sala; mudanças dentro de
+STATE_PUSH_MS viram um único envio. Cada socket da sala recebe seu estado
+(delta sobre o último que recebeu, ou completo se não houver base), sem
+precisar pedir get_game_state depois de cada ação. Socket cuja visão não
+mudou (só state_version subiu) não recebe nada.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+from twilight.config import STATE_PUSH_MS
+from twilight.extensions import socketio
+from twilight.game.view import build_game_state, diff_state, is_empty_diff, snapshot
+from twilight.sockets.registry import set_sid_baseline, sid_baseline, sid_game
+from twilight.state import games
+
+_lock = threading.Lock()
+# salas com envio já agendado
+_pending: set[str] = set()
+
+
+def state_message(game, game_id: str, sid: str, username: str, since=None) -> tuple:
+    """
+    (evento, payload) para o socket: game_state_patch se `since` é a versão
+    do último estado enviado a ele, senão game_state completo. Atualiza a
+    base do socket. Se só state_version mudou (o bump foi de algo que este
+    socket não vê), devolve patch vazio com version == base_version, e o
+    push não envia nada.
+    """
+    state = build_game_state(game, game_id, username)
+    baseline = sid_baseline(sid)
+
+    if since is not None and baseline and baseline[0] == game_id and baseline[1] == since:
+        delta, copied = diff_state(baseline[2], state)
+        # a versão sobe a cada bump da sala: sozinha não é mudança da visão
+        delta['set'] = [item for item in delta['set'] if item[0] != ['state_version']]
+        if is_empty_diff(delta):
+            return 'game_state_patch', {
+                'game_id': game_id,
+                'base_version': since,
+                'version': since,
+                'set': [],
+                'unset': [],
+            }
+        if game.state_version == since:
+            # mudança feita por um caminho que não subiu a versão: manda o
+            # estado completo na mesma versão (um bump aqui agendaria outro push)
+            set_sid_baseline(sid, (game_id, since, copied))
+            return 'game_state', state
+        delta['set'].append([['state_version'], state['state_version']])
+        set_sid_baseline(sid, (game_id, state['state_version'], copied))
+        return 'game_state_patch', {
+            'game_id': game_id,
+            'base_version': since,
+            'version': state['state_version'],
+            'set': delta['set'],
+            'unset': delta['unset'],
+        }
+
+    set_sid_baseline(sid, (game_id, state['state_version'], snapshot(state)))
+    return 'game_state', state
+
+
+def push_game_state(game_id: str) -> int:
+    """Envia o estado atual a cada socket da sala. Retorna quantos receberam algo."""
+    game = games.get(game_id)
+    if game is None:
+        return 0
+    sent = 0
+    for sid, username in list(game.socket_to_username.items()):
+        # socket já desconectado ou em outra sala
+        if sid_game(sid) != game_id or username not in game.player_data:
+            continue
+        baseline = sid_baseline(sid)
+        since = baseline[1] if baseline and baseline[0] == game_id else None
+        event, payload = state_message(game, game_id, sid, username, since)
+        # visão deste socket não mudou
+        if event == 'game_state_patch' and payload['version'] == payload['base_version']:
+            continue
+        socketio.emit(event, payload, to=sid)
+        sent += 1
+    return sent
+
+
+def _flush(game_id: str) -> None:
+    if STATE_PUSH_MS > 0:
+        time.sleep(STATE_PUSH_MS / 1000.0)
+    with _lock:
+        _pending.discard(game_id)
+    try:
+        push_game_state(game_id)
+    except Exception as e:
+        print(f"[push] falha ao enviar estado de {game_id}: {e}")
+
+
+def schedule_state_push(game_id: str) -> None:
+    """Agenda o envio do estado da sala (agrupa chamadas próximas)."""
+    if not game_id:
+        return
+    with _lock:
+        if game_id in _pending:
+            return
+        _pending.add(game_id)
+    socketio.start_background_task(_flush, game_id)
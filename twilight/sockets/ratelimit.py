@@ -0,0 +1,132 @@
+"""
+Limite de taxa por token bucket para eventos do socket.
+
+Cada chave (usuário+sala, ou só a sala) tem um balde com até `burst`
+fichas que se repõem a `rate` por segundo; cada evento gasta uma. Sem
+ficha, o evento é descartado. Os baldes guardam só (fichas, último
+instante) e são calculados na hora do uso, sem timer. Baldes que já
+encheram de novo são esquecidos de tempos em tempos (não mudam nada).
+
+chat: por (usuário, sala) e pela sala inteira (um spammer não satura a
+sala; vários juntos também não). player_action e get_game_state usam o
+mesmo TokenBucket, por (usuário, sala). Pedido de estado recusado recebe
+o tempo de espera (retry_after) para o cliente repetir.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Hashable
+
+from twilight.config import (
+    ACTION_RATE_BURST,
+    ACTION_RATE_PER_SEC,
+    CHAT_RATE_BURST,
+    CHAT_RATE_PER_SEC,
+    CHAT_ROOM_RATE_BURST,
+    CHAT_ROOM_RATE_PER_SEC,
+    STATE_RATE_BURST,
+    STATE_RATE_PER_SEC,
+)
+
+# a cada N baldes novos, esquece os que já estão cheios
+_PRUNE_EVERY = 1024
+
+
+class TokenBucket:
+    def __init__(self, name: str, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.clock = clock
+        # chave -> [fichas, último instante]
+        self._buckets: dict = {}
+        self._lock = threading.Lock()
+        self._created = 0
+        self.allowed = 0
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def allow(self, key: Hashable, cost: float = 1.0) -> bool:
+        """Gasta `cost` fichas do balde de `key`; False = acima do limite."""
+        if not self.enabled:
+            return True
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now]
+                self._created += 1
+                if self._created % _PRUNE_EVERY == 0:
+                    self._prune(now)
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                self.allowed += 1
+                return True
+            self.dropped += 1
+            return False
+
+    def retry_after(self, key: Hashable, cost: float = 1.0) -> float:
+        """Segundos até o balde de `key` ter `cost` fichas (0 = já tem)."""
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                return 0.0
+            tokens = min(self.burst, bucket[0] + (self.clock() - bucket[1]) * self.rate)
+        return max(0.0, (cost - tokens) / self.rate)
+
+    def _prune(self, now: float) -> None:
+        full = [
+            key for key, (tokens, last) in self._buckets.items()
+            if tokens + (now - last) * self.rate >= self.burst
+        ]
+        for key in full:
+            del self._buckets[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'allowed': self.allowed,
+                'dropped': self.dropped,
+                'buckets': len(self._buckets),
+            }
+
+
+chat_user_limiter = TokenBucket('chat_user', CHAT_RATE_PER_SEC, CHAT_RATE_BURST)
+chat_room_limiter = TokenBucket('chat_room', CHAT_ROOM_RATE_PER_SEC, CHAT_ROOM_RATE_BURST)
+action_limiter = TokenBucket('player_action', ACTION_RATE_PER_SEC, ACTION_RATE_BURST)
+state_limiter = TokenBucket('get_game_state', STATE_RATE_PER_SEC, STATE_RATE_BURST)
+
+LIMITERS = (chat_user_limiter, chat_room_limiter, action_limiter, state_limiter)
+
+
+def allow_chat(username: str, game_id: str) -> bool:
+    """Balde do usuário primeiro: quem floda esgota o próprio, não o da sala."""
+    return chat_user_limiter.allow((username, game_id)) and chat_room_limiter.allow(game_id)
+
+
+def allow_action(username: str, game_id: str) -> bool:
+    return action_limiter.allow((username, game_id))
+
+
+def allow_state_request(username: str, game_id: str) -> bool:
+    return state_limiter.allow((username, game_id))
+
+
+def state_retry_after(username: str, game_id: str) -> float:
+    return state_limiter.retry_after((username, game_id))
+
+
+def rate_limit_stats() -> dict:
+    """Contadores por limitador (para calibrar rate/burst)."""
+    return {limiter.name: limiter.stats() for limiter in LIMITERS}
@@ -0,0 +1,92 @@
+"""
+Sessão de cada socket: usuário autenticado no connect, sala atual e
+o último game_state enviado (base dos deltas).
+
+O JWT é verificado uma vez no connect; os handlers leem daqui em vez de
+reler o cookie a cada evento. member_sockets é o caminho inverso,
+(sala, usuário) -> sid, mantido junto em set_sid_game/unbind_sid: quem
+entra, assiste, reconecta, sai ou é expulso passa por elas.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+from twilight.state import member_sockets, socket_sessions
+
+
+def bind_sid(sid: str, username: Optional[str]) -> None:
+    """Registra o socket (username None = conexão anônima)."""
+    entry = socket_sessions.get(sid)
+    if entry is None:
+        socket_sessions[sid] = {'username': username, 'game_id': None}
+    elif entry['username'] != username:
+        _drop_member(sid, entry)
+        entry['username'] = username
+        if entry['game_id'] is not None and username is not None:
+            member_sockets[entry['game_id'], username] = sid
+
+
+def unbind_sid(sid: str) -> Optional[dict]:
+    """Remove o socket do registro e devolve o que havia (ou None)."""
+    entry = socket_sessions.pop(sid, None)
+    if entry is not None:
+        _drop_member(sid, entry)
+    return entry
+
+
+def _drop_member(sid: str, entry: dict) -> None:
+    key = (entry['game_id'], entry['username'])
+    # outra aba do mesmo usuário pode já ter assumido a vaga
+    if member_sockets.get(key) == sid:
+        del member_sockets[key]
+
+
+def sid_username(sid: str) -> Optional[str]:
+    entry = socket_sessions.get(sid)
+    return entry['username'] if entry else None
+
+
+def sid_game(sid: str) -> Optional[str]:
+    entry = socket_sessions.get(sid)
+    return entry['game_id'] if entry else None
+
+
+def set_sid_game(sid: str, game_id: Optional[str]) -> None:
+    """Sala atual do socket (join/spectate/reconnect; None ao sair)."""
+    entry = socket_sessions.get(sid)
+    if entry is not None:
+        if entry['game_id'] != game_id:
+            entry['baseline'] = None
+            _drop_member(sid, entry)
+        entry['game_id'] = game_id
+        if game_id is not None and entry['username'] is not None:
+            member_sockets[game_id, entry['username']] = sid
+
+
+def member_sid(game_id: str, username: str) -> Optional[str]:
+    """Socket atual do usuário na sala (o mais recente, se houver vários)."""
+    return member_sockets.get((game_id, username))
+
+
+def release_member(game_id: str, username: str) -> Optional[str]:
+    """Desliga o usuário da sala (kick): o socket segue conectado, sem sala."""
+    sid = member_sockets.get((game_id, username))
+    if sid is not None:
+        set_sid_game(sid, None)
+    return sid
+
+
+def is_bound(sid: str) -> bool:
+    return sid in socket_sessions
+
+
+def sid_baseline(sid: str) -> Optional[tuple]:
+    """Último game_state enviado ao socket: (game_id, versão, snapshot) ou None."""
+    entry = socket_sessions.get(sid)
+    return entry.get('baseline') if entry else None
+
+
+def set_sid_baseline(sid: str, baseline: Optional[tuple]) -> None:
+    entry = socket_sessions.get(sid)
+    if entry is not None:
+        entry['baseline'] = baseline
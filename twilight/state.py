@@ -3,4 +3,6 @@
 games = {}
 players = {}
 waiting_players = []
-chat_messages = {}  # game_id -> list of messages
+chat_messages = {}  # game_id -> deque(maxlen=MAX_CHAT_MESSAGES), ring do chat (ver game/chat.py)
+socket_sessions = {}  # sid -> {'username': ..., 'game_id': ...} (preenchido no connect)
+member_sockets = {}  # (game_id, username) -> sid (inverso de socket_sessions)
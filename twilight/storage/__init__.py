@@ -1,17 +1,50 @@
 """Persistência em disco (data/)."""
 
 from twilight.storage.admin_levels import load_admin_levels, save_admin_levels
-from twilight.storage.db import init_db, load_accounts, save_accounts
-from twilight.storage.journal import load_journal, save_journal
+from twilight.storage.account_cache import (
+    clear_current_game,
+    clear_current_game_for_room,
+    create_account,
+    flush as flush_accounts,
+    get_account,
+    load_accounts,
+    patch_account_meta,
+    save_accounts,
+    set_current_game,
+)
+from twilight.storage.db import init_db
+from twilight.storage.journal import (
+    delete_journal_entry,
+    get_journal_entry,
+    insert_journal_entry,
+    journal_stats,
+    load_journal,
+    query_journal,
+    save_journal,
+    update_journal_entry,
+)
 from twilight.storage.story_saves import get_user_save_file
 
 __all__ = [
+    'clear_current_game',
+    'clear_current_game_for_room',
+    'create_account',
+    'delete_journal_entry',
+    'flush_accounts',
+    'get_account',
+    'get_journal_entry',
     'get_user_save_file',
     'init_db',
+    'insert_journal_entry',
+    'journal_stats',
     'load_accounts',
     'load_admin_levels',
     'load_journal',
+    'patch_account_meta',
+    'query_journal',
     'save_accounts',
     'save_admin_levels',
     'save_journal',
+    'set_current_game',
+    'update_journal_entry',
 ]
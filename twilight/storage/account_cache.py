@@ -0,0 +1,303 @@
+"""
+Cache de contas na frente do twilight.storage.db.
+
+Leituras saem da memória. Mudanças de current_game (entrar, sair, fim de
+partida, limpeza do check-auth) só marcam a conta como suja; um timer
+grava tudo numa transação a cada ACCOUNT_FLUSH_MS e no shutdown.
+flush() força a gravação (testes, admin antes de load_accounts).
+Criação de conta, senha e meta continuam write-through.
+
+O cache é um LRU de até ACCOUNT_CACHE_SIZE contas. Só saem contas
+limpas (sem ponteiro pendente nem em gravação), que o SQLite já tem
+iguais; as sujas ficam até o flush.
+"""
+from __future__ import annotations
+
+import atexit
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from twilight.config import ACCOUNT_CACHE_SIZE, ACCOUNT_FLUSH_MS
+from twilight.storage import db
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+
+# username dobrado como o COLLATE NOCASE (só A-Z) -> conta (mais recente no fim)
+_accounts: OrderedDict[str, dict] = OrderedDict()
+# ponteiros pendentes: username -> game_id | None
+_dirty: dict[str, Optional[str]] = {}
+# ponteiros sendo gravados agora (a conta ainda não pode sair do cache)
+_inflight_pointers: dict[str, Optional[str]] = {}
+# salas limpas e ainda não gravadas: game_id -> set(usernames) | None (= todos)
+_room_clears: dict[str, Optional[set]] = {}
+# snapshot sendo gravado agora (contas carregadas nesse meio tempo também o respeitam)
+_inflight_rooms: dict[str, Optional[set]] = {}
+_timer: Optional[threading.Timer] = None
+
+
+_NOCASE = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
+def _key(username: str) -> str:
+    # NOCASE do SQLite só iguala ASCII: str.lower() juntaria "Ç" e "ç",
+    # que no banco são contas diferentes
+    return username.translate(_NOCASE)
+
+
+def _room_cleared(rooms: dict, key: str, game_id: Optional[str]) -> bool:
+    if not game_id or game_id not in rooms:
+        return False
+    usernames = rooms[game_id]
+    return usernames is None or key in usernames
+
+
+def _merge_room(rooms: dict, game_id: str, usernames: Optional[set]) -> None:
+    if usernames is None or rooms.get(game_id, set()) is None:
+        rooms[game_id] = None
+    else:
+        rooms.setdefault(game_id, set()).update(usernames)
+
+
+def _evict(keep: Optional[str] = None) -> None:
+    """
+    Descarta as contas limpas menos usadas acima do limite (chamar com
+    _lock). `keep` é a conta recém-carregada, que o chamador vai usar.
+    """
+    excess = len(_accounts) - ACCOUNT_CACHE_SIZE
+    if ACCOUNT_CACHE_SIZE <= 0 or excess <= 0:
+        return
+    victims = []
+    for key in _accounts:
+        if key != keep and key not in _dirty and key not in _inflight_pointers:
+            victims.append(key)
+            if len(victims) == excess:
+                break
+    for key in victims:
+        del _accounts[key]
+
+
+def _load(username: str) -> Optional[dict]:
+    """Conta em cache (carrega do SQLite na primeira vez). Chamar sem _lock."""
+    key = _key(username)
+    with _lock:
+        account = _accounts.get(key)
+        if account is not None:
+            _accounts.move_to_end(key)
+    if account is not None:
+        return account
+    account = db.get_account(username)
+    if account is None:
+        return None
+    with _lock:
+        # outro greenlet pode ter carregado enquanto o SQLite respondia
+        cached = _accounts.get(key)
+        if cached is not None:
+            return cached
+        pointer = account.get('current_game')
+        if _room_cleared(_room_clears, key, pointer) or _room_cleared(_inflight_rooms, key, pointer):
+            account['current_game'] = None
+        _accounts[key] = account
+        _evict(keep=key)
+        return account
+
+
+def _schedule_flush() -> None:
+    """Agenda o flush em lote (chamar com _lock)."""
+    global _timer
+    if _timer is not None:
+        return
+    _timer = threading.Timer(ACCOUNT_FLUSH_MS / 1000.0, _timer_flush)
+    _timer.daemon = True
+    _timer.start()
+
+
+def _timer_flush() -> None:
+    global _timer
+    with _lock:
+        _timer = None
+    try:
+        flush()
+    except Exception as e:
+        print(f"[accounts] flush falhou: {e}")
+
+
+def _mark_dirty(key: str, game_id: Optional[str]) -> None:
+    """Registra ponteiro pendente (chamar com _lock)."""
+    _dirty[key] = game_id
+    if ACCOUNT_FLUSH_MS > 0:
+        _schedule_flush()
+
+
+def _write_through() -> None:
+    if ACCOUNT_FLUSH_MS <= 0:
+        flush()
+
+
+def flush() -> None:
+    """Grava ponteiros e limpezas de sala pendentes numa única transação."""
+    global _room_clears, _dirty, _inflight_rooms, _inflight_pointers
+    with _flush_lock:
+        with _lock:
+            if not _dirty and not _room_clears:
+                return
+            pointers, rooms = _dirty, _room_clears
+            _dirty, _room_clears = {}, {}
+            _inflight_rooms = rooms
+            _inflight_pointers = pointers
+        try:
+            db.apply_current_game_batch(rooms, pointers)
+        except Exception:
+            # devolve o que falhou sem sobrescrever mudanças mais novas
+            with _lock:
+                for key, game_id in pointers.items():
+                    _dirty.setdefault(key, game_id)
+                for game_id, usernames in rooms.items():
+                    _merge_room(_room_clears, game_id, usernames)
+                if ACCOUNT_FLUSH_MS > 0:
+                    _schedule_flush()
+            raise
+        finally:
+            with _lock:
+                _inflight_rooms = {}
+                _inflight_pointers = {}
+                # gravadas: as contas que estavam sujas podem sair agora
+                _evict()
+
+
+def invalidate(username: Optional[str] = None) -> None:
+    """Descarta o cache (de uma conta ou de todas) após gravar pendências."""
+    flush()
+    with _lock:
+        if username is None:
+            _accounts.clear()
+        else:
+            _accounts.pop(_key(username), None)
+
+
+def get_account(username: str) -> Optional[dict]:
+    """Cópia da conta (mesmo formato de db.get_account) ou None."""
+    if not username:
+        return None
+    account = _load(username)
+    if account is None:
+        return None
+    with _lock:
+        return dict(account)
+
+
+def create_account(username: str, data: dict) -> bool:
+    """Insere a conta no SQLite (write-through). False se já existir."""
+    created = db.create_account(username, data)
+    if created:
+        invalidate(username)
+    return created
+
+
+def set_password(username: str, hashed: str) -> bool:
+    """Write-through do hash de senha; atualiza a cópia em cache."""
+    ok = db.set_account_password(username, hashed)
+    if ok:
+        with _lock:
+            account = _accounts.get(_key(username))
+            if account is not None:
+                account['password'] = hashed
+    return ok
+
+
+def set_current_game(username: str, game_id: Optional[str]) -> bool:
+    if not username:
+        return False
+    key = _key(username)
+    while True:
+        account = _load(username)
+        if account is None:
+            return False
+        with _lock:
+            # saiu por LRU entre o _load e o lock: carrega de novo
+            if _accounts.get(key) is not account:
+                continue
+            account['current_game'] = game_id
+            _mark_dirty(key, game_id)
+            break
+    _write_through()
+    return True
+
+
+def clear_current_game(username: str, game_id: Optional[str] = None) -> bool:
+    """Zera current_game (opcionalmente só se apontar para game_id). Só memória."""
+    if not username:
+        return False
+    key = _key(username)
+    while True:
+        account = _load(username)
+        if account is None:
+            return False
+        with _lock:
+            # saiu por LRU entre o _load e o lock: carrega de novo
+            if _accounts.get(key) is not account:
+                continue
+            current = account.get('current_game')
+            if current is None or (game_id is not None and current != game_id):
+                return False
+            account['current_game'] = None
+            _mark_dirty(key, None)
+            break
+    _write_through()
+    return True
+
+
+def clear_current_game_for_room(game_id: str, usernames=None) -> int:
+    """
+    Zera current_game de quem aponta para game_id (só memória).
+    Contas fora do cache são limpas no SQLite no próximo flush.
+    Retorna quantas contas em cache foram alteradas.
+    """
+    if not game_id:
+        return 0
+    keys = None if usernames is None else {_key(u) for u in usernames if u}
+    changed = 0
+    with _lock:
+        for key, account in _accounts.items():
+            if account.get('current_game') != game_id:
+                continue
+            if keys is not None and key not in keys:
+                continue
+            account['current_game'] = None
+            _dirty[key] = None
+            changed += 1
+        _merge_room(_room_clears, game_id, keys)
+        if ACCOUNT_FLUSH_MS > 0:
+            _schedule_flush()
+    _write_through()
+    return changed
+
+
+def patch_account_meta(username: str, fields: dict) -> bool:
+    """Write-through do meta_json; atualiza a cópia em cache."""
+    ok = db.patch_account_meta(username, fields)
+    if ok:
+        with _lock:
+            account = _accounts.get(_key(username))
+            if account is not None:
+                for k, v in (fields or {}).items():
+                    if k not in db._account_known_keys():
+                        account[k] = v
+    return ok
+
+
+def load_accounts() -> dict:
+    """Tabela inteira (admin); grava pendências antes de ler."""
+    flush()
+    return db.load_accounts()
+
+
+def save_accounts(accounts: dict) -> None:
+    """Substitui a tabela inteira e descarta o cache."""
+    flush()
+    db.save_accounts(accounts)
+    invalidate()
+
+
+atexit.register(flush)
@@ -1,39 +1,129 @@
 """SQLite: data/database.db — contas e journal."""
 from __future__ import annotations
 
+import base64
 import json
 import os
 import sqlite3
-import threading
-from typing import Any, Optional
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Tuple
 
 from twilight.config import (
     ACCOUNTS_FILE,
     DATA_DIR,
     DATABASE_PATH,
+    DB_CACHE_SIZE_KB,
+    DB_MMAP_SIZE,
+    DB_POOL_SIZE,
+    DB_STATEMENT_CACHE,
     JOURNAL_FILE,
 )
+from twilight.storage.executor import native_lock, native_rlock, offloaded
 
-_lock = threading.RLock()
+_lock = native_rlock()
 _initialized = False
 
+# versão do schema (PRAGMA user_version) — migrações em _migrate_schema
+SCHEMA_VERSION = 1
+
+# journal: ROADMAP e afins só para staff (admin_level >= 1)
+JOURNAL_ADMIN_ONLY_TYPES = frozenset({'roadmap', 'plan', 'internal'})
+_JOURNAL_HIDDEN_VISIBILITY = frozenset({'admin', 'private', 'hidden', 'staff'})
+JOURNAL_PAGE_MAX = 100
+
+# contador de escritas no journal (ETag das rotas HTTP); o prefixo muda a
+# cada boot para que ETags de outro processo nunca coincidam
+_journal_boot = format(int(time.time() * 1000), 'x')
+_journal_version = 0
+_journal_mtime = time.time()
+_journal_version_lock = native_lock()
+
+
+def _bump_journal_version() -> None:
+    global _journal_version, _journal_mtime
+    with _journal_version_lock:
+        _journal_version += 1
+        _journal_mtime = time.time()
+
+
+def journal_version() -> Tuple[str, float]:
+    """(versão opaca, timestamp da última escrita) do journal neste processo."""
+    with _journal_version_lock:
+        return f'{_journal_boot}.{_journal_version}', _journal_mtime
+
+# Conexões ociosas para reuso (PRAGMAs aplicados uma vez por conexão).
+_pool: list[sqlite3.Connection] = []
+_pool_lock = native_lock()
+
 
 def _connect() -> sqlite3.Connection:
     os.makedirs(os.path.dirname(DATABASE_PATH) or DATA_DIR, exist_ok=True)
-    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False, timeout=30)
+    conn = sqlite3.connect(
+        DATABASE_PATH,
+        check_same_thread=False,
+        timeout=30,
+        cached_statements=DB_STATEMENT_CACHE,
+    )
     conn.row_factory = sqlite3.Row
     conn.execute('PRAGMA foreign_keys = ON')
     conn.execute('PRAGMA journal_mode = WAL')
     conn.execute('PRAGMA busy_timeout = 30000')
+    if DB_MMAP_SIZE:
+        conn.execute(f'PRAGMA mmap_size = {int(DB_MMAP_SIZE)}')
+    if DB_CACHE_SIZE_KB:
+        # negativo = tamanho em KiB (positivo seria número de páginas)
+        conn.execute(f'PRAGMA cache_size = -{int(DB_CACHE_SIZE_KB)}')
     return conn
 
 
+@contextmanager
+def _connection() -> Iterator[sqlite3.Connection]:
+    """
+    Empresta uma conexão do pool (abre uma nova se estiver vazio).
+    Na devolução, desfaz transação pendente; excedentes são fechados.
+    """
+    with _pool_lock:
+        conn = _pool.pop() if _pool else None
+    if conn is None:
+        conn = _connect()
+    healthy = True
+    try:
+        yield conn
+    finally:
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            healthy = False
+        keep = False
+        if healthy:
+            with _pool_lock:
+                if len(_pool) < DB_POOL_SIZE:
+                    _pool.append(conn)
+                    keep = True
+        if not keep:
+            conn.close()
+
+
+def close_pool() -> None:
+    """Fecha as conexões ociosas (shutdown / testes que trocam DATABASE_PATH)."""
+    with _pool_lock:
+        conns = list(_pool)
+        _pool.clear()
+    for conn in conns:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+@offloaded
 def init_db() -> None:
     """Cria tabelas e migra JSON legado se o DB estiver vazio."""
     global _initialized
     with _lock:
-        conn = _connect()
-        try:
+        with _connection() as conn:
             conn.executescript(
                 """
                 CREATE TABLE IF NOT EXISTS accounts (
@@ -59,17 +149,26 @@ def init_db() -> None:
                     extra_json TEXT NOT NULL DEFAULT '{}'
                 );
 
+                CREATE TABLE IF NOT EXISTS journal_tags (
+                    tag TEXT NOT NULL COLLATE NOCASE,
+                    entry_id TEXT NOT NULL
+                        REFERENCES journal_entries(id) ON DELETE CASCADE,
+                    PRIMARY KEY (tag, entry_id)
+                ) WITHOUT ROWID;
+
                 CREATE INDEX IF NOT EXISTS idx_accounts_current_game
                     ON accounts(current_game);
                 CREATE INDEX IF NOT EXISTS idx_journal_date
                     ON journal_entries(date);
+                CREATE INDEX IF NOT EXISTS idx_journal_tags_entry
+                    ON journal_tags(entry_id);
                 """
             )
             conn.commit()
+            _migrate_schema(conn)
+            conn.commit()
             _migrate_from_json_if_needed(conn)
             conn.commit()
-        finally:
-            conn.close()
         _initialized = True
 
 
@@ -79,11 +178,13 @@ def _ensure_init() -> None:
 
 
 def _account_known_keys():
-    return {'password', 'created_at', 'current_game', 'admin_level', 'level'}
+    return {'username', 'password', 'created_at', 'current_game', 'admin_level', 'level'}
 
 
 def _row_to_account(row: sqlite3.Row) -> dict:
     data: dict[str, Any] = {
+        # nome como está gravado (a busca é COLLATE NOCASE): é a identidade da conta
+        'username': row['username'],
         'password': row['password'],
         'created_at': row['created_at'],
         'current_game': row['current_game'],
@@ -129,27 +230,25 @@ def _account_to_row(username: str, data: dict) -> tuple:
     )
 
 
+@offloaded
 def load_accounts() -> dict:
     """Retorna {username: {password, created_at, current_game, ...}}."""
     _ensure_init()
     with _lock:
-        conn = _connect()
-        try:
+        with _connection() as conn:
             rows = conn.execute(
                 'SELECT username, password, created_at, current_game, admin_level, meta_json FROM accounts'
             ).fetchall()
             return {row['username']: _row_to_account(row) for row in rows}
-        finally:
-            conn.close()
 
 
+@offloaded
 def save_accounts(accounts: dict) -> None:
     """Substitui o conjunto de contas (API compatível com o JSON antigo)."""
     _ensure_init()
     accounts = accounts or {}
     with _lock:
-        conn = _connect()
-        try:
+        with _connection() as conn:
             existing = {
                 r[0]
                 for r in conn.execute('SELECT username FROM accounts').fetchall()
@@ -175,8 +274,202 @@ def save_accounts(accounts: dict) -> None:
                     row,
                 )
             conn.commit()
-        finally:
-            conn.close()
+
+
+# --- API por conta (uma linha por chamada; evita load/save da tabela inteira) ---
+
+@offloaded
+def get_account(username: str) -> Optional[dict]:
+    """Retorna a conta (mesmo formato de load_accounts()[username]) ou None."""
+    if not username:
+        return None
+    _ensure_init()
+    with _lock:
+        with _connection() as conn:
+            row = conn.execute(
+                """
+                SELECT username, password, created_at, current_game, admin_level, meta_json
+                FROM accounts WHERE username = ?
+                """,
+                (username,),
+            ).fetchone()
+            return _row_to_account(row) if row else None
+
+
+@offloaded
+def create_account(username: str, data: dict) -> bool:
+    """Insere uma conta nova. False se o username já existir."""
+    _ensure_init()
+    row = _account_to_row(username, data or {})
+    with _lock:
+        with _connection() as conn:
+            cur = conn.execute(
+                """
+                INSERT OR IGNORE INTO accounts
+                (username, password, created_at, current_game, admin_level, meta_json)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                row,
+            )
+            conn.commit()
+            return cur.rowcount > 0
+
+
+@offloaded
+def set_account_password(username: str, hashed: str) -> bool:
+    """Troca o hash de senha (rehash no login). False se a conta não existir."""
+    if not username or not hashed:
+        return False
+    _ensure_init()
+    with _lock:
+        with _connection() as conn:
+            cur = conn.execute(
+                'UPDATE accounts SET password = ? WHERE username = ?',
+                (hashed, username),
+            )
+            conn.commit()
+            return cur.rowcount > 0
+
+
+@offloaded
+def set_current_game(username: str, game_id: Optional[str]) -> bool:
+    """Atualiza current_game de uma conta. False se a conta não existir."""
+    if not username:
+        return False
+    _ensure_init()
+    with _lock:
+        with _connection() as conn:
+            cur = conn.execute(
+                'UPDATE accounts SET current_game = ? WHERE username = ?',
+                (game_id, username),
+            )
+            conn.commit()
+            return cur.rowcount > 0
+
+
+@offloaded
+def clear_current_game(username: str, game_id: Optional[str] = None) -> bool:
+    """Zera current_game (opcionalmente só se apontar para game_id)."""
+    if not username:
+        return False
+    _ensure_init()
+    with _lock:
+        with _connection() as conn:
+            if game_id is None:
+                cur = conn.execute(
+                    """
+                    UPDATE accounts SET current_game = NULL
+                    WHERE username = ? AND current_game IS NOT NULL
+                    """,
+                    (username,),
+                )
+            else:
+                cur = conn.execute(
+                    """
+                    UPDATE accounts SET current_game = NULL
+                    WHERE username = ? AND current_game = ?
+                    """,
+                    (username, game_id),
+                )
+            conn.commit()
+            return cur.rowcount > 0
+
+
+@offloaded
+def clear_current_game_for_room(game_id: str, usernames=None) -> int:
+    """
+    Zera current_game de todas as contas que apontam para game_id
+    (usa idx_accounts_current_game). Com usernames, restringe a esses.
+    Retorna quantas contas foram alteradas.
+    """
+    if not game_id:
+        return 0
+    _ensure_init()
+    with _lock:
+        with _connection() as conn:
+            if usernames is None:
+                cur = conn.execute(
+                    'UPDATE accounts SET current_game = NULL WHERE current_game = ?',
+                    (game_id,),
+                )
+                changed = cur.rowcount
+            else:
+                changed = 0
+                for uname in set(usernames):
+                    cur = conn.execute(
+                        """
+                        UPDATE accounts SET current_game = NULL
+                        WHERE current_game = ? AND username = ?
+                        """,
+                        (game_id, uname),
+                    )
+                    changed += cur.rowcount
+            conn.commit()
+            return changed
+
+
+@offloaded
+def apply_current_game_batch(room_clears: dict, pointers: dict) -> None:
+    """
+    Grava em uma transação os ponteiros acumulados pelo account_cache.
+    room_clears: {game_id: set(usernames) | None}; pointers: {username: game_id | None}.
+    Salas são limpas antes, para que ponteiros mais novos prevaleçam.
+    """
+    if not room_clears and not pointers:
+        return
+    _ensure_init()
+    with _lock:
+        with _connection() as conn:
+            for game_id, usernames in room_clears.items():
+                if usernames is None:
+                    conn.execute(
+                        'UPDATE accounts SET current_game = NULL WHERE current_game = ?',
+                        (game_id,),
+                    )
+                else:
+                    conn.executemany(
+                        """
+                        UPDATE accounts SET current_game = NULL
+                        WHERE current_game = ? AND username = ?
+                        """,
+                        [(game_id, uname) for uname in usernames],
+                    )
+            if pointers:
+                conn.executemany(
+                    'UPDATE accounts SET current_game = ? WHERE username = ?',
+                    [(game_id, uname) for uname, game_id in pointers.items()],
+                )
+            conn.commit()
+
+
+@offloaded
+def patch_account_meta(username: str, fields: dict) -> bool:
+    """Mescla campos extras (meta_json) de uma conta. False se não existir."""
+    if not username:
+        return False
+    _ensure_init()
+    fields = {k: v for k, v in (fields or {}).items() if k not in _account_known_keys()}
+    with _lock:
+        with _connection() as conn:
+            row = conn.execute(
+                'SELECT meta_json FROM accounts WHERE username = ?',
+                (username,),
+            ).fetchone()
+            if row is None:
+                return False
+            try:
+                meta = json.loads(row['meta_json'] or '{}')
+            except (json.JSONDecodeError, TypeError):
+                meta = {}
+            if not isinstance(meta, dict):
+                meta = {}
+            meta.update(fields)
+            conn.execute(
+                'UPDATE accounts SET meta_json = ? WHERE username = ?',
+                (json.dumps(meta, ensure_ascii=False), username),
+            )
+            conn.commit()
+            return True
 
 
 def _entry_to_dict(row: sqlite3.Row) -> dict:
@@ -209,6 +502,43 @@ def _entry_to_dict(row: sqlite3.Row) -> dict:
     return entry
 
 
+def journal_entry_admin_only(entry: dict) -> bool:
+    """ROADMAP / visibility admin — oculto de usuários comuns."""
+    if not entry:
+        return False
+    t = (entry.get('type') or '').strip().lower()
+    if t in JOURNAL_ADMIN_ONLY_TYPES:
+        return True
+    vis = (entry.get('visibility') or entry.get('visible') or 'public')
+    if isinstance(vis, str) and vis.strip().lower() in _JOURNAL_HIDDEN_VISIBILITY:
+        return True
+    if entry.get('hidden') is True:
+        return True
+    return False
+
+
+def normalize_journal_entry(entry: dict) -> dict:
+    """Garante type/visibility coerentes (plan/internal viram roadmap só staff)."""
+    if not entry:
+        return entry
+    t = (entry.get('type') or '').strip().lower()
+    if t in JOURNAL_ADMIN_ONLY_TYPES:
+        entry['visibility'] = 'admin'
+        entry['type'] = 'roadmap'
+    else:
+        entry.setdefault('visibility', 'public')
+    return entry
+
+
+def _entry_tags(entry: dict) -> set:
+    """Tags normalizadas (texto não vazio) para a tabela journal_tags."""
+    tags = set()
+    for tag in (entry or {}).get('tags') or []:
+        if isinstance(tag, str) and tag.strip():
+            tags.add(tag.strip())
+    return tags
+
+
 def _entry_to_row(entry: dict) -> tuple:
     known = {
         'id',
@@ -235,33 +565,74 @@ def _entry_to_row(entry: dict) -> tuple:
         json.dumps(entry.get('bugfixes') or [], ensure_ascii=False),
         json.dumps(entry.get('tags') or [], ensure_ascii=False),
         json.dumps(extra, ensure_ascii=False),
+        1 if journal_entry_admin_only(entry) else 0,
     )
 
 
+_JOURNAL_COLUMNS = """
+    id, version, title, description, date, type,
+    features_json, improvements_json, bugfixes_json, tags_json, extra_json
+"""
+
+
+def _upsert_journal_entry(conn: sqlite3.Connection, entry: dict, replace: bool = True) -> None:
+    """Grava uma entrada e sincroniza journal_tags (chamar dentro de transação)."""
+    row = _entry_to_row(entry)
+    conflict = """
+        ON CONFLICT(id) DO UPDATE SET
+            version = excluded.version,
+            title = excluded.title,
+            description = excluded.description,
+            date = excluded.date,
+            type = excluded.type,
+            features_json = excluded.features_json,
+            improvements_json = excluded.improvements_json,
+            bugfixes_json = excluded.bugfixes_json,
+            tags_json = excluded.tags_json,
+            extra_json = excluded.extra_json,
+            admin_only = excluded.admin_only
+    """ if replace else 'ON CONFLICT(id) DO NOTHING'
+    cur = conn.execute(
+        f"""
+        INSERT INTO journal_entries (
+            id, version, title, description, date, type,
+            features_json, improvements_json, bugfixes_json, tags_json, extra_json,
+            admin_only
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        {conflict}
+        """,
+        row,
+    )
+    if cur.rowcount == 0:
+        return
+    conn.execute('DELETE FROM journal_tags WHERE entry_id = ?', (row[0],))
+    conn.executemany(
+        'INSERT OR IGNORE INTO journal_tags (tag, entry_id) VALUES (?, ?)',
+        [(tag, row[0]) for tag in _entry_tags(entry)],
+    )
+
+
+@offloaded
 def load_journal() -> list:
     _ensure_init()
     with _lock:
-        conn = _connect()
-        try:
+        with _connection() as conn:
             rows = conn.execute(
-                """
-                SELECT id, version, title, description, date, type,
-                       features_json, improvements_json, bugfixes_json, tags_json, extra_json
+                f"""
+                SELECT {_JOURNAL_COLUMNS}
                 FROM journal_entries
                 ORDER BY date DESC
                 """
             ).fetchall()
             return [_entry_to_dict(r) for r in rows]
-        finally:
-            conn.close()
 
 
+@offloaded
 def save_journal(entries: list) -> None:
     _ensure_init()
     entries = entries or []
     with _lock:
-        conn = _connect()
-        try:
+        with _connection() as conn:
             existing = {
                 r[0] for r in conn.execute('SELECT id FROM journal_entries').fetchall()
             }
@@ -271,30 +642,245 @@ def save_journal(entries: list) -> None:
             for entry in entries:
                 if not entry or entry.get('id') is None:
                     continue
-                row = _entry_to_row(entry)
-                conn.execute(
+                _upsert_journal_entry(conn, entry)
+            conn.commit()
+            _bump_journal_version()
+
+
+def _encode_cursor(date: Optional[str], entry_id: str) -> str:
+    raw = json.dumps([date, entry_id], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor: str) -> Tuple[Optional[str], str]:
+    """Cursor opaco -> (date, id). ValueError se inválido."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date, entry_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise ValueError('cursor inválido') from e
+    if not isinstance(entry_id, str) or not (date is None or isinstance(date, str)):
+        raise ValueError('cursor inválido')
+    return date, entry_id
+
+
+@offloaded
+def query_journal(
+    include_admin: bool = False,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    tag: Optional[str] = None,
+    only_admin: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """
+    Página do journal (mais recentes primeiro) -> (entradas, próximo cursor).
+    Visibilidade e tag filtradas no SQL; cursor é keyset (date, id).
+    only_admin lista só ROADMAP (exige include_admin).
+    """
+    _ensure_init()
+    limit = max(1, min(int(limit or 1), JOURNAL_PAGE_MAX))
+    where, params = [], []
+    if not include_admin:
+        where.append('e.admin_only = 0')
+    elif only_admin:
+        where.append('e.admin_only = 1')
+    join = ''
+    if tag:
+        join = 'JOIN journal_tags t ON t.entry_id = e.id AND t.tag = ?'
+        params.append(tag.strip())
+    if cursor:
+        c_date, c_id = _decode_cursor(cursor)
+        if c_date is None:
+            where.append('(e.date IS NULL AND e.id < ?)')
+            params.append(c_id)
+        else:
+            where.append('(e.date < ? OR e.date IS NULL OR (e.date = ? AND e.id < ?))')
+            params.extend([c_date, c_date, c_id])
+    sql = f"""
+        SELECT {', '.join('e.' + c.strip() for c in _JOURNAL_COLUMNS.split(','))}
+        FROM journal_entries e {join}
+        {'WHERE ' + ' AND '.join(where) if where else ''}
+        ORDER BY e.date DESC, e.id DESC
+        LIMIT ?
+    """
+    params.append(limit + 1)
+    with _lock:
+        with _connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+    entries = [_entry_to_dict(r) for r in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = _encode_cursor(last['date'], last['id'])
+    return entries, next_cursor
+
+
+@offloaded
+def insert_journal_entry(entry: dict) -> Optional[dict]:
+    """
+    Insere uma entrada nova e devolve a gravada. Ids numéricos (timestamp
+    em ms) que já existam avançam para o próximo livre na mesma transação;
+    id não numérico repetido devolve None.
+    """
+    if not entry or entry.get('id') is None:
+        return None
+    _ensure_init()
+    entry = normalize_journal_entry(dict(entry))
+    entry['id'] = str(entry['id'])
+    with _lock:
+        with _connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            taken = conn.execute(
+                'SELECT 1 FROM journal_entries WHERE id = ?', (entry['id'],)
+            ).fetchone()
+            if taken is not None:
+                if not entry['id'].isdigit():
+                    return None
+                row = conn.execute(
                     """
-                    INSERT INTO journal_entries (
-                        id, version, title, description, date, type,
-                        features_json, improvements_json, bugfixes_json, tags_json, extra_json
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(id) DO UPDATE SET
-                        version = excluded.version,
-                        title = excluded.title,
-                        description = excluded.description,
-                        date = excluded.date,
-                        type = excluded.type,
-                        features_json = excluded.features_json,
-                        improvements_json = excluded.improvements_json,
-                        bugfixes_json = excluded.bugfixes_json,
-                        tags_json = excluded.tags_json,
-                        extra_json = excluded.extra_json
+                    SELECT MAX(CAST(id AS INTEGER)) FROM journal_entries
+                    WHERE id GLOB '[0-9]*' AND length(id) = ?
                     """,
-                    row,
-                )
+                    (len(entry['id']),),
+                ).fetchone()
+                entry['id'] = str(max(int(entry['id']), row[0] or 0) + 1)
+            _upsert_journal_entry(conn, entry, replace=False)
             conn.commit()
-        finally:
-            conn.close()
+            _bump_journal_version()
+            return entry
+
+
+@offloaded
+def update_journal_entry(entry_id: str, changes: dict) -> Optional[dict]:
+    """
+    Mescla changes na versão atual da entrada (lida na mesma transação)
+    e devolve a entrada gravada, ou None se não existir.
+    Campos ausentes em changes ficam como estão no banco.
+    """
+    if not entry_id:
+        return None
+    _ensure_init()
+    with _lock:
+        with _connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                f'SELECT {_JOURNAL_COLUMNS} FROM journal_entries WHERE id = ?',
+                (str(entry_id),),
+            ).fetchone()
+            if row is None:
+                return None
+            entry = _entry_to_dict(row)
+            entry.update({k: v for k, v in (changes or {}).items() if k != 'id'})
+            normalize_journal_entry(entry)
+            _upsert_journal_entry(conn, entry)
+            conn.commit()
+            _bump_journal_version()
+            return entry
+
+
+@offloaded
+def delete_journal_entry(entry_id: str) -> Optional[dict]:
+    """Remove a entrada (tags saem em cascata). Devolve a removida ou None."""
+    if not entry_id:
+        return None
+    _ensure_init()
+    with _lock:
+        with _connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                f'SELECT {_JOURNAL_COLUMNS} FROM journal_entries WHERE id = ?',
+                (str(entry_id),),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute('DELETE FROM journal_entries WHERE id = ?', (str(entry_id),))
+            conn.commit()
+            _bump_journal_version()
+            return _entry_to_dict(row)
+
+
+@offloaded
+def get_journal_entry(entry_id: str) -> Optional[dict]:
+    """Uma entrada pelo id (sem carregar a tabela) ou None."""
+    if not entry_id:
+        return None
+    _ensure_init()
+    with _lock:
+        with _connection() as conn:
+            row = conn.execute(
+                f'SELECT {_JOURNAL_COLUMNS} FROM journal_entries WHERE id = ?',
+                (str(entry_id),),
+            ).fetchone()
+            return _entry_to_dict(row) if row else None
+
+
+@offloaded
+def journal_stats() -> dict:
+    """Totais das releases públicas (cabeçalho da página /journal)."""
+    _ensure_init()
+    with _lock:
+        with _connection() as conn:
+            row = conn.execute(
+                """
+                SELECT
+                    COUNT(*) AS versions,
+                    COALESCE(SUM(CASE WHEN json_valid(features_json)
+                        THEN json_array_length(features_json) ELSE 0 END), 0) AS features,
+                    COALESCE(SUM(
+                        CASE WHEN json_valid(improvements_json)
+                            THEN json_array_length(improvements_json) ELSE 0 END
+                        + CASE WHEN json_valid(bugfixes_json)
+                            THEN json_array_length(bugfixes_json) ELSE 0 END
+                    ), 0) AS improvements
+                FROM journal_entries WHERE admin_only = 0
+                """
+            ).fetchone()
+            latest = conn.execute(
+                """
+                SELECT version FROM journal_entries WHERE admin_only = 0
+                ORDER BY date DESC, id DESC LIMIT 1
+                """
+            ).fetchone()
+            return {
+                'versions': row['versions'],
+                'features': row['features'],
+                'improvements': row['improvements'],
+                'latest': latest['version'] if latest else None,
+            }
+
+
+def _migrate_schema(conn: sqlite3.Connection) -> None:
+    """Migrações incrementais controladas por PRAGMA user_version."""
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version < 1:
+        # v1: visibilidade em coluna indexada + tags normalizadas
+        cols = {r['name'] for r in conn.execute('PRAGMA table_info(journal_entries)')}
+        if 'admin_only' not in cols:
+            conn.execute(
+                'ALTER TABLE journal_entries ADD COLUMN admin_only INTEGER NOT NULL DEFAULT 0'
+            )
+        rows = conn.execute(f'SELECT {_JOURNAL_COLUMNS} FROM journal_entries').fetchall()
+        for row in rows:
+            entry = _entry_to_dict(row)
+            conn.execute(
+                'UPDATE journal_entries SET admin_only = ? WHERE id = ?',
+                (1 if journal_entry_admin_only(entry) else 0, entry['id']),
+            )
+            conn.execute('DELETE FROM journal_tags WHERE entry_id = ?', (entry['id'],))
+            conn.executemany(
+                'INSERT OR IGNORE INTO journal_tags (tag, entry_id) VALUES (?, ?)',
+                [(tag, entry['id']) for tag in _entry_tags(entry)],
+            )
+    conn.executescript(
+        """
+        CREATE INDEX IF NOT EXISTS idx_journal_visible_date
+            ON journal_entries(admin_only, date DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_journal_date_id
+            ON journal_entries(date DESC, id DESC);
+        """
+    )
+    if version < SCHEMA_VERSION:
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
 
 
 def _migrate_from_json_if_needed(conn: sqlite3.Connection) -> None:
@@ -330,16 +916,7 @@ def _migrate_from_json_if_needed(conn: sqlite3.Connection) -> None:
                 for entry in entries:
                     if not entry or entry.get('id') is None:
                         continue
-                    row = _entry_to_row(entry)
-                    conn.execute(
-                        """
-                        INSERT OR IGNORE INTO journal_entries (
-                            id, version, title, description, date, type,
-                            features_json, improvements_json, bugfixes_json, tags_json, extra_json
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        row,
-                    )
+                    _upsert_journal_entry(conn, entry, replace=False)
                 _backup_legacy(JOURNAL_FILE)
         except (OSError, json.JSONDecodeError, TypeError):
             pass
@@ -0,0 +1,104 @@
+"""
+Executor do SQLite: tira as chamadas bloqueantes do loop do gevent.
+
+No worker gevent (threading monkey-patched) cada chamada roda num
+ThreadPool nativo e só o greenlet chamador espera; os demais sockets
+seguem atendidos. Fora do gevent (scripts, shell) executa direto.
+"""
+from __future__ import annotations
+
+import _thread
+import functools
+from typing import Any, Callable, TypeVar
+
+from twilight.config import DB_EXECUTOR_THREADS
+
+try:
+    from gevent import get_hub
+    from gevent import monkey as _monkey
+    from gevent.threadpool import ThreadPool
+except ImportError:  # pragma: no cover - gevent é dependência de produção
+    get_hub = None
+    _monkey = None
+    ThreadPool = None
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+
+def _original(name: str):
+    """Primitiva original (pré monkey-patch) do módulo _thread."""
+    if _monkey is not None:
+        try:
+            return _monkey.get_original('_thread', name)
+        except (AttributeError, KeyError, ImportError):
+            pass
+    return getattr(_thread, name)
+
+
+# Locks usados dentro das threads do pool precisam ser nativos:
+# os do gevent só funcionam entre greenlets da mesma thread. Vêm de
+# _thread porque threading.RLock, com o patch, cai na versão Python
+# que aloca locks do gevent.
+native_lock = _original('allocate_lock')
+native_rlock = _original('RLock')
+
+_worker_local = _original('_local')()
+
+
+def _in_worker() -> bool:
+    return getattr(_worker_local, 'native_worker', False)
+
+
+def _run_marked(fn, args, kwargs):
+    _worker_local.native_worker = True
+    return fn(*args, **kwargs)
+
+
+class NativePool:
+    """
+    ThreadPool nativo criado sob demanda (um por hub do gevent).
+    Sem gevent, com size 0 ou já dentro de uma thread do pool, executa direto.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._pool = None
+        self._hub = None
+        self._guard = native_lock()
+
+    def active(self) -> bool:
+        return (
+            ThreadPool is not None
+            and self.size > 0
+            and _monkey.is_module_patched('threading')
+        )
+
+    def _get(self):
+        hub = get_hub()
+        with self._guard:
+            if self._pool is None or self._hub is not hub:
+                self._pool = ThreadPool(self.size, hub=hub)
+                self._hub = hub
+            return self._pool
+
+    def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Executa fn(*args, **kwargs) no pool e devolve o resultado ao greenlet."""
+        if not self.active() or _in_worker():
+            return fn(*args, **kwargs)
+        return self._get().apply(_run_marked, (fn, args, kwargs))
+
+
+_db_pool = NativePool(DB_EXECUTOR_THREADS)
+
+
+def run_db(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Executa fn(*args, **kwargs) no pool do DB e devolve o resultado ao greenlet."""
+    return _db_pool.run(fn, *args, **kwargs)
+
+
+def offloaded(fn: F) -> F:
+    """Decorator: a função pública do storage sempre roda via run_db."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return run_db(fn, *args, **kwargs)
+    return wrapper  # type: ignore[return-value]
@@ -1,5 +1,31 @@
 """Persistência do journal (lore / diário) via SQLite."""
 
-from twilight.storage.db import load_journal, save_journal
+from twilight.storage.db import (
+    JOURNAL_ADMIN_ONLY_TYPES,
+    delete_journal_entry,
+    get_journal_entry,
+    insert_journal_entry,
+    journal_entry_admin_only,
+    journal_stats,
+    journal_version,
+    load_journal,
+    normalize_journal_entry,
+    query_journal,
+    save_journal,
+    update_journal_entry,
+)
 
-__all__ = ['load_journal', 'save_journal']
+__all__ = [
+    'JOURNAL_ADMIN_ONLY_TYPES',
+    'delete_journal_entry',
+    'get_journal_entry',
+    'insert_journal_entry',
+    'journal_entry_admin_only',
+    'journal_stats',
+    'journal_version',
+    'load_journal',
+    'normalize_journal_entry',
+    'query_journal',
+    'save_journal',
+    'update_journal_entry',
+]